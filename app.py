@@ -0,0 +1,1735 @@
+"""
+Tkinter GUI for the Project Tracking App (started by main.py).
+"""
+import time
+_START_TIME = time.perf_counter()
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import pandas as pd
+import os
+import webbrowser
+# matplotlib, reportlab and openpyxl are imported where they are used (reports.py
+# and export.py); together they cost more at startup than everything else here.
+
+import charts
+import datastore as ds
+import duedates
+import export
+import importer
+import reports
+import rollup
+import schedule
+import search
+from widgets import VirtualListbox, VirtualTreeview
+from datastore import (
+    TASK_SUBCATEGORIES,
+    COMPANY_NAMES, ITEM_CATEGORIES, ORDER_STATUSES, LPO_STATUSES, INVOICE_STATUSES, PENDING_STATUSES,
+)
+
+_IMPORTS_DONE_TIME = time.perf_counter()
+
+# How often the status bar re-reads the save worker's state
+SAVE_STATUS_POLL_MS = 500
+
+# Launch to first drawn window; going over prints a warning
+STARTUP_BUDGET_SECONDS = 1.0
+
+# How often the Reports tab checks on a running PDF job
+REPORT_POLL_MS = 100
+
+# ------------------------------------------------------------
+# AUTO-CALCULATE PROJECT SUB-PROGRESS FROM TASKS
+# ------------------------------------------------------------
+
+
+# ------------------------------------------------------------
+# MAIN APPLICATION
+# ------------------------------------------------------------
+class FullProjectManagerApp(tk.Tk):
+    def __init__(self, profile_startup=False, start_time=None):
+        super().__init__()
+        self.profile_startup = profile_startup
+        # main.py passes its own launch time so its imports count towards startup too
+        self.start_time = _START_TIME if start_time is None else start_time
+        self.startup_timings = {'imports': _IMPORTS_DONE_TIME - self.start_time}
+        mark = time.perf_counter()
+        self.title("Full Project Tracking App")
+        self.geometry("1400x800")
+        self.selected_pending_id = None
+
+        self.selected_project_id = None
+        self.report_chart = None
+        self.orders_tree_context_menu = None
+        self.orders_tree = None
+        self.schedule_tree = None
+        self.report_job = None
+
+        ds.load_data()
+        self.startup_timings['load data'] = time.perf_counter() - mark
+        mark = time.perf_counter()
+        self.save_worker = ds.SaveWorker()
+        self.save_worker.start()
+        if ds.storage.unsaved_changes:
+            self.save_worker.mark_dirty()
+        ds.add_change_listener(self.on_data_changed)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.save_status_label = tk.Label(self, anchor="w", relief=tk.SUNKEN, padx=5)
+        self.save_status_label.pack(side=tk.BOTTOM, fill="x")
+        self.update_save_status()
+
+        self.create_tabs()
+        self.refresh_project_list()
+        self.startup_timings['build UI'] = time.perf_counter() - mark
+        self._ui_built_time = time.perf_counter()
+        self.after_idle(self.report_startup_time)
+
+    def report_startup_time(self):
+        """Runs once the first window has been drawn."""
+        now = time.perf_counter()
+        self.startup_timings['first window'] = now - self._ui_built_time
+        total = now - self.start_time
+        if self.profile_startup:
+            for phase, secs in self.startup_timings.items():
+                print(f"  {phase:<14}{secs * 1000:8.1f} ms")
+            print(f"  {'total':<14}{total * 1000:8.1f} ms (budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms)")
+            print("  " + ds.format_load_timings())
+        if total > STARTUP_BUDGET_SECONDS:
+            print(f"Startup took {total:.2f}s, over the {STARTUP_BUDGET_SECONDS:.2f}s budget")
+
+    # --------------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------------
+    def on_data_changed(self, entry):
+        """Let the save worker know; it writes once the burst of edits is over."""
+        self.save_worker.mark_dirty()
+
+    def compact_database(self):
+        self.save_worker.mark_dirty(immediate=True)
+
+    def update_save_status(self):
+        status = self.save_worker.status
+        if status == "saving":
+            text, color = "Saving...", "blue"
+        elif status == "failed":
+            text, color = f"Save failed (will retry): {self.save_worker.last_error}", "red"
+        elif status == "pending":
+            text, color = f"{ds.storage.unsaved_changes} change(s) waiting to be saved", "darkorange"
+        else:
+            text, color = "All changes saved", "darkgreen"
+        self.save_status_label.config(text=text, fg=color)
+        self.after(SAVE_STATUS_POLL_MS, self.update_save_status)
+
+    def on_close(self):
+        if self.report_job is not None:
+            # Stop report workers so none keeps writing PDFs or cache files after exit
+            self.save_status_label.config(text="Stopping report workers...", fg="blue")
+            self.update_idletasks()
+            self.report_job.stop()
+            self.report_job = None
+        self.save_status_label.config(text="Saving...", fg="blue")
+        self.update_idletasks()
+        if not self.save_worker.flush():
+            messagebox.showwarning(
+                "Save Warning",
+                f"Could not update {ds.DATABASE_FILE}. Your changes are kept in "
+                f"{ds.JOURNAL_FILE} and will be restored on the next start."
+            )
+        ds.storage.close()
+        if self.report_chart is not None:
+            self.report_chart.close()
+        self.destroy()
+
+    # --------------------------------------------------------
+    # TABS
+    # --------------------------------------------------------
+
+
+    def update_project_subprogress(self, project_id):
+        """
+        Update the project's overall progress by averaging sub-progresses.
+        """
+        rollup.recompute_projects([project_id])
+
+    def recompute_all_progress(self):
+        """Recompute every project's sub-progress, e.g. after a bulk import."""
+        updated = rollup.recompute_projects()
+        messagebox.showinfo("Progress Recomputed", f"Updated {updated} project(s).")
+
+    def change_overall_mode(self, event=None):
+        """Recompute every project's OverallProgress with the weighting picked on the Projects tab."""
+        updated = rollup.set_overall_mode(self.overall_mode_var.get())
+        messagebox.showinfo("Progress Recomputed",
+                            f"Overall progress is now weighted '{rollup.overall_mode()}'; "
+                            f"updated {updated} project(s).")
+
+
+
+
+    
+    def create_tabs(self):
+        self.tab_control = ttk.Notebook(self)
+
+        # Projects tab
+        self.projects_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.projects_tab, text="Projects")
+
+        # Tasks tab
+        self.tasks_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.tasks_tab, text="Tasks")
+
+        # Orders tab
+        self.orders_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.orders_tab, text="Orders")
+
+        # Schedule tab
+        self.schedule_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.schedule_tab, text="Schedule")
+
+        # Lookahead tab
+        self.lookahead_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.lookahead_tab, text="Lookahead")
+
+        # Reports tab
+        self.reports_tab = ttk.Frame(self.tab_control)
+        self.tab_control.add(self.reports_tab, text="Reports")
+
+        self.build_search_bar()
+        self.tab_control.pack(expand=1, fill="both")
+
+        self.build_projects_tab()
+        self.build_tasks_tab()
+
+        # Orders, Schedule, Lookahead and Reports are built the first time they are opened
+        self._deferred_tabs = {
+            str(self.orders_tab): self.build_orders_tab,
+            str(self.schedule_tab): self.build_schedule_tab,
+            str(self.lookahead_tab): self.build_lookahead_tab,
+            str(self.reports_tab): self.build_reports_tab,
+        }
+        self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+    def on_tab_changed(self, event):
+        build = self._deferred_tabs.pop(self.tab_control.select(), None)
+        if build is not None:
+            build()
+        elif self.tab_control.select() == str(self.lookahead_tab):
+            self.refresh_lookahead()
+        elif self.tab_control.select() == str(self.schedule_tab):
+            self.refresh_schedule()
+
+    # --------------------------------------------------------
+    # SEARCH
+    # --------------------------------------------------------
+    def build_search_bar(self):
+        bar = tk.Frame(self)
+        bar.pack(fill="x", padx=5, pady=5)
+        tk.Label(bar, text="Search:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(bar, textvariable=self.search_var, width=50)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_count_label = tk.Label(bar, text="")
+        self.search_count_label.pack(side=tk.LEFT)
+
+        # Build the index when the box is focused, so the first keystroke is already fast
+        search_entry.bind("<FocusIn>", lambda event: search.index.ensure_built())
+        search_entry.bind("<Return>", lambda event: self.open_search_hit(0))
+        search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        self.search_var.trace_add("write", lambda *args: self.run_search())
+
+        # Shown between the search box and the tabs only while there is a query
+        self.search_hits = []
+        self.search_results_frame = tk.Frame(self)
+        self.search_results = VirtualListbox(self.search_results_frame, 'Hit', self.format_search_hit, height=6)
+        self.search_results.pack(fill="both", expand=True)
+        self.search_results.bind("<Double-Button-1>", self.on_search_hit_activated)
+        self.search_results.bind("<Return>", self.on_search_hit_activated)
+
+    def run_search(self):
+        query = self.search_var.get()
+        if not query.strip():
+            self.search_hits = []
+            self.search_count_label.config(text="")
+            self.search_results_frame.pack_forget()
+            return
+        self.search_hits, total = search.index.search(query)
+        shown = f", first {len(self.search_hits)} shown" if total > len(self.search_hits) else ""
+        self.search_count_label.config(text=f"{total} match(es){shown}")
+        self.search_results.set_rows(pd.DataFrame({'Hit': range(len(self.search_hits))}))
+        if not self.search_results_frame.winfo_ismapped():
+            self.search_results_frame.pack(fill="x", padx=5, before=self.tab_control)
+
+    def format_search_hit(self, row):
+        hit = self.search_hits[row['Hit']]
+        project = ds.find_row('Projects', hit.project_id) if hit.project_id is not None else None
+        project_name = project['ProjectName'] if project is not None else "?"
+        kind = {'Tasks': "Task", 'PendingWork': "Pending", 'Orders': "Order"}[hit.sheet]
+        return f"{kind} {hit.key} | {project_name} | {hit.field}: {hit.text}"
+
+    def on_search_hit_activated(self, event):
+        keys = self.search_results.selected_keys()
+        if keys:
+            self.open_search_hit(keys[0])
+
+    def open_search_hit(self, position):
+        if position < len(self.search_hits):
+            hit = self.search_hits[position]
+            self.jump_to(hit.sheet, hit.key, hit.project_id, hit.task_id)
+
+    def jump_to(self, sheet, key, project_id, task_id=None):
+        """Select a row's project and show the row in its tab (pending work in its window)."""
+        if project_id is None or ds.find_row('Projects', project_id) is None:
+            return
+        self.projects_listbox.select_key(project_id)
+        self.on_project_select(None)
+
+        if sheet == 'Orders':
+            self.tab_control.select(self.orders_tab)
+            self.on_tab_changed(None)  # builds the Orders tab on first use
+            self.refresh_orders_tree()
+            self.orders_tree.select_key(key)
+            return
+
+        self.tab_control.select(self.tasks_tab)
+        self.task_listbox.select_key(task_id)
+        if sheet == 'PendingWork':
+            if hasattr(self, 'pending_window') and self.pending_window.winfo_exists():
+                self.pending_window.destroy()  # it may belong to another task
+            self.open_pending_work_window()
+            self.pending_listbox.select_key(key)
+
+    # --------------------------------------------------------
+    # PROJECTS TAB
+    # --------------------------------------------------------
+    def build_projects_tab(self):
+        frame = self.projects_tab
+
+        # Top frame (add project)
+        top_frame = tk.LabelFrame(frame, text="Add / Delete Projects", padx=10, pady=10)
+        top_frame.pack(fill="x", padx=5, pady=5)
+
+        tk.Label(top_frame, text="Project Name:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.project_name_entry = tk.Entry(top_frame, width=40)
+        self.project_name_entry.grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Button(top_frame, text="Add Project", command=self.add_project).grid(row=0, column=2, padx=5, pady=5)
+
+        # Project list
+        mid_frame = tk.LabelFrame(frame, text="Projects List", padx=10, pady=10)
+        mid_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.projects_listbox = VirtualListbox(
+            mid_frame, 'ProjectID', lambda row: f"{int(row['ProjectID'])}: {row['ProjectName']}", height=8
+        )
+        self.projects_listbox.pack(fill=tk.BOTH, expand=True)
+        self.projects_listbox.bind('<<ListboxSelect>>', self.on_project_select)
+
+        # Delete Project
+        tk.Button(frame, text="Delete Selected Project", command=self.delete_project).pack(pady=5)
+        tk.Button(frame, text="Recompute All Progress", command=self.recompute_all_progress).pack(pady=5)
+
+        mode_frame = tk.Frame(frame)
+        mode_frame.pack(pady=5)
+        tk.Label(mode_frame, text="Overall progress weighting:").pack(side=tk.LEFT)
+        self.overall_mode_var = tk.StringVar(value=rollup.overall_mode())
+        mode_combo = ttk.Combobox(mode_frame, textvariable=self.overall_mode_var,
+                                  values=list(rollup.OVERALL_MODES), state="readonly", width=10)
+        mode_combo.pack(side=tk.LEFT, padx=5)
+        mode_combo.bind("<<ComboboxSelected>>", self.change_overall_mode)
+
+    def add_project(self):
+        project_name = self.project_name_entry.get().strip()
+        if not project_name:
+            messagebox.showwarning("Input Error", "Please enter a project name.")
+            return
+
+        next_id = ds.next_id('Projects')
+
+        new_row = {
+            'ProjectID': next_id,
+            'ProjectName': project_name,
+            'Notes': "",
+            'ElectricalProgress': 0,
+            'SSProgress': 0,
+            'PlumbingProgress': 0,
+            'ScreedProgress': 0,
+            'FireSuppressionProgress': 0,
+            'OverallProgress': 0,
+        }
+        ds.insert_row('Projects', new_row)
+        self.refresh_project_list()
+        self.project_name_entry.delete(0, tk.END)
+
+    def refresh_project_list(self):
+        self.projects_listbox.set_rows(ds.projects_df)
+
+    def on_project_select(self, event):
+        """Update the selected project and refresh all related data."""
+        selection = self.projects_listbox.curselection()
+        if not selection:
+            self.selected_project_id = None
+            return
+
+        # ✅ Get the selected project ID
+        index = selection[0]
+        project_info = self.projects_listbox.get(index)
+        project_id = int(project_info.split(":")[0])
+        self.selected_project_id = project_id
+
+        # ✅ Refresh tasks & orders for the selected project
+        self.refresh_task_list()
+        self.refresh_orders_tree()
+        self.refresh_schedule()
+
+        # ✅ Refresh pending tasks ONLY if the pending work window is open
+        proj_tasks = ds.lookup('Tasks', 'ProjectID', self.selected_project_id)
+        if not proj_tasks.empty and hasattr(self, "pending_listbox"):
+            first_task_id = proj_tasks.iloc[0]["TaskID"]
+            # ✅ Only refresh if pending_listbox still exists
+        if hasattr(self, "pending_listbox") and self.pending_listbox.winfo_exists():
+            self.refresh_pending_list(first_task_id)
+
+    def delete_project(self):
+        selection = self.projects_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Selection Error", "Select a project to delete.")
+            return
+        confirm = messagebox.askyesno(
+            "Confirm Delete",
+            "This will remove the project and all associated tasks, orders, and pending work. Proceed?"
+        )
+        if not confirm:
+            return
+
+        index = selection[0]
+        project_info = self.projects_listbox.get(index)
+        project_id = int(project_info.split(":")[0])
+
+        # Remove associated data
+        ds.delete_rows('Projects', 'ProjectID', [project_id])
+        ds.delete_rows('Tasks', 'ProjectID', [project_id])
+        ds.delete_rows('Orders', 'ProjectID', [project_id])
+        ds.delete_rows('PendingWork', 'ProjectID', [project_id])  # ✅ Remove related pending work
+        ds.delete_rows('Dependencies', 'ProjectID', [project_id])
+
+        self.selected_project_id = None
+        self.refresh_project_list()
+        self.refresh_task_list()
+        self.refresh_orders_tree()
+        self.refresh_schedule()
+
+
+
+    # --------------------------------------------------------
+    # TASKS TAB
+    # --------------------------------------------------------
+    def build_tasks_tab(self):
+        frame = self.tasks_tab
+
+        # Label for selected project
+        self.selected_project_label_task = tk.Label(frame, text="Selected Project: None")
+        self.selected_project_label_task.pack(pady=5)
+
+        add_task_frame = tk.LabelFrame(frame, text="Add Task", padx=10, pady=10)
+        add_task_frame.pack(fill="x", padx=5, pady=5)
+
+        tk.Label(add_task_frame, text="Task Name:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.task_name_entry = tk.Entry(add_task_frame, width=40)
+        self.task_name_entry.grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(add_task_frame, text="Category:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        self.task_category_var = tk.StringVar()
+        self.task_category_combo = ttk.Combobox(
+            add_task_frame, textvariable=self.task_category_var,
+            values=list(TASK_SUBCATEGORIES.keys()), state="readonly", width=37
+        )
+        self.task_category_combo.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_task_frame, text="Duration (days):").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.task_duration_entry = tk.Entry(add_task_frame, width=10)
+        self.task_duration_entry.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_task_frame, text="Progress (%):").grid(row=3, column=0, padx=5, pady=5, sticky="e")
+        self.task_progress_entry = tk.Entry(add_task_frame, width=10)
+        self.task_progress_entry.grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_task_frame, text="Parent Task ID:").grid(row=4, column=0, padx=5, pady=5, sticky="e")
+        self.task_parent_entry = tk.Entry(add_task_frame, width=10)
+        self.task_parent_entry.grid(row=4, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_task_frame, text="Weight:").grid(row=5, column=0, padx=5, pady=5, sticky="e")
+        self.task_weight_entry = tk.Entry(add_task_frame, width=10)
+        self.task_weight_entry.grid(row=5, column=1, padx=5, pady=5, sticky="w")
+
+        
+
+        # Task List
+        list_frame = tk.LabelFrame(frame, text="Task List", padx=10, pady=10)
+        list_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.task_listbox = VirtualListbox(list_frame, 'TaskID', self.format_task_line)
+        self.task_listbox.pack(fill=tk.BOTH, expand=True)
+
+        tk.Label(add_task_frame, text="Pending Work:").grid(row=6, column=0, padx=5, pady=5, sticky="e")
+        tk.Button(add_task_frame, text="Manage Pending Work",
+                  command=self.open_pending_work_window).grid(row=6, column=1, padx=5, pady=5, sticky="w")
+        tk.Button(add_task_frame, text="Add Task",
+                  command=self.add_task).grid(row=7, column=1, padx=5, pady=5, sticky="e")
+
+        # Update progress
+        update_frame = tk.LabelFrame(frame, text="Update Task Progress", padx=10, pady=10)
+        update_frame.pack(fill="x", padx=5, pady=5)
+
+        tk.Label(update_frame, text="New Progress (%):").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.update_progress_entry = tk.Entry(update_frame, width=10)
+        self.update_progress_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Button(update_frame, text="Update Progress",
+                  command=self.update_task_progress).grid(row=0, column=2, padx=5, pady=5)
+
+        tk.Label(update_frame, text="Parent Task ID:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        self.update_parent_entry = tk.Entry(update_frame, width=10)
+        self.update_parent_entry.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        tk.Label(update_frame, text="Weight:").grid(row=1, column=2, padx=5, pady=5, sticky="e")
+        self.update_weight_entry = tk.Entry(update_frame, width=10)
+        self.update_weight_entry.grid(row=1, column=3, padx=5, pady=5, sticky="w")
+        tk.Button(update_frame, text="Update Parent/Weight", command=self.update_task_structure)\
+            .grid(row=1, column=4, padx=5, pady=5)
+
+        # Delete Task
+        tk.Button(frame, text="Delete Selected Task", command=self.delete_task).pack(pady=5)
+        tk.Button(frame, text="Edit Pending Items", command=self.edit_pending_items).pack(pady=5)
+
+        import_frame = tk.Frame(frame)
+        import_frame.pack(pady=5)
+        tk.Button(import_frame, text="Import Tasks...", command=lambda: self.import_from_file('Tasks'))\
+            .pack(side=tk.LEFT, padx=5)
+        tk.Button(import_frame, text="Import Pending Work...", command=lambda: self.import_from_file('PendingWork'))\
+            .pack(side=tk.LEFT, padx=5)
+
+    def add_task(self):
+        if self.selected_project_id is None:
+            messagebox.showwarning("No Project", "Select a project first.")
+            return
+        name = self.task_name_entry.get().strip()
+        category = self.task_category_var.get().strip()
+        dur_str = self.task_duration_entry.get().strip()
+        prog_str = self.task_progress_entry.get().strip()
+
+            # Ensure self.task_pending_entry exists
+        if hasattr(self, 'task_pending_entry'):
+            pending_items = self.task_pending_entry.get().strip()  # Get pending items
+        else:
+            pending_items = ""  # Default to empty if the entry doesn't exist
+
+        structure = self.read_task_structure(self.task_parent_entry.get(), self.task_weight_entry.get())
+        if structure is None:
+            return
+        parent_id, weight = structure
+        if parent_id is not None and not category:
+            category = ds.find_row('Tasks', parent_id)['Category']  # subtasks default to their parent's
+
+        if not name or not category:
+            messagebox.showwarning("Input Error", "Task name & category are required.")
+            return
+        try:
+            duration = float(dur_str) if dur_str else 0.0
+        except ValueError:
+            messagebox.showwarning("Input Error", "Invalid duration.")
+            return
+        try:
+            progress = float(prog_str) if prog_str else 0.0
+            if progress < 0 or progress > 100:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Input Error", "Progress must be 0-100.")
+            return
+
+        next_tid = ds.next_id('Tasks')
+
+        new_task = {
+        'TaskID': next_tid,
+        'ProjectID': self.selected_project_id,
+        'TaskName': name,
+        'Duration': duration,
+        'Weight': weight,
+        'Progress': progress,
+        'ParentTaskID': parent_id,
+        'Category': category,
+        'PendingItems': pending_items  # Store pending items
+    }
+        ds.insert_row('Tasks', new_task)
+
+        # Update subprogress
+        self.update_project_subprogress(self.selected_project_id)
+
+        self.refresh_task_list()
+
+        # Clear fields
+        self.task_name_entry.delete(0, tk.END)
+        self.task_category_var.set("")
+        self.task_duration_entry.delete(0, tk.END)
+        self.task_progress_entry.delete(0, tk.END)
+        self.task_parent_entry.delete(0, tk.END)
+        self.task_weight_entry.delete(0, tk.END)
+        if hasattr(self, 'task_pending_entry'):  # Ensure pending items entry exists
+            self.task_pending_entry.delete(0, tk.END)  # Clear pending items field
+            
+    def open_pending_work_window(self):
+        selection = self.task_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Selection Error", "Select a task first.")
+            return
+
+        # Get selected task ID
+        item_str = self.task_listbox.get(selection[0])
+        tid = int(item_str.split()[1].replace(":", ""))
+
+        if hasattr(self, 'pending_window') and self.pending_window.winfo_exists():
+            self.pending_window.lift()
+            return
+
+        self.pending_window = tk.Toplevel(self)
+        self.pending_window.title(f"Manage Pending Work - Task {tid}")
+
+        tk.Label(self.pending_window,
+                 text="Pending Work Description:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.desc_entry = tk.Entry(self.pending_window, width=50)
+        self.desc_entry.grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(self.pending_window, text="Status:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        self.status_var = tk.StringVar()
+        self.status_combo = ttk.Combobox(self.pending_window, textvariable=self.status_var, 
+                                         values=PENDING_STATUSES, state="readonly")
+        self.status_combo.grid(row=1, column=1, padx=5, pady=5)
+
+        tk.Label(self.pending_window, text="Due Date (YYYY-MM-DD):").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.due_date_entry = tk.Entry(self.pending_window, width=20)
+        self.due_date_entry.grid(row=2, column=1, padx=5, pady=5)
+
+        tk.Button(self.pending_window, text="Add/Update Pending Work",
+                  command=lambda: self.add_or_update_pending_work(tid)).grid(row=3, column=1, pady=10, sticky="w")
+
+        # List of pending work
+        list_frame = tk.Frame(self.pending_window)
+        list_frame.grid(row=4, column=0, columnspan=2, padx=5, pady=5)
+
+        self.pending_listbox = VirtualListbox(
+            list_frame, 'PendingID',
+            lambda row: (f"ID {row['PendingID']}: {row['Description']} | {row['Status']} | "
+                         f"Due: {ds.date_cell('PendingWork', row, 'DueDate')}"),
+            width=80, height=8
+        )
+        self.pending_listbox.pack(fill=tk.BOTH, expand=True)
+
+        self.pending_listbox.bind("<<ListboxSelect>>", lambda event: self.populate_pending_fields(event, tid))
+
+
+        self.pending_listbox.bind("<Button-1>", lambda event: self.check_deselect(event))  # Detect outside click
+
+
+        tk.Button(self.pending_window, text="Delete Selected",
+                  command=lambda: self.delete_pending_work(tid)).grid(row=5, column=0, columnspan=2, pady=5)
+
+        self.refresh_pending_list(tid)
+
+    def add_or_update_pending_work(self, task_id):
+
+        desc = self.desc_entry.get().strip()
+        status = self.status_var.get()
+        due_date = self.due_date_entry.get().strip()
+
+        if not desc or not status or not due_date:
+            messagebox.showerror("Error", "All fields are required.")
+            return  
+
+        if self.selected_project_id is None:
+            messagebox.showerror("Error", "No project selected. Please select a project first.")
+            return  
+
+        if not self.confirm_date(due_date, "Due date"):
+            return
+
+        if self.selected_pending_id is not None:
+            # Update existing pending task
+            ds.update_row('PendingWork', self.selected_pending_id,
+                          {'Description': desc, 'Status': status, 'DueDate': due_date})
+
+            self.selected_pending_id = None  # Reset selection after update
+
+        else:
+            next_pid = ds.next_id('PendingWork')
+
+            new_pending = {
+                'PendingID': next_pid,
+                'TaskID': task_id,
+                'ProjectID': self.selected_project_id,  # Assign project ID correctly
+                'Description': desc,
+                'Status': status,
+                'DueDate': due_date
+            }
+
+            ds.insert_row('PendingWork', new_pending)
+
+        self.refresh_pending_list(task_id)
+        self.clear_pending_fields()
+
+
+        def check_deselect(self, event):
+            """Deselect pending work when clicking outside of a selected item."""
+            if not self.pending_listbox.curselection():
+                self.selected_pending_id = None
+                self.clear_pending_fields()
+
+
+
+
+
+    def delete_pending_work(self, task_id):
+        selection = self.pending_listbox.curselection()
+        if not selection:
+            messagebox.showerror("Error", "Select a pending work item to delete.")
+            return
+
+        confirm = messagebox.askyesno("Confirm Delete", "Delete selected pending work?")
+        if not confirm:
+            return
+
+        item_str = self.pending_listbox.get(selection[0])
+        pid = int(item_str.split()[1].replace(":", ""))
+
+        ds.delete_rows('PendingWork', 'PendingID', [pid])
+
+        self.refresh_pending_list(task_id)
+
+        # ✅ Recalculate the task progress after deletion
+        #self.update_task_progress_based_on_pending(task_id)
+
+
+    def update_task_progress_based_on_pending(self, task_id):
+
+        # Resolved / total pending work items for this task (kept as running counts)
+        resolved_items, total_items = rollup.aggregates.pending_counts(task_id)
+
+        # If there are no pending tasks, maintain current progress
+        if total_items == 0:
+            return  
+
+        # Calculate completion ratio from pending work
+        pending_completion_ratio = resolved_items / total_items if total_items > 0 else 1
+
+        # Find the task in tasks_df
+        task_row = ds.find_row('Tasks', task_id)
+        if task_row is None:
+            return  # Task not found
+
+        # Retrieve manual progress input
+        manual_progress = task_row['Progress']
+
+        # Weighted progress calculation (50% manual, 50% pending work)
+        updated_progress = (manual_progress * 0.5) + (pending_completion_ratio * 100 * 0.5)
+
+        # Update the task progress
+        ds.update_row('Tasks', task_id, {'Progress': round(updated_progress, 2)})
+
+        # ✅ Ensure project progress updates correctly
+        project_id = task_row['ProjectID']
+
+        # ✅ Call the method correctly using `self`
+        if hasattr(self, "update_project_subprogress"):
+            self.update_project_subprogress(project_id)
+        else:
+            print("Warning: update_project_subprogress method not found in self.")
+
+
+
+
+    def refresh_pending_list(self, task_id):
+        """Refresh the pending work list and ensure the listbox exists."""
+        if not hasattr(self, "pending_listbox") or not self.pending_listbox.winfo_exists():
+            return  # ✅ Avoid error if pending_listbox does not exist
+
+        if self.selected_project_id is None:
+            self.pending_listbox.set_rows(None)
+            return  # No project selected, so don't display anything
+
+        # ✅ Ensure it filters correctly by TaskID and ProjectID
+        proj_pending = ds.lookup('PendingWork', 'TaskID', task_id)
+        proj_pending = proj_pending[proj_pending["ProjectID"] == self.selected_project_id]
+
+        # Only new, removed or edited items touch the listbox
+        self.pending_listbox.set_rows(proj_pending)
+
+
+
+
+
+
+    def add_pending_work(self, task_id, desc_entry, status_var, due_date_entry, top_window):
+        """Adds a pending work item to the ds.pending_work_df dataframe."""
+        desc = desc_entry.get().strip()
+        status = status_var.get()
+        due_date = due_date_entry.get().strip()
+
+        if not desc or not status or not due_date:
+            messagebox.showerror("Error", "All fields are required.")
+            return  # Stop function if input is invalid
+
+        if not self.confirm_date(due_date, "Due date"):
+            return
+
+        # Generate a new PendingID
+        next_pid = ds.next_id('PendingWork')
+
+        new_pending = {
+            'PendingID': next_pid,
+            'TaskID': task_id,
+            'Description': desc,
+            'Status': status,
+            'DueDate': due_date
+        }
+
+        # Add new pending work to the dataframe
+        ds.insert_row('PendingWork', new_pending)
+
+        messagebox.showinfo("Success", "Pending work added.")
+        top_window.destroy()  # Close the popup
+        self.open_pending_work_window()  # Refresh the window
+    def clear_pending_fields(self):
+        """Clears the input fields for pending work."""
+        self.desc_entry.delete(0, tk.END)
+        self.status_var.set("")
+        self.due_date_entry.delete(0, tk.END)
+
+
+    def populate_pending_fields(self, event, tid):
+        """Handles updating the pending fields when an item is selected."""
+        selection = self.pending_listbox.curselection()
+        if not selection:
+            return
+
+        item_str = self.pending_listbox.get(selection[0])
+        pending_id = int(item_str.split()[1].replace(":", ""))
+
+        # Find the selected pending work entry
+        row = ds.find_row('PendingWork', pending_id)
+        if row is not None:
+            self.desc_entry.delete(0, tk.END)
+            self.desc_entry.insert(0, row['Description'])
+
+            self.status_var.set(row['Status'])
+
+            self.due_date_entry.delete(0, tk.END)
+            self.due_date_entry.insert(0, ds.date_cell('PendingWork', row, 'DueDate'))
+
+            self.selected_pending_id = pending_id  # Keep track of selected ID
+
+
+
+
+    def edit_pending_items(self):
+        selection = self.task_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Selection Error", "Select a task to edit pending items.")
+            return
+        
+        item_str = self.task_listbox.get(selection[0])
+        tid = int(item_str.split()[1].replace(":", ""))
+        
+        current_pending = ds.find_row('Tasks', tid)['PendingItems']
+        if pd.isna(current_pending):
+            current_pending = ""
+
+        top = tk.Toplevel(self)
+        top.title("Edit Pending Items")
+        
+        tk.Label(top, text="Pending Items:").pack(padx=10, pady=5)
+        pending_entry = tk.Text(top, width=50, height=4)
+        pending_entry.insert(tk.END, current_pending)
+        pending_entry.pack(padx=10, pady=5)
+        
+        def save_changes():
+            new_pending = pending_entry.get("1.0", tk.END).strip()
+            ds.update_row('Tasks', tid, {'PendingItems': new_pending})
+            self.refresh_task_list()
+            top.destroy()
+        
+        tk.Button(top, text="Save", command=save_changes).pack(pady=10)
+
+    def format_task_line(self, row):
+        tid = row['TaskID']
+        tname = row['TaskName']
+        cat = row['Category']
+        dur = row['Duration']
+        prog = row['Progress']
+        pending = row['PendingItems'] if pd.notna(row['PendingItems']) else ""
+        parent = rollup.aggregates.parent_of(tid)
+        structure = f" | Subtask of {parent}" if parent is not None else ""
+        weight = pd.to_numeric(row['Weight'], errors='coerce')
+        if pd.notna(weight) and weight > 0:
+            structure += f" | Weight {weight:g}"
+        return f"ID {tid}: {tname} ({cat}) - Dur:{dur} days, {prog}%{structure} | Pending: {pending}"
+
+    def refresh_task_list(self):
+        # Only rows in view are materialized, and only changed lines are redrawn (see widgets.py)
+        if self.selected_project_id is None:
+            self.task_listbox.set_rows(None)
+            return
+        self.task_listbox.set_rows(ds.lookup('Tasks', 'ProjectID', self.selected_project_id))
+
+    def update_task_progress(self):
+        selection = self.task_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Selection Error", "Select a task to update.")
+            return
+        new_prog_str = self.update_progress_entry.get().strip()
+        try:
+            new_prog = float(new_prog_str)
+            if new_prog < 0 or new_prog > 100:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Input Error", "Progress must be 0-100.")
+            return
+
+        item_str = self.task_listbox.get(selection[0])
+        # e.g. "ID 5: MyTask (Electrical) - Dur:2 days, 50.0%"
+        tokens = item_str.split()
+        if len(tokens) < 2:
+            return
+        tid_str = tokens[1]  # "5:"
+        tid_str = tid_str.replace(":", "")
+        try:
+            tid_val = int(tid_str)
+        except:
+            return
+
+        if len(rollup.aggregates.subtree(tid_val)) > 1:
+            messagebox.showwarning("Input Error",
+                                   "This task has subtasks; its progress is rolled up from theirs.")
+            return
+
+        ds.update_row('Tasks', tid_val, {'Progress': new_prog})
+        if self.selected_project_id is not None:
+            self.update_project_subprogress(self.selected_project_id)
+        self.refresh_task_list()
+        self.update_progress_entry.delete(0, tk.END)
+
+    def delete_task(self):
+        selection = self.task_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("Selection Error", "Select a task.")
+            return
+        item_str = self.task_listbox.get(selection[0])
+        tokens = item_str.split()
+        if len(tokens) < 2:
+            return
+        tid_str = tokens[1].replace(":", "")
+        try:
+            tid_val = int(tid_str)
+        except:
+            return
+        # Subtasks go with their parent, deepest first
+        task_ids = rollup.aggregates.subtree(tid_val)
+        message = "Are you sure?" if len(task_ids) == 1 else f"Delete this task and its {len(task_ids) - 1} subtask(s)?"
+        confirm = messagebox.askyesno("Delete Task", message)
+        if not confirm:
+            return
+        ds.delete_rows('Tasks', 'TaskID', task_ids)
+        ds.delete_rows('Dependencies', 'PredecessorID', task_ids)
+        ds.delete_rows('Dependencies', 'SuccessorID', task_ids)
+        if self.selected_project_id is not None:
+            self.update_project_subprogress(self.selected_project_id)
+        self.refresh_task_list()
+        self.refresh_schedule()
+
+    def read_task_structure(self, parent_str, weight_str, task_id=None):
+        """(ParentTaskID or None, Weight) from the entry texts, or None after showing what is wrong."""
+        parent_str, weight_str = parent_str.strip(), weight_str.strip()
+        try:
+            weight = float(weight_str) if weight_str else 0.0
+            if weight < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Input Error", "Weight must be a number, 0 or more.")
+            return None
+        if not parent_str:
+            return None, weight
+        try:
+            parent_id = int(parent_str)
+        except ValueError:
+            messagebox.showwarning("Input Error", "Parent Task ID must be a task ID.")
+            return None
+        parent = ds.find_row('Tasks', parent_id)
+        if parent is None or parent['ProjectID'] != self.selected_project_id:
+            messagebox.showwarning("Input Error", "The parent task must be a task of the selected project.")
+            return None
+        if task_id is not None and parent_id in rollup.aggregates.subtree(task_id):
+            messagebox.showwarning("Input Error", "A task cannot be a subtask of itself or of its own subtasks.")
+            return None
+        return parent_id, weight
+
+    def update_task_structure(self):
+        """Move the selected task under another task (blank Parent Task ID: top level) and set its Weight."""
+        keys = self.task_listbox.selected_keys()
+        if not keys:
+            messagebox.showwarning("Selection Error", "Select a task to update.")
+            return
+        task_id = keys[0]
+        structure = self.read_task_structure(self.update_parent_entry.get(), self.update_weight_entry.get(), task_id)
+        if structure is None:
+            return
+        parent_id, weight = structure
+        ds.update_row('Tasks', task_id, {'ParentTaskID': parent_id, 'Weight': weight})
+        if self.selected_project_id is not None:
+            self.update_project_subprogress(self.selected_project_id)
+        self.refresh_task_list()
+        self.update_parent_entry.delete(0, tk.END)
+        self.update_weight_entry.delete(0, tk.END)
+
+    # --------------------------------------------------------
+    # BULK IMPORT
+    # --------------------------------------------------------
+    def import_from_file(self, sheet):
+        """Import many rows of a sheet from a CSV/Excel file; rows without a ProjectID go to the selected project."""
+        file_path = filedialog.askopenfilename(
+            title=f"Import {sheet}",
+            filetypes=[("CSV or Excel", "*.csv *.xlsx *.xls"), ("All Files", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            frame = importer.read_table(file_path)
+        except Exception as e:
+            messagebox.showerror("Import Error", f"Could not read {file_path}: {e}")
+            return
+
+        project_id = self.selected_project_id if sheet != 'PendingWork' else None
+        imported, errors = importer.import_rows(sheet, frame, project_id)
+        if errors:
+            bad_lines = len({line for line, _ in errors})
+            valid = len(frame) - bad_lines
+            if valid == 0:
+                messagebox.showerror("Import Error", importer.format_errors(errors))
+                return
+            if not messagebox.askyesno(
+                "Import Errors",
+                f"{bad_lines} row(s) are invalid:\n{importer.format_errors(errors)}\n\n"
+                f"Import the other {valid} row(s)?"
+            ):
+                return
+            imported, errors = importer.import_rows(sheet, frame, project_id, skip_invalid=True)
+
+        # One save for the whole batch
+        self.save_worker.mark_dirty(immediate=True)
+        self.refresh_task_list()
+        self.refresh_orders_tree()
+        messagebox.showinfo("Import", f"Imported {imported} row(s) into {sheet}.")
+
+    # --------------------------------------------------------
+    # ORDERS TAB
+    # --------------------------------------------------------
+    def build_orders_tab(self):
+        frame = self.orders_tab
+        self.selected_project_label_orders = tk.Label(frame, text="Selected Project: None")
+        self.selected_project_label_orders.pack(pady=5)
+
+        add_order_frame = tk.LabelFrame(frame, text="Add New Order", padx=10, pady=5)
+        add_order_frame.pack(fill="x", padx=5, pady=5)
+
+        tk.Label(add_order_frame, text="Company:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.company_combobox = ttk.Combobox(add_order_frame, values=COMPANY_NAMES, state="readonly", width=30)
+        self.company_combobox.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="Item Category:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        self.item_category_combobox = ttk.Combobox(add_order_frame, values=ITEM_CATEGORIES, state="readonly", width=30)
+        self.item_category_combobox.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="Order Status:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.order_status_combobox = ttk.Combobox(add_order_frame, values=ORDER_STATUSES, state="readonly", width=30)
+        self.order_status_combobox.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="LPO Status:").grid(row=3, column=0, padx=5, pady=5, sticky="e")
+        self.lpo_status_combobox = ttk.Combobox(add_order_frame, values=LPO_STATUSES, state="readonly", width=30)
+        self.lpo_status_combobox.grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="Invoice Status:").grid(row=4, column=0, padx=5, pady=5, sticky="e")
+        self.invoice_status_combobox = ttk.Combobox(add_order_frame, values=INVOICE_STATUSES, state="readonly",
+                                                    width=30)
+        self.invoice_status_combobox.grid(row=4, column=1, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="Missing Items:").grid(row=0, column=2, padx=5, pady=5, sticky="e")
+        self.missing_items_var = tk.StringVar()
+        tk.Entry(add_order_frame, textvariable=self.missing_items_var, width=30)\
+            .grid(row=0, column=3, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="Delivery Date:").grid(row=1, column=2, padx=5, pady=5, sticky="e")
+        self.delivery_date_var = tk.StringVar()
+        tk.Entry(add_order_frame, textvariable=self.delivery_date_var, width=30)\
+            .grid(row=1, column=3, padx=5, pady=5, sticky="w")
+
+        tk.Label(add_order_frame, text="Installation Date:").grid(row=2, column=2, padx=5, pady=5, sticky="e")
+        self.installation_date_var = tk.StringVar()
+        tk.Entry(add_order_frame, textvariable=self.installation_date_var, width=30)\
+            .grid(row=2, column=3, padx=5, pady=5, sticky="w")
+
+        tk.Button(add_order_frame, text="Add Order", command=self.add_order, bg="green", fg="white")\
+            .grid(row=5, column=1, pady=10, sticky="w")
+        tk.Button(add_order_frame, text="Delete Order", command=self.delete_order, bg="red", fg="white")\
+            .grid(row=5, column=2, pady=10, sticky="w")
+        tk.Button(add_order_frame, text="Import Orders...", command=lambda: self.import_from_file('Orders'))\
+            .grid(row=5, column=3, pady=10, sticky="w")
+
+        # Add company
+        tk.Label(add_order_frame, text="Add New Company:").grid(row=6, column=0, padx=5, pady=5, sticky="e")
+        self.new_company_var = tk.StringVar()
+        tk.Entry(add_order_frame, textvariable=self.new_company_var, width=30)\
+            .grid(row=6, column=1, padx=5, pady=5, sticky="w")
+        tk.Button(add_order_frame, text="Add Company", command=self.add_new_company, bg="blue", fg="white")\
+            .grid(row=6, column=2, padx=5, pady=5, sticky="w")
+
+        tree_frame = tk.Frame(frame)
+        tree_frame.pack(fill="both", expand=True, padx=5, pady=5)
+
+        columns = (
+            "OrderID", "Company", "ItemCategory", "OrderStatus",
+            "LPOStatus", "Invoice?", "InvoiceStatus",
+            "MissingItems", "DeliveryDate", "InstallationDate"
+        )
+        self.orders_tree = VirtualTreeview(tree_frame, 'OrderID', self.format_order_values, columns)
+        for col in columns:
+            self.orders_tree.heading(col, text=col)
+            self.orders_tree.column(col, width=120, anchor="center")
+        self.orders_tree.pack(fill="both", expand=True)
+
+        # Right-click context menu
+        self.orders_tree.bind("<Button-3>", self.show_orders_tree_context_menu)
+
+        self.refresh_orders_tree()
+
+    def update_orders_tab_title(self):
+        if self.selected_project_id is not None:
+            row = ds.find_row('Projects', self.selected_project_id)
+            if row is not None:
+                pname = row['ProjectName']
+                self.selected_project_label_orders.config(text=f"Selected Project: {pname}")
+        else:
+            self.selected_project_label_orders.config(text="Selected Project: None")
+
+    def add_new_company(self):
+        global COMPANY_NAMES
+        new_company = self.new_company_var.get().strip()
+        if not new_company:
+            messagebox.showerror("Error", "Enter a valid company name.")
+            return
+        if new_company in COMPANY_NAMES:
+            messagebox.showerror("Error", "This company already exists.")
+            return
+        COMPANY_NAMES.append(new_company)
+        self.company_combobox['values'] = COMPANY_NAMES
+        self.new_company_var.set('')
+        messagebox.showinfo("Success", f"Company '{new_company}' added.")
+
+    def add_order(self):
+        if self.selected_project_id is None:
+            messagebox.showerror("Error", "Select a project first.")
+            return
+        company = self.company_combobox.get()
+        item_cat = self.item_category_combobox.get()
+        order_stat = self.order_status_combobox.get()
+        lpo_stat = self.lpo_status_combobox.get()
+        inv_stat = self.invoice_status_combobox.get()
+
+        missing_items = self.missing_items_var.get().strip()
+        delivery_date = self.delivery_date_var.get().strip()
+        installation_date = self.installation_date_var.get().strip()
+
+        if not item_cat or not order_stat or not lpo_stat or not inv_stat:
+            messagebox.showerror("Error", "Fill required order fields.")
+            return
+        if not (self.confirm_date(delivery_date, "Delivery date")
+                and self.confirm_date(installation_date, "Installation date")):
+            return
+
+        next_oid = ds.next_id('Orders')
+
+        new_order = {
+            'OrderID': next_oid,
+            'ProjectID': self.selected_project_id,
+            'Company': company,
+            'ItemCategory': item_cat,
+            'OrderStatus': order_stat,
+            'LPOStatus': lpo_stat,
+            'InvoiceCopyPath': "",
+            'InvoiceStatus': inv_stat,
+            'MissingItems': missing_items,
+            'DeliveryDate': delivery_date,
+            'InstallationDate': installation_date
+        }
+        ds.insert_row('Orders', new_order)
+        self.refresh_orders_tree()
+        messagebox.showinfo("Success", "Order added.")
+
+        # Clear fields
+        self.company_combobox.set("")
+        self.item_category_combobox.set("")
+        self.order_status_combobox.set("")
+        self.lpo_status_combobox.set("")
+        self.invoice_status_combobox.set("")
+        self.missing_items_var.set("")
+        self.delivery_date_var.set("")
+        self.installation_date_var.set("")
+
+    def refresh_orders_tree(self):
+        if self.orders_tree is None:
+            return  # Orders tab not opened yet
+        self.update_orders_tab_title()
+        if self.selected_project_id is None:
+            self.orders_tree.set_rows(None)
+            return
+        self.orders_tree.set_rows(ds.lookup('Orders', 'ProjectID', self.selected_project_id))
+
+    def format_order_values(self, row):
+        inv_uploaded = "Yes" if row['InvoiceCopyPath'] else "No"
+        return (
+            row['OrderID'],
+            row['Company'],
+            row['ItemCategory'],
+            row['OrderStatus'],
+            row['LPOStatus'],
+            inv_uploaded,
+            row['InvoiceStatus'],
+            row['MissingItems'],
+            ds.date_cell('Orders', row, 'DeliveryDate'),
+            ds.date_cell('Orders', row, 'InstallationDate')
+        )
+
+    def delete_order(self):
+        selection = self.orders_tree.selection()
+        if not selection:
+            messagebox.showerror("Error", "Select order(s) to delete.")
+            return
+        confirm = messagebox.askyesno("Confirm", "Delete selected order(s)?")
+        if not confirm:
+            return
+        order_ids = []
+        for item in selection:
+            oid = self.orders_tree.item(item, "values")[0]
+            order_ids.append(int(oid))
+        ds.delete_rows('Orders', 'OrderID', order_ids)
+        self.refresh_orders_tree()
+        messagebox.showinfo("Success", f"Deleted {len(selection)} order(s).")
+
+    def show_orders_tree_context_menu(self, event):
+        row_id = self.orders_tree.identify_row(event.y)
+        if row_id:
+            self.orders_tree.selection_set(row_id)
+            if not self.orders_tree_context_menu:
+                self.orders_tree_context_menu = tk.Menu(self, tearoff=0)
+                self.orders_tree_context_menu.add_command(label="Upload Invoice", command=self.upload_invoice)
+                self.orders_tree_context_menu.add_command(label="Open Invoice", command=self.open_invoice_copy)
+                self.orders_tree_context_menu.add_command(label="Edit Order/LPO Status",
+                                                          command=self.edit_order_lpo_status)
+                self.orders_tree_context_menu.add_command(label="Edit Invoice Status", command=self.edit_invoice_status)
+                self.orders_tree_context_menu.add_command(label="Edit Additional Fields",
+                                                          command=self.edit_additional_fields)
+                self.orders_tree_context_menu.add_command(label="Edit Company", command=self.edit_company)
+            self.orders_tree_context_menu.post(event.x_root, event.y_root)
+
+    def get_selected_order_id(self):
+        sel = self.orders_tree.selection()
+        if not sel:
+            return None
+        val = self.orders_tree.item(sel[0], "values")[0]
+        return int(val)
+
+    def upload_invoice(self):
+        oid = self.get_selected_order_id()
+        if oid is None:
+            return
+        file_path = filedialog.askopenfilename(
+            title="Select Invoice Copy",
+            filetypes=[("Supported Files", "*.pdf;*.jpg;*.jpeg;*.png"), ("All Files", "*.*")]
+        )
+        if not file_path:
+            return
+        if ds.find_row('Orders', oid) is not None:
+            ds.update_row('Orders', oid, {'InvoiceCopyPath': file_path})
+            self.refresh_orders_tree()
+            messagebox.showinfo("Success", "Invoice uploaded.")
+
+    def open_invoice_copy(self):
+        oid = self.get_selected_order_id()
+        if oid is None:
+            return
+        row = ds.find_row('Orders', oid)
+        if row is None:
+            return
+        path = row['InvoiceCopyPath']
+        if path and os.path.exists(path):
+            os.startfile(path)
+        else:
+            messagebox.showerror("Error", "Invoice not found.")
+
+    def edit_order_lpo_status(self):
+        oid = self.get_selected_order_id()
+        if oid is None:
+            return
+        row = ds.find_row('Orders', oid)
+        if row is None:
+            return
+        old_order_status = row['OrderStatus']
+        old_lpo_status = row['LPOStatus']
+
+        top = tk.Toplevel(self)
+        top.title("Edit Order & LPO Status")
+
+        tk.Label(top, text="Order Status:").grid(row=0, column=0, padx=5, pady=5)
+        order_var = tk.StringVar(value=old_order_status)
+        order_combo = ttk.Combobox(top, textvariable=order_var, values=ORDER_STATUSES, state="readonly")
+        order_combo.grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(top, text="LPO Status:").grid(row=1, column=0, padx=5, pady=5)
+        lpo_var = tk.StringVar(value=old_lpo_status)
+        lpo_combo = ttk.Combobox(top, textvariable=lpo_var, values=LPO_STATUSES, state="readonly")
+        lpo_combo.grid(row=1, column=1, padx=5, pady=5)
+
+        def save_changes():
+            ds.update_row('Orders', oid, {'OrderStatus': order_var.get(), 'LPOStatus': lpo_var.get()})
+            self.refresh_orders_tree()
+            top.destroy()
+
+        tk.Button(top, text="Save Changes", command=save_changes).grid(row=2, column=0, columnspan=2, pady=10)
+
+    def edit_invoice_status(self):
+        oid = self.get_selected_order_id()
+        if oid is None:
+            return
+        row = ds.find_row('Orders', oid)
+        if row is None:
+            return
+        old_inv_status = row['InvoiceStatus']
+
+        top = tk.Toplevel(self)
+        top.title("Edit Invoice Status")
+        tk.Label(top, text="Invoice Status:").grid(row=0, column=0, padx=5, pady=5)
+        inv_var = tk.StringVar(value=old_inv_status)
+        inv_combo = ttk.Combobox(top, textvariable=inv_var, values=INVOICE_STATUSES, state="readonly")
+        inv_combo.grid(row=0, column=1, padx=5, pady=5)
+
+        def save_changes():
+            ds.update_row('Orders', oid, {'InvoiceStatus': inv_var.get()})
+            self.refresh_orders_tree()
+            top.destroy()
+
+        tk.Button(top, text="Save Changes", command=save_changes).grid(row=1, column=0, columnspan=2, pady=10)
+
+    def edit_additional_fields(self):
+        oid = self.get_selected_order_id()
+        if oid is None:
+            return
+        row = ds.find_row('Orders', oid)
+        if row is None:
+            return
+        old_missing = row['MissingItems']
+        old_delivery = ds.date_cell('Orders', row, 'DeliveryDate')
+        old_installation = ds.date_cell('Orders', row, 'InstallationDate')
+
+        top = tk.Toplevel(self)
+        top.title("Edit Additional Fields")
+
+        tk.Label(top, text="Missing Items:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        missing_var = tk.StringVar(value=old_missing)
+        tk.Entry(top, textvariable=missing_var, width=30).grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(top, text="Delivery Date:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        delivery_var = tk.StringVar(value=old_delivery)
+        tk.Entry(top, textvariable=delivery_var, width=30).grid(row=1, column=1, padx=5, pady=5)
+
+        tk.Label(top, text="Installation Date:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        install_var = tk.StringVar(value=old_installation)
+        tk.Entry(top, textvariable=install_var, width=30).grid(row=2, column=1, padx=5, pady=5)
+
+        def save_changes():
+            if not (self.confirm_date(delivery_var.get(), "Delivery date", parent=top)
+                    and self.confirm_date(install_var.get(), "Installation date", parent=top)):
+                return
+            ds.update_row('Orders', oid, {
+                'MissingItems': missing_var.get(),
+                'DeliveryDate': delivery_var.get(),
+                'InstallationDate': install_var.get(),
+            })
+            self.refresh_orders_tree()
+            top.destroy()
+
+        tk.Button(top, text="Save Changes", command=save_changes).grid(row=3, column=0, columnspan=2, pady=10)
+
+    def edit_company(self):
+        oid = self.get_selected_order_id()
+        if oid is None:
+            return
+        row = ds.find_row('Orders', oid)
+        if row is None:
+            return
+        old_company = row['Company']
+
+        top = tk.Toplevel(self)
+        top.title("Edit Company")
+
+        tk.Label(top, text="Company:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        comp_var = tk.StringVar(value=old_company)
+        comp_combo = ttk.Combobox(top, textvariable=comp_var, values=COMPANY_NAMES, state="readonly", width=30)
+        comp_combo.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+
+        def save_changes():
+            ds.update_row('Orders', oid, {'Company': comp_var.get()})
+            self.refresh_orders_tree()
+            top.destroy()
+
+        tk.Button(top, text="Save Changes", command=save_changes).grid(row=1, column=0, columnspan=2, pady=10)
+
+    # --------------------------------------------------------
+    # SCHEDULE TAB
+    # --------------------------------------------------------
+    def build_schedule_tab(self):
+        frame = self.schedule_tab
+        self.selected_project_label_schedule = tk.Label(frame, text="Selected Project: None")
+        self.selected_project_label_schedule.pack(pady=5)
+        self.schedule_summary_label = tk.Label(frame, text="", justify=tk.LEFT, wraplength=1200)
+        self.schedule_summary_label.pack(pady=5)
+
+        tree_frame = tk.LabelFrame(frame, text="Critical Path (days from project start)", padx=10, pady=10)
+        tree_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        columns = ("TaskID", "Task", "Duration", "ES", "EF", "LS", "LF", "Float", "Critical")
+        self.schedule_tree = VirtualTreeview(tree_frame, 'task_id', self.format_schedule_values, columns)
+        for col in columns:
+            self.schedule_tree.heading(col, text=col)
+            self.schedule_tree.column(col, width=250 if col == "Task" else 80, anchor="w")
+        self.schedule_tree.pack(fill="both", expand=True)
+
+        dep_frame = tk.LabelFrame(frame, text="Dependencies (finish-to-start)", padx=10, pady=10)
+        dep_frame.pack(fill="x", padx=5, pady=5)
+        tk.Label(dep_frame, text="Predecessor ID:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
+        self.dep_predecessor_entry = tk.Entry(dep_frame, width=10)
+        self.dep_predecessor_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        tk.Label(dep_frame, text="Successor ID:").grid(row=0, column=2, padx=5, pady=5, sticky="e")
+        self.dep_successor_entry = tk.Entry(dep_frame, width=10)
+        self.dep_successor_entry.grid(row=0, column=3, padx=5, pady=5, sticky="w")
+        tk.Label(dep_frame, text="Lag (days):").grid(row=0, column=4, padx=5, pady=5, sticky="e")
+        self.dep_lag_entry = tk.Entry(dep_frame, width=10)
+        self.dep_lag_entry.grid(row=0, column=5, padx=5, pady=5, sticky="w")
+        tk.Button(dep_frame, text="Add Dependency", command=self.add_dependency).grid(row=0, column=6, padx=5, pady=5)
+
+        self.dependency_listbox = VirtualListbox(dep_frame, 'DependencyID', self.format_dependency_line, height=6)
+        self.dependency_listbox.grid(row=1, column=0, columnspan=7, padx=5, pady=5, sticky="we")
+        dep_frame.columnconfigure(6, weight=1)
+        tk.Button(dep_frame, text="Delete Selected Dependency", command=self.delete_dependency)\
+            .grid(row=2, column=0, columnspan=7, pady=5)
+
+        self.refresh_schedule()
+
+    def refresh_schedule(self):
+        if self.schedule_tree is None:
+            return  # Schedule tab not opened yet
+        if self.selected_project_id is None:
+            self.selected_project_label_schedule.config(text="Selected Project: None")
+            self.schedule_summary_label.config(text="")
+            self.schedule_tree.set_rows(None)
+            self.dependency_listbox.set_rows(None)
+            return
+        row = ds.find_row('Projects', self.selected_project_id)
+        if row is not None:
+            self.selected_project_label_schedule.config(text=f"Selected Project: {row['ProjectName']}")
+        summary = schedule.scheduler.project(self.selected_project_id)
+        rows = schedule.scheduler.frame(self.selected_project_id)
+        if summary.cycle:
+            text = ("Dependency cycle, not scheduled: "
+                    + " -> ".join(str(tid) for tid in summary.cycle + summary.cycle[:1])
+                    + ". Delete one of these dependencies.")
+        else:
+            text = (f"Finish: day {summary.finish:g} | Critical path: "
+                    + (" -> ".join(str(tid) for tid in summary.critical_path) or "none")
+                    + f" | {int(rows['critical'].sum())} critical task(s) in all")
+        self.schedule_summary_label.config(text=text)
+        self.schedule_tree.set_rows(rows)
+        self.dependency_listbox.set_rows(ds.lookup('Dependencies', 'ProjectID', self.selected_project_id))
+
+    def format_schedule_values(self, row):
+        task = ds.find_row('Tasks', row['task_id'])
+        name = task['TaskName'] if task is not None else ""
+        duration = task['Duration'] if task is not None else ""
+        days = [row[col] for col in ('early_start', 'early_finish', 'late_start', 'late_finish', 'total_float')]
+        days = ["" if value is None or value != value else f"{value:g}" for value in days]
+        return (row['task_id'], name, duration, *days, "Yes" if row['critical'] else "")
+
+    def format_dependency_line(self, row):
+        lag = f" + {row['LagDays']:g} days" if row['LagDays'] else ""
+        names = []
+        for tid in (row['PredecessorID'], row['SuccessorID']):
+            task = ds.find_row('Tasks', tid)
+            names.append(f"{tid} ({task['TaskName']})" if task is not None else f"{tid} (deleted)")
+        return f"ID {row['DependencyID']}: {names[0]} finishes -> {names[1]} starts{lag}"
+
+    def add_dependency(self):
+        if self.selected_project_id is None:
+            messagebox.showwarning("Selection Error", "Select a project first.")
+            return
+        try:
+            pred_id = int(self.dep_predecessor_entry.get().strip())
+            succ_id = int(self.dep_successor_entry.get().strip())
+        except ValueError:
+            messagebox.showwarning("Input Error", "Predecessor and Successor must be task IDs.")
+            return
+        lag_str = self.dep_lag_entry.get().strip()
+        try:
+            lag = float(lag_str) if lag_str else 0.0
+        except ValueError:
+            messagebox.showwarning("Input Error", "Lag must be a number of days.")
+            return
+        pred = ds.find_row('Tasks', pred_id)
+        if pred is None or pred['ProjectID'] != self.selected_project_id:
+            messagebox.showwarning("Input Error", "Both tasks must belong to the selected project.")
+            return
+        problem = schedule.scheduler.check_link(pred_id, succ_id)
+        if problem is not None:
+            messagebox.showwarning("Input Error", problem)
+            return
+        ds.insert_row('Dependencies', {
+            'DependencyID': ds.next_id('Dependencies'),
+            'ProjectID': self.selected_project_id,
+            'PredecessorID': pred_id,
+            'SuccessorID': succ_id,
+            'LagDays': lag,
+        })
+        self.refresh_schedule()
+        for entry in (self.dep_predecessor_entry, self.dep_successor_entry, self.dep_lag_entry):
+            entry.delete(0, tk.END)
+
+    def delete_dependency(self):
+        keys = self.dependency_listbox.selected_keys()
+        if not keys:
+            messagebox.showwarning("Selection Error", "Select a dependency to delete.")
+            return
+        ds.delete_rows('Dependencies', 'DependencyID', keys)
+        self.refresh_schedule()
+
+    # --------------------------------------------------------
+    # LOOKAHEAD TAB
+    # --------------------------------------------------------
+    def confirm_date(self, value, label, parent=None):
+        """True if value is blank or a YYYY-MM-DD date, or the user keeps it anyway."""
+        if ds.is_valid_date(value.strip()):
+            return True
+        return messagebox.askyesno(
+            "Date Check",
+            f"{label} '{value}' is not a YYYY-MM-DD date, so it will not show up in the "
+            f"Lookahead tab (it is listed there as an invalid date).\n\nSave it anyway?",
+            parent=parent or self,
+        )
+
+    def build_lookahead_tab(self):
+        frame = self.lookahead_tab
+
+        top_frame = tk.Frame(frame)
+        top_frame.pack(fill="x", padx=5, pady=5)
+        tk.Label(top_frame, text="Days ahead:").pack(side=tk.LEFT)
+        self.lookahead_days_var = tk.StringVar(value=str(duedates.LOOKAHEAD_DAYS))
+        tk.Spinbox(top_frame, from_=1, to=365, width=5, textvariable=self.lookahead_days_var,
+                   command=self.refresh_lookahead).pack(side=tk.LEFT, padx=5)
+        tk.Button(top_frame, text="Refresh", command=self.refresh_lookahead).pack(side=tk.LEFT, padx=5)
+        self.lookahead_summary_label = tk.Label(top_frame, text="")
+        self.lookahead_summary_label.pack(side=tk.LEFT, padx=10)
+
+        tree_frame = tk.LabelFrame(frame, text="All Projects (double-click to open)", padx=10, pady=10)
+        tree_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        columns = ("When", "Date", "Project", "Item", "Details", "Status")
+        self.lookahead_tree = VirtualTreeview(tree_frame, 'Key', self.format_lookahead_values, columns)
+        for col in columns:
+            self.lookahead_tree.heading(col, text=col)
+            self.lookahead_tree.column(col, width=200 if col in ("Item", "Details") else 110, anchor="w")
+        self.lookahead_tree.pack(fill="both", expand=True)
+        self.lookahead_tree.bind("<Double-1>", self.on_lookahead_activated)
+
+        self.refresh_lookahead()
+
+    def refresh_lookahead(self):
+        try:
+            days = max(0, int(self.lookahead_days_var.get()))
+        except ValueError:
+            days = duedates.LOOKAHEAD_DAYS
+        index = duedates.index
+        groups = [
+            ("Overdue", index.overdue()),
+            (f"Due in {days} days", index.due_within(days)),
+            ("Delivery this week", index.deliveries_this_week()),
+        ]
+        rows = [(when, item.sheet, item.column, item.key, item.date) for when, items in groups for item in items]
+        invalid = index.invalid()
+        rows += [("Invalid date", sheet, column, key, text) for sheet, column, key, text in invalid]
+        self.lookahead_rows = pd.DataFrame(rows, columns=['When', 'Sheet', 'Column', 'ID', 'Date'])
+        self.lookahead_rows['Key'] = [f"{when}:{sheet}:{column}:{key}" for when, sheet, column, key, _ in rows]
+        self.lookahead_tree.set_rows(self.lookahead_rows)
+        self.lookahead_summary_label.config(text=", ".join(
+            [f"{len(items)} {when.lower()}" for when, items in groups] + [f"{len(invalid)} invalid date(s)"]
+        ))
+
+    def format_lookahead_values(self, row):
+        item = ds.find_row(row['Sheet'], row['ID'])
+        if item is None:
+            return (row['When'], ds.format_date(row['Date']), "", "", "", "")
+        project = ds.find_row('Projects', item['ProjectID'])
+        project_name = project['ProjectName'] if project is not None else ""
+        if row['Sheet'] == 'PendingWork':
+            task = ds.find_row('Tasks', item['TaskID'])
+            what = f"Task: {task['TaskName']}" if task is not None else f"Task {item['TaskID']}"
+            details, status = item['Description'], item['Status']
+        else:
+            what = f"Order {row['ID']}: {item['Company']}"
+            details, status = f"{row['Column']} - {item['ItemCategory']}", item['OrderStatus']
+        return (row['When'], ds.format_date(row['Date']), project_name, what, details, status)
+
+    def on_lookahead_activated(self, event):
+        keys = self.lookahead_tree.selected_keys()
+        if not keys:
+            return
+        row = self.lookahead_rows.set_index('Key').loc[keys[0]]
+        item = ds.find_row(row['Sheet'], row['ID'])
+        if item is not None:
+            task_id = item['TaskID'] if row['Sheet'] == 'PendingWork' else None
+            self.jump_to(row['Sheet'], row['ID'], item['ProjectID'], task_id)
+
+    # --------------------------------------------------------
+    # REPORTS TAB
+    # --------------------------------------------------------
+    def build_reports_tab(self):
+        frame = self.reports_tab
+        self.selected_project_label_report = tk.Label(frame, text="Selected Project: None")
+        self.selected_project_label_report.pack(pady=5)
+
+        tk.Button(frame, text="Generate Project Report", command=self.generate_project_report).pack(pady=5)
+        tk.Button(frame, text="Generate All Project Reports...", command=self.generate_all_reports).pack(pady=5)
+
+        job_frame = tk.Frame(frame)
+        job_frame.pack(pady=5)
+        self.report_progress = ttk.Progressbar(job_frame, length=300, mode="determinate")
+        self.report_progress.pack(side=tk.LEFT, padx=5)
+        self.report_cancel_button = tk.Button(job_frame, text="Cancel", command=self.cancel_report, state=tk.DISABLED)
+        self.report_cancel_button.pack(side=tk.LEFT, padx=5)
+        self.report_status_label = tk.Label(job_frame, text="")
+        self.report_status_label.pack(side=tk.LEFT, padx=5)
+
+        tk.Button(frame, text="Export All Data to Excel", command=self.export_all_data_to_excel).pack(pady=5)
+        tk.Button(frame, text="Compact Database Now", command=self.compact_database).pack(pady=5)
+
+        self.report_charts_frame = tk.Frame(frame)
+        self.report_charts_frame.pack(fill="both", expand=True)
+
+    def generate_project_report(self):
+        if self.report_job is not None:
+            messagebox.showinfo("Report Running", "A report is already being generated.")
+            return
+        if self.selected_project_id is None:
+            messagebox.showwarning("Selection Error", "Select a project first.")
+            return
+        # Project row, sub-progress, tasks, pending work and orders, copied out of the datastore
+        snapshot = reports.project_snapshot(self.selected_project_id)
+        if snapshot is None:
+            messagebox.showwarning("No Data", "Project not found.")
+            return
+
+        project_name = snapshot['project_name']
+        overall_progress = snapshot['overall_progress']
+        sub_data = snapshot['sub_data']
+        proj_tasks = snapshot['tasks']
+
+        # Sub-progress (pie) and tasks progress (bar), updated in place on the one report chart
+        if self.report_chart is None:
+            self.report_chart = charts.ReportChart(master=self.report_charts_frame)
+        self.report_chart.update(project_name, overall_progress, sub_data, proj_tasks)
+
+        # The PDF is built from a snapshot in a worker process (or comes straight from the
+        # report cache if this data was reported before); poll_report_job opens it when ready
+        try:
+            self.report_job = reports.ReportJob(snapshot, cache=reports.report_cache)
+        except Exception as e:
+            messagebox.showerror("PDF Error", f"Failed to generate PDF: {e}")
+            return
+        self.report_progress['value'] = 0
+        self.report_cancel_button.config(state=tk.NORMAL)
+        self.report_status_label.config(text=f"Building PDF for {project_name}...")
+        self.after(REPORT_POLL_MS, self.poll_report_job)
+
+    def poll_report_job(self):
+        job = self.report_job
+        if job is None:
+            return
+        message = job.poll()
+        if message is not None and message[0] == 'progress':
+            _, done, total = message
+            self.report_progress['value'] = 100.0 * done / total
+        if not job.finished:
+            self.after(REPORT_POLL_MS, self.poll_report_job)
+            return
+
+        self.report_job = None
+        self.report_cancel_button.config(state=tk.DISABLED)
+        if job.result[0] == 'done':
+            self.report_progress['value'] = 100
+            self.report_status_label.config(text="PDF ready.")
+            webbrowser.open_new(job.result[1])
+            failures = job.result[2] if len(job.result) > 2 else []
+            if failures:
+                details = "\n".join(f"{name}: {error}" for name, error in failures[:20])
+                messagebox.showwarning(
+                    "Some Reports Failed", f"{len(failures)} project report(s) could not be built:\n{details}"
+                )
+        elif job.result[0] == 'cancelled':
+            self.report_progress['value'] = 0
+            self.report_status_label.config(text="PDF cancelled.")
+        else:
+            self.report_progress['value'] = 0
+            self.report_status_label.config(text="PDF failed.")
+            messagebox.showerror("PDF Error", f"Failed to generate PDF: {job.result[1]}")
+
+    def generate_all_reports(self):
+        if self.report_job is not None:
+            messagebox.showinfo("Report Running", "A report is already being generated.")
+            return
+        if ds.projects_df.empty:
+            messagebox.showwarning("No Data", "There are no projects to report on.")
+            return
+        directory = filedialog.askdirectory(title="Folder for Project Reports")
+        if not directory:
+            return
+        # One project per pool worker; poll_report_job opens the index PDF at the end
+        try:
+            self.report_job = reports.PortfolioJob(directory, cache=reports.report_cache)
+        except Exception as e:
+            messagebox.showerror("PDF Error", f"Failed to start the reports: {e}")
+            return
+        self.report_progress['value'] = 0
+        self.report_cancel_button.config(state=tk.NORMAL)
+        self.report_status_label.config(text=f"Building {self.report_job.total} project PDFs...")
+        self.after(REPORT_POLL_MS, self.poll_report_job)
+
+    def cancel_report(self):
+        if self.report_job is not None:
+            self.report_job.cancel()
+            self.report_cancel_button.config(state=tk.DISABLED)
+            self.report_status_label.config(text="Cancelling...")
+
+    def export_all_data_to_excel(self):
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+            )
+            if not file_path:
+                return
+
+            # Streams each sheet through a write-only workbook (see export.py)
+            export.export_workbook(file_path)
+            messagebox.showinfo("Success", f"Data exported successfully to {file_path}")
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export data: {e}")
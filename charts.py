@@ -0,0 +1,169 @@
+"""
+The chart shown in the Reports tab.
+
+ReportChart owns a single matplotlib Figure (not registered with pyplot) and,
+inside the app, a single FigureCanvasTkAgg. Each report updates the existing
+pie wedges, labels and bars in place and asks for a draw_idle(), so showing
+500 reports costs no more memory than showing one. Run this module directly
+to check that:  python charts.py --iterations 500
+"""
+import argparse
+import gc
+import math
+import random
+
+import pandas as pd
+
+# Same layout as the original per-report figure
+FIGURE_SIZE = (10, 4)
+PIE_START_ANGLE = 140
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.6
+BAR_HEIGHT = 0.8
+
+
+def _number(value):
+    value = pd.to_numeric(value, errors='coerce')
+    return 0.0 if pd.isna(value) else float(value)
+
+
+class ReportChart:
+    """Sub-progress pie and task-progress bars, drawn on one reusable figure."""
+
+    def __init__(self, master=None):
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=FIGURE_SIZE)
+        self.pie_axes, self.bar_axes = self.figure.subplots(1, 2)
+        if master is not None:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.figure)
+        self.title = self.figure.suptitle("")
+        self._categories = None
+        self._wedges = self._labels = self._pct_texts = []
+        self._empty_text = self.pie_axes.text(0, 0, "No sub-progress yet", ha='center', va='center', visible=False)
+        self._bars = []
+
+        self.pie_axes.set_title("Sub-Progress Distribution")
+        self.bar_axes.set_xlim(0, 100)
+        self.bar_axes.set_xlabel("Progress (%)")
+        self.bar_axes.set_ylabel("Tasks")
+        self.bar_axes.set_title("Tasks Progress")
+
+    def update(self, project_name, overall_progress, sub_data, tasks):
+        """Show a project; tasks is a list of dicts with TaskName and Progress."""
+        self.title.set_text(f"Project: {project_name} (Overall: {overall_progress:.2f}%)")
+        self._update_pie(sub_data)
+        self._update_bars(tasks)
+        self.canvas.draw_idle()
+
+    def _update_pie(self, sub_data):
+        categories = list(sub_data)
+        if categories != self._categories:
+            # First use (or a different category set): create the wedges once
+            for artist in self._wedges + self._labels + self._pct_texts:
+                artist.remove()
+            self._wedges, self._labels, self._pct_texts = self.pie_axes.pie(
+                [1] * len(categories), labels=categories, autopct='%1.1f%%', startangle=PIE_START_ANGLE,
+                labeldistance=PIE_LABEL_DISTANCE, pctdistance=PIE_PCT_DISTANCE,
+            )
+            self._wedges, self._labels, self._pct_texts = list(self._wedges), list(self._labels), list(self._pct_texts)
+            self._categories = categories
+
+        values = [max(0.0, _number(v)) for v in sub_data.values()]
+        total = sum(values)
+        self._empty_text.set_visible(total <= 0)
+        start = PIE_START_ANGLE
+        for wedge, label, pct_text, value in zip(self._wedges, self._labels, self._pct_texts, values):
+            for artist in (wedge, label, pct_text):
+                artist.set_visible(total > 0)
+            if total <= 0:
+                continue
+            sweep = 360.0 * value / total
+            wedge.set_theta1(start)
+            wedge.set_theta2(start + sweep)
+            middle = math.radians(start + sweep / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            pct_text.set_position((PIE_PCT_DISTANCE * x, PIE_PCT_DISTANCE * y))
+            pct_text.set_text('%1.1f%%' % (100.0 * value / total))
+            start += sweep
+
+    def _update_bars(self, tasks):
+        names = [str(t['TaskName']) for t in tasks]
+        widths = [_number(t['Progress']) for t in tasks]
+        # Reuse the existing bars; only the difference in count is added or removed
+        while len(self._bars) > len(tasks):
+            self._bars.pop().remove()
+        if len(tasks) > len(self._bars):
+            start = len(self._bars)
+            container = self.bar_axes.barh(
+                range(start, len(tasks)), widths[start:], height=BAR_HEIGHT, color='skyblue'
+            )
+            # The axes would otherwise keep every BarContainer (and its bars) alive
+            self.bar_axes.containers.remove(container)
+            self._bars.extend(container.patches)
+        for position, (bar, width) in enumerate(zip(self._bars, widths)):
+            bar.set_width(width)
+            bar.set_y(position - BAR_HEIGHT / 2)
+        self.bar_axes.set_yticks(range(len(names)))
+        self.bar_axes.set_yticklabels(names)
+        self.bar_axes.set_ylim(-0.5, max(len(names), 1) - 0.5)
+        self.bar_axes.set_xlim(0, 100)
+
+    def artist_count(self):
+        """Number of artists in the figure; stays flat across updates."""
+        return len(self.figure.findobj())
+
+    def close(self):
+        """Release the figure and, inside the app, its Tk widget."""
+        if hasattr(self.canvas, 'get_tk_widget'):
+            self.canvas.get_tk_widget().destroy()
+        self.figure.clear()
+        self._wedges = self._labels = self._pct_texts = self._bars = []
+
+
+def memory_check(iterations=500, categories=18, tasks=30):
+    """Show `iterations` random reports on one chart.
+
+    Returns (artists, live Python objects) measured after the first report
+    and again after showing that same report at the end.
+    """
+    chart = ReportChart()
+    sub_names = [f"Category {i}" for i in range(categories)]
+
+    def one_report(i):
+        rng = random.Random(i)
+        sub_data = {name: rng.uniform(0, 100) * (i % 7 != 0) for name in sub_names}
+        task_rows = [{'TaskName': f"Task {j}", 'Progress': rng.uniform(0, 100)}
+                     for j in range(rng.randint(0, tasks))]
+        chart.update(f"Project {i}", rng.uniform(0, 100), sub_data, task_rows)
+        chart.canvas.draw()
+
+    def measure():
+        gc.collect()
+        return chart.artist_count(), len(gc.get_objects())
+
+    one_report(0)
+    before = measure()
+    for i in range(1, iterations + 1):
+        one_report(i)
+    one_report(0)
+    after = measure()
+    chart.close()
+    return before, after
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the report chart does not grow over many reports")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    (artists_before, objects_before), (artists_after, objects_after) = memory_check(args.iterations)
+    print(f"After {args.iterations} reports:")
+    print(f"  Artists: {artists_before} -> {artists_after}")
+    print(f"  Live Python objects: {objects_before} -> {objects_after}")
@@ -0,0 +1,1433 @@
+"""
+Data layer for the Project Tracking App.
+
+Holds the sheet schemas, the in-memory DataFrames and their persistence.
+Every row-level change goes through insert_row(s) / update_row(s) / delete_rows,
+which apply it in memory and hand it to the active storage backend: either
+database.xlsx plus an append-only change journal (the workbook itself is
+only rewritten by compact()), or a SQLite file updated one row at a time.
+New primary keys come from per-sheet sequences (next_id / next_ids) that are
+stored alongside the data, so IDs are never reused after a delete, and so
+are the app's settings (get_setting / set_setting).
+"""
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+# ------------------------------------------------------------
+# GLOBAL SETTINGS / DATAFRAMES
+# ------------------------------------------------------------
+DATABASE_FILE = "database.xlsx"
+JOURNAL_FILE = DATABASE_FILE + ".journal"
+SQLITE_FILE = "database.db"
+
+# Bump when the cached sheet layout changes so stale database.xlsx.cache files are ignored
+CACHE_VERSION = 5
+
+# "excel" (database.xlsx + journal) or "sqlite" (database.db)
+STORAGE_BACKEND = os.environ.get("PROJECT_TRACKER_STORAGE", "excel")
+
+# Quiet period after the last edit before the background compaction runs
+SAVE_DEBOUNCE_SECONDS = 10
+
+# Columns for each sheet
+PROJECT_COLUMNS = [
+    'ProjectID', 'ProjectName', 'Notes',
+    'ElectricalProgress', 'SSProgress', 'PlumbingProgress', 'ACProgress',
+    'Wall Tiles Progress', 'Wall Partion Progress', 'floortiles progress',
+    'Ceiling progress', 'Furniture Progress', 'FAFF Progress', 'Fire Suppersion',
+    'IT', 'Signage', 'External Work', 'FireSuppressionProgress', 'OverallProgress',
+    'Constraction Progress', 'ColdRoom Progress', 'Equipment Progress',
+]
+
+TASK_COLUMNS = [
+    'TaskID', 'ProjectID', 'TaskName', 'Duration', 'Weight', 'Progress',
+    'ParentTaskID', 'Category', 'PendingItems'  # Added PendingItems
+]
+
+ORDER_COLUMNS = [
+    'OrderID', 'ProjectID', 'Company', 'ItemCategory', 'OrderStatus', 'LPOStatus',
+    'InvoiceCopyPath', 'InvoiceStatus', 'MissingItems', 'DeliveryDate', 'InstallationDate'
+]
+
+# Sub-progress categories for tasks -> project subprogress
+TASK_SUBCATEGORIES = {
+    'Electrical': 'ElectricalProgress',
+    'S/S': 'SSProgress',
+    'Plumbing': 'PlumbingProgress',
+    'AC': 'ACProgress',
+    'Wall Tiles': 'Wall Tiles Progress',
+    'Wall Partition': 'Wall Partion Progress',
+    'Floor Tiles': 'floortiles progress',
+    'Ceiling': 'Ceiling progress',
+    'Furniture': 'Furniture Progress',
+    'FAFF': 'FAFF Progress',
+    'Fire Suppression': 'Fire Suppersion',
+    'IT': 'IT',
+    'Signage': 'Signage',
+    'External Work': 'External Work',
+    'Fire Suppression2': 'FireSuppressionProgress',
+    'Constraction': 'Constraction Progress',
+    'Cold Room': 'ColdRoom Progress',
+    'Equipment': 'Equipment Progress',
+}
+
+PENDING_WORK_COLUMNS = ['PendingID', 'TaskID', 'ProjectID', 'Description', 'Status', 'DueDate']
+
+# Finish-to-start links: SuccessorID may start LagDays after PredecessorID finishes
+DEPENDENCY_COLUMNS = ['DependencyID', 'ProjectID', 'PredecessorID', 'SuccessorID', 'LagDays']
+
+# Sheet name -> (module-level DataFrame name, primary key column, columns)
+TABLES = {
+    'Projects': ('projects_df', 'ProjectID', PROJECT_COLUMNS),
+    'Tasks': ('tasks_df', 'TaskID', TASK_COLUMNS),
+    'Orders': ('orders_df', 'OrderID', ORDER_COLUMNS),
+    'PendingWork': ('pending_work_df', 'PendingID', PENDING_WORK_COLUMNS),
+    'Dependencies': ('dependencies_df', 'DependencyID', DEPENDENCY_COLUMNS),
+}
+
+# Sheet/table holding each sheet's next primary key (Sheet, NextID)
+SEQUENCE_SHEET = 'Sequences'
+SEQUENCE_COLUMNS = ['Sheet', 'NextID']
+
+# Sheet/table holding settings that belong with the data (Key, Value)
+SETTINGS_SHEET = 'Settings'
+SETTINGS_COLUMNS = ['Key', 'Value']
+
+# Side sheets saved with the data besides TABLES, and their columns
+SIDE_SHEETS = {SEQUENCE_SHEET: SEQUENCE_COLUMNS, SETTINGS_SHEET: SETTINGS_COLUMNS}
+
+# Cached (never written as a sheet) next to the tables: the original text of
+# date cells that are not dates, which is put back into the cells on save
+DATE_TEXT_SHEET = 'DateText'
+DATE_TEXT_COLUMNS = ['Sheet', 'Column', 'Key', 'Text']
+
+# Foreign keys that get a secondary index in the SQLite backend
+INDEXED_COLUMNS = {
+    'Tasks': ['ProjectID'],
+    'Orders': ['ProjectID'],
+    'PendingWork': ['TaskID', 'ProjectID'],
+    'Dependencies': ['ProjectID', 'PredecessorID', 'SuccessorID'],
+}
+
+# Predefined reference data for orders
+COMPANY_NAMES = [
+    "No Company Selected", "Al motqeen", "Oriantal", "Himalya", "Richline",
+    "Kain", "Al jaz", "A3", "Blue Rhain", "Wize guys", "Eco Air", "Tripode", "Metre"
+]
+ITEM_CATEGORIES = ["S/S", "Furniture", "Equipment", "Signage", "Fire Suppression", "Cold Room"]
+ORDER_STATUSES = ["Ordered", "Not Ordered"]
+LPO_STATUSES = ["LPO Received", "Pending", "LPO Pending"]
+INVOICE_STATUSES = ["Not Submitted", "25%", "50%", "100%"]
+PENDING_STATUSES = ["Pending", "In Progress", "Resolved"]
+
+
+# ------------------------------------------------------------
+# SCHEMA / DTYPES
+# ------------------------------------------------------------
+# How each typed column is held in memory: 'id' -> nullable Int32, 'date' ->
+# datetime64 (YYYY-MM-DD; NaT for text that is not a date, which is kept in
+# _date_text), a list -> categorical over those values plus any others found
+# in the data (plain text while a sheet has under two rows per category).
+# Everything else keeps the dtype pandas reads.
+ID_DTYPE = 'Int32'
+DATE_FORMAT = '%Y-%m-%d'
+
+SCHEMA = {
+    'Projects': {'ProjectID': 'id'},
+    'Tasks': {
+        'TaskID': 'id', 'ProjectID': 'id', 'ParentTaskID': 'id',
+        'Category': list(TASK_SUBCATEGORIES),
+    },
+    'Orders': {
+        'OrderID': 'id', 'ProjectID': 'id',
+        'Company': COMPANY_NAMES,
+        'ItemCategory': ITEM_CATEGORIES,
+        'OrderStatus': ORDER_STATUSES,
+        'LPOStatus': LPO_STATUSES,
+        'InvoiceStatus': INVOICE_STATUSES,
+        'DeliveryDate': 'date', 'InstallationDate': 'date',
+    },
+    'PendingWork': {
+        'PendingID': 'id', 'TaskID': 'id', 'ProjectID': 'id',
+        'Status': PENDING_STATUSES,
+        'DueDate': 'date',
+    },
+    'Dependencies': {
+        'DependencyID': 'id', 'ProjectID': 'id', 'PredecessorID': 'id', 'SuccessorID': 'id',
+    },
+}
+
+
+def format_date(value):
+    """A date cell as YYYY-MM-DD text (a blank date as ""); anything else is returned unchanged."""
+    if value is pd.NaT:
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+def parse_date_values(values):
+    """(dates, invalid) for a Series: datetime64 values (NaT when blank or not a
+    date) and a mask of the non-blank values that are not YYYY-MM-DD dates."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, pd.Series(False, index=values.index)
+    values = values.astype(object)
+    blank = values.isna() | (values.astype(str).str.strip() == '')
+    parsed = pd.to_datetime(values.where(~blank), errors='coerce', format='ISO8601')
+    return parsed, parsed.isna() & ~blank
+
+
+def is_valid_date(value):
+    """True for a blank or a YYYY-MM-DD date."""
+    return not parse_date_values(pd.Series([value], dtype=object))[1].iloc[0]
+
+
+def _dates_as_text(values):
+    return values.map(format_date).astype(object).where(values.notna(), None)
+
+
+def _typed_column(kind, values, current=None):
+    """Cast one column to its schema type; current is the dtype it must stay compatible with."""
+    if kind == 'id':
+        numbers = pd.to_numeric(values, errors='coerce')
+        try:
+            return numbers.astype(ID_DTYPE)
+        except (TypeError, ValueError):
+            # Fractional or out-of-range IDs: keep them as plain numbers
+            return numbers
+    if kind == 'date':
+        # Free text such as "TBD" becomes NaT here; callers keep it in _date_text
+        return parse_date_values(values)[0]
+    if current is not None and not isinstance(current, pd.CategoricalDtype):
+        # The table was loaded as plain text (see below); new rows match it
+        return values.astype(object)
+    known = list(current.categories) if isinstance(current, pd.CategoricalDtype) else list(kind)
+    seen = set(known)
+    extra = [v for v in pd.unique(values.dropna()) if v not in seen]
+    if current is None and len(values) < 2 * (len(known) + len(extra)):
+        # Under two rows per category the category table outweighs the codes it saves
+        return values.astype(object)
+    return values.astype(object).astype(pd.CategoricalDtype(known + extra))
+
+
+def apply_schema(sheet, df):
+    """Cast a freshly read sheet's columns to SCHEMA in place and return it."""
+    for column, kind in SCHEMA[sheet].items():
+        if column in df:
+            df[column] = _typed_column(kind, df[column])
+    return df
+
+
+def _conform(sheet, df, new):
+    """Cast new rows to df's column types (widening df where needed) so a concat keeps them."""
+    for column, kind in SCHEMA[sheet].items():
+        if column not in df or column not in new:
+            continue
+        current = df[column].dtype
+        new[column] = _typed_column(kind, new[column], current)
+        if isinstance(current, pd.CategoricalDtype) and new[column].dtype != current:
+            df[column] = df[column].cat.set_categories(new[column].cat.categories)
+    return new
+
+
+# (sheet, column) -> {primary key: original text} for the date cells that
+# are not dates; they hold NaT in the tables and get this text back on save
+_date_text = {(sheet, column): {} for sheet, columns in SCHEMA.items()
+              for column, kind in columns.items() if kind == 'date'}
+
+
+def _date_columns(sheet):
+    return [column for column, kind in SCHEMA[sheet].items() if kind == 'date']
+
+
+def _date_text_rows(sheet, df):
+    """(sheet, column, key, text) for every non-blank date cell of df that is not a date."""
+    rows = []
+    for column in _date_columns(sheet):
+        if column in df:
+            invalid = parse_date_values(df[column])[1].values
+            rows += [(sheet, column, _id_key(key), text)
+                     for key, text in zip(df.loc[invalid, TABLES[sheet][1]], df.loc[invalid, column])]
+    return rows
+
+
+def _id_key(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _note_date_text(sheet, column, keys, values):
+    """Keep (or forget) the text of date cells being set, by primary key."""
+    texts = _date_text[(sheet, column)]
+    invalid = parse_date_values(pd.Series(values, dtype=object))[1].tolist()
+    for key, value, bad in zip(keys, values, invalid):
+        if bad:
+            texts[_id_key(key)] = value
+        else:
+            texts.pop(_id_key(key), None)
+
+
+def _restore_date_text(frame):
+    for texts in _date_text.values():
+        texts.clear()
+    if frame is not None:
+        for sheet, column, key, text in frame.itertuples(index=False):
+            _date_text[(sheet, column)][key] = text
+
+
+def _date_text_frame():
+    return pd.DataFrame([(sheet, column, key, text) for (sheet, column), texts in _date_text.items()
+                         for key, text in texts.items()], columns=DATE_TEXT_COLUMNS)
+
+
+def _put_back_text(sheet, df, date_text):
+    columns = [column for column in _date_columns(sheet) if column in df]
+    if not columns:
+        return df
+    df = df.copy()
+    for column in columns:
+        values = df[column].astype(object).where(df[column].notna(), None)
+        texts = date_text.get((sheet, column))
+        if texts:
+            text = df[TABLES[sheet][1]].map(texts)
+            values = values.where(text.isna(), text)
+        df[column] = values
+    return df
+
+
+def with_date_text(sheet, df):
+    """A copy of rows of a sheet with its date columns as objects: Timestamps,
+    None for blanks and the original text where a cell is not a date."""
+    with lock:
+        return _put_back_text(sheet, df, _date_text)
+
+
+def date_cell(sheet, row, column):
+    """A row's date cell as YYYY-MM-DD text, its original text if it is not a date, or ""."""
+    text = _date_text[(sheet, column)].get(_id_key(row[TABLES[sheet][1]]))
+    return format_date(row[column]) if text is None else text
+
+
+def invalid_dates(sheet, column):
+    """{primary key: text} of the column's cells that are not dates."""
+    with lock:
+        return dict(_date_text[(sheet, column)])
+
+
+def _disk_frames(frames):
+    """frames from _snapshot() as written to a backend: date text put back, DATE_TEXT_SHEET dropped."""
+    date_text = {}
+    side = frames.get(DATE_TEXT_SHEET)
+    if side is not None:
+        for sheet, column, key, text in side.itertuples(index=False):
+            date_text.setdefault((sheet, column), {})[key] = text
+    return {sheet: _put_back_text(sheet, df, date_text) if sheet in TABLES else df
+            for sheet, df in frames.items() if sheet != DATE_TEXT_SHEET}
+
+
+def memory_report():
+    """(sheet, rows, bytes as plain loaded, bytes with the schema applied) per sheet."""
+    report = []
+    for sheet in TABLES:
+        df = get_table(sheet)
+        plain = df.copy()
+        for column, kind in SCHEMA[sheet].items():
+            if column not in plain:
+                continue
+            if kind == 'id':
+                plain[column] = plain[column].astype('float64')
+            elif kind == 'date':
+                plain[column] = _dates_as_text(plain[column])
+            else:
+                plain[column] = plain[column].astype(object)
+        report.append((sheet, len(df), int(plain.memory_usage(deep=True).sum()),
+                       int(df.memory_usage(deep=True).sum())))
+    return report
+
+
+# DataFrames in memory, read as ds.projects_df / tasks_df / orders_df /
+# pending_work_df / dependencies_df (see __getattr__) so that buffered
+# inserts are merged first
+_frames = {sheet: apply_schema(sheet, pd.DataFrame(columns=columns)) for sheet, (_, _, columns) in TABLES.items()}
+
+
+def format_memory_report():
+    lines = [f"  {'Sheet':<12}{'Rows':>10}{'Untyped':>12}{'Typed':>12}"]
+    total_plain = total_typed = 0
+    for sheet, rows, plain, typed in memory_report():
+        flag = "  (typed is larger)" if typed > plain else ""
+        lines.append(f"  {sheet:<12}{rows:>10}{plain / 1024:>10.0f} K{typed / 1024:>10.0f} K{flag}")
+        total_plain += plain
+        total_typed += typed
+    change = 100.0 * (total_typed / total_plain - 1) if total_plain else 0.0
+    lines.append(f"  {'Total':<22}{total_plain / 1024:>10.0f} K{total_typed / 1024:>10.0f} K  ({change:+.0f}%)")
+    return "\n".join(lines)
+
+
+# Held while the DataFrames are changed or snapshotted; the save worker
+# copies the sheets under it and writes the copies without it.
+lock = threading.RLock()
+
+
+def get_table(sheet):
+    """Return the in-memory DataFrame backing a sheet, with buffered inserts merged in."""
+    with lock:
+        _flush_inserts(sheet)
+        return _frames[sheet]
+
+
+def _set_table(sheet, df):
+    # Replaces the whole table, staged rows included
+    _frames[sheet] = df
+    _buffers[sheet].clear()
+
+
+def __getattr__(name):
+    # ds.tasks_df etc.: always the merged table
+    for sheet, (varname, _, _) in TABLES.items():
+        if varname == name:
+            return get_table(sheet)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ------------------------------------------------------------
+# INSERT BUFFER
+# ------------------------------------------------------------
+# Rows staged per sheet before the table is rebuilt; at least this many, or a
+# quarter of the table, so each row's share of the concat stays constant.
+INSERT_BUFFER_ROWS = 1000
+
+
+class InsertBuffer:
+    """Rows inserted into a sheet since its last merge, stored column by column.
+
+    Single-row inserts are appended here instead of concatenating the whole
+    table each time. The buffer is merged in one concat once it is full,
+    when the full table is read (get_table / ds.tasks_df), or before an
+    update or delete touches one of its rows. lookup() and find_row() read
+    the staged rows directly, so the usual per-project views never force a
+    merge. Staged labels continue the table's labels, so they are always
+    larger than every label already in it.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.labels = []
+        self.columns = {}
+        self._positions = {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, label):
+        return label in self._positions
+
+    def append(self, label, row):
+        count = len(self.labels)
+        for col, values in self.columns.items():
+            if col not in row:
+                values.append(None)
+        for col, val in row.items():
+            self.columns.setdefault(col, [None] * count).append(val)
+        self._positions[label] = count
+        self.labels.append(label)
+
+    def row(self, label, columns):
+        """One staged row as a Series over columns (plus any extra staged columns)."""
+        pos = self._positions[label]
+        columns = list(columns) + [col for col in self.columns if col not in columns]
+        return pd.Series([self.columns[col][pos] if col in self.columns else None for col in columns],
+                         index=columns, name=label, dtype=object)
+
+    def frame(self, labels, columns):
+        """The staged rows with the given labels as a DataFrame with columns first."""
+        positions = [self._positions[label] for label in labels]
+        columns = list(columns) + [col for col in self.columns if col not in columns]
+        data = {col: [self.columns[col][pos] for pos in positions] if col in self.columns else None
+                for col in columns}
+        return pd.DataFrame(data, index=labels, columns=columns)
+
+
+_buffers = {sheet: InsertBuffer() for sheet in TABLES}
+
+
+def _flush_inserts(sheet):
+    buffer = _buffers[sheet]
+    if buffer:
+        df = _frames[sheet]
+        staged = _conform(sheet, df, buffer.frame(buffer.labels, df.columns))
+        _frames[sheet] = pd.concat([df, staged])
+        buffer.clear()
+
+
+def _next_label(sheet):
+    buffer = _buffers[sheet]
+    if buffer:
+        return buffer.labels[-1] + 1
+    df = _frames[sheet]
+    return int(df.index[-1]) + 1 if len(df) else 0
+
+
+def _merged_for(sheet, labels):
+    """The sheet's table, merging the buffer first only if it holds one of labels."""
+    buffer = _buffers[sheet]
+    if any(label in buffer for label in labels):
+        _flush_inserts(sheet)
+    return _frames[sheet]
+
+
+# ------------------------------------------------------------
+# CHANGE JOURNAL
+# ------------------------------------------------------------
+def _json_default(value):
+    # numpy scalars (int64, float64, bool_) coming out of the DataFrames
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class ChangeJournal:
+    """Append-only log of the row-level changes made since the last compaction.
+
+    A compaction running in the background first rotates the live file to
+    <path>.old, so edits made while the workbook is being written keep
+    going to a fresh journal; the rotated file is dropped once the write
+    succeeds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rotated_path = path + ".old"
+        self.entries = 0
+        self.rotated_entries = 0
+        self._fh = None
+
+    def append(self, entry):
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write(json.dumps(entry, default=_json_default) + "\n")
+        self._fh.flush()
+        self.entries += 1
+
+    def replay(self):
+        """Yield the journaled entries in the order they were written."""
+        self.close()
+        self.entries = self.rotated_entries = 0
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as fh:
+                for line_no, line in enumerate(fh, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-write; nothing after it is usable.
+                        print(f"Ignoring corrupt entry at line {line_no} of {path}")
+                        break
+                    if path == self.path:
+                        self.entries += 1
+                    else:
+                        self.rotated_entries += 1
+                    yield entry
+
+    def rotate(self):
+        """Move the live entries aside (appending to a rotated file left by a failed compaction)."""
+        self.close()
+        if os.path.exists(self.path):
+            if os.path.exists(self.rotated_path):
+                with open(self.rotated_path, "a", encoding="utf-8") as dst, \
+                        open(self.path, encoding="utf-8") as src:
+                    dst.write(src.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+        self.rotated_entries += self.entries
+        self.entries = 0
+
+    def discard_rotated(self):
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+        self.rotated_entries = 0
+
+    def truncate(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.entries = 0
+        self.discard_rotated()
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+_change_listeners = []
+
+
+def add_change_listener(callback):
+    """Register callback(entry), called after every row-level change.
+
+    load_data() also calls it with {'op': 'load'} once the sheets have been
+    replaced wholesale, so anything derived from them can be rebuilt.
+    """
+    _change_listeners.append(callback)
+
+
+# ------------------------------------------------------------
+# ROW INDEXES
+# ------------------------------------------------------------
+class RowIndex:
+    """Maps each value of one column of a sheet to the labels of the rows holding it.
+
+    Built from the DataFrame on first use and then kept current by _apply(),
+    so a project's or task's rows are found without scanning the sheet.
+    Row labels only ever grow (inserts take max label + 1), which keeps each
+    group in sheet order and lets labels be turned into positions with a
+    binary search.
+    """
+
+    def __init__(self, sheet, column):
+        self.sheet = sheet
+        self.column = column
+        self._groups = None
+
+    def _build(self):
+        df = get_table(self.sheet)
+        groups = {}
+        for label, key in zip(df.index.tolist(), df[self.column].tolist()):
+            groups.setdefault(key, {})[label] = None
+        self._groups = groups
+
+    def invalidate(self):
+        self._groups = None
+
+    def labels(self, key):
+        if self._groups is None:
+            self._build()
+        return list(self._groups.get(key, ()))
+
+    def add(self, label, key):
+        if self._groups is not None:
+            self._groups.setdefault(key, {})[label] = None
+
+    def remove(self, label, key):
+        if self._groups is not None:
+            group = self._groups.get(key)
+            if group is not None:
+                group.pop(label, None)
+                if not group:
+                    del self._groups[key]
+
+
+# Sheet -> {column: RowIndex}; primary keys plus the ProjectID/TaskID foreign keys
+_indexes = {
+    sheet: {col: RowIndex(sheet, col) for col in [key_col] + INDEXED_COLUMNS.get(sheet, [])}
+    for sheet, (_, key_col, _) in TABLES.items()
+}
+
+
+def _reset_indexes():
+    for by_column in _indexes.values():
+        for index in by_column.values():
+            index.invalidate()
+
+
+def _positions(df, labels):
+    return df.index.searchsorted(labels)
+
+
+def _rows(sheet, labels):
+    # Sorted labels -> rows, the staged ones (always last) read from the buffer
+    with lock:
+        df = _frames[sheet]
+        buffer = _buffers[sheet]
+        split = len(labels)
+        while split and labels[split - 1] in buffer:
+            split -= 1
+        rows = df.iloc[_positions(df, labels[:split])]
+        if split == len(labels):
+            return rows
+        staged = _conform(sheet, df, buffer.frame(labels[split:], df.columns))
+    return staged if not split else pd.concat([rows, staged])
+
+
+def lookup(sheet, column, key):
+    """Rows of a sheet whose indexed column equals key, in sheet order."""
+    return _rows(sheet, sorted(_indexes[sheet][column].labels(key)))
+
+
+def find_row(sheet, key):
+    """The row (a Series) with the given primary key, or None."""
+    labels = _indexes[sheet][TABLES[sheet][1]].labels(key)
+    if not labels:
+        return None
+    with lock:
+        buffer = _buffers[sheet]
+        if labels[0] in buffer:
+            return buffer.row(labels[0], _frames[sheet].columns)
+        df = _frames[sheet]
+        return df.iloc[_positions(df, labels[:1])[0]]
+
+
+# ------------------------------------------------------------
+# ID SEQUENCES
+# ------------------------------------------------------------
+# Sheet -> next primary key to hand out. Only ever moves forward: inserts
+# (including replayed ones) push it past their keys and deletes leave it
+# alone, so a deleted row's ID is never given to a new row.
+_sequences = {sheet: 1 for sheet in TABLES}
+
+
+def _advance_sequence(sheet, keys):
+    keys = [int(k) for k in keys if isinstance(k, (int, float)) and k == k]
+    if keys:
+        _sequences[sheet] = max(_sequences[sheet], max(keys) + 1)
+
+
+def _restore_sequences(frame):
+    """Set the counters from a stored Sequences frame, never below max(ID) + 1."""
+    stored = {}
+    if frame is not None and not frame.empty:
+        next_ids = pd.to_numeric(frame['NextID'], errors='coerce')
+        stored = {sheet: int(n) for sheet, n in zip(frame['Sheet'], next_ids) if n == n}
+    for sheet, (_, key_col, _) in TABLES.items():
+        # One scan per load; covers workbooks saved before sequences existed
+        highest = pd.to_numeric(get_table(sheet)[key_col], errors='coerce').max()
+        _sequences[sheet] = max(stored.get(sheet, 1), 1 if pd.isna(highest) else int(highest) + 1)
+
+
+def _sequence_frame():
+    return pd.DataFrame(list(_sequences.items()), columns=SEQUENCE_COLUMNS)
+
+
+def next_ids(sheet, count):
+    """Reserve a block of count new primary keys for a sheet; returns a range."""
+    with lock:
+        first = _sequences[sheet]
+        _sequences[sheet] = first + count
+    return range(first, first + count)
+
+
+def next_id(sheet):
+    """Reserve one new primary key for a sheet."""
+    return next_ids(sheet, 1)[0]
+
+
+# ------------------------------------------------------------
+# SETTINGS
+# ------------------------------------------------------------
+# Key -> value (text) of settings stored with the data, e.g. rollup's OverallMode
+_settings = {}
+
+
+def _restore_settings(frame):
+    _settings.clear()
+    if frame is not None and not frame.empty:
+        _settings.update((str(key), None if value != value else str(value))
+                         for key, value in zip(frame['Key'], frame['Value']))
+
+
+def _settings_frame():
+    return pd.DataFrame(list(_settings.items()), columns=SETTINGS_COLUMNS)
+
+
+def get_setting(key, default=None):
+    return _settings.get(key, default)
+
+
+def set_setting(key, value):
+    """Store a setting with the data; journaled and saved like a row change."""
+    _record({'op': 'setting', 'sheet': SETTINGS_SHEET, 'key': key, 'value': str(value)})
+
+
+# ------------------------------------------------------------
+# ROW-LEVEL CHANGES
+# ------------------------------------------------------------
+def _make_room(sheet, df, column, value):
+    """Prepare a typed column to take value (a scalar or a list) by adding categories."""
+    kind = SCHEMA[sheet].get(column)
+    if kind is None or column not in df:
+        return
+    values = pd.Series(value if isinstance(value, list) else [value], dtype=object)
+    dtype = df[column].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        extra = [v for v in pd.unique(values.dropna()) if v not in dtype.categories]
+        if extra:
+            df[column] = df[column].cat.add_categories(extra)
+
+
+def _set_cells(sheet, df, labels, column, value):
+    if SCHEMA[sheet].get(column) == 'date' and column in df:
+        values = value if isinstance(value, list) else [value]
+        keys = df.loc[labels if isinstance(labels, list) else [labels], TABLES[sheet][1]].tolist()
+        _note_date_text(sheet, column, keys, values)
+        dates = parse_date_values(pd.Series(values, dtype=object))[0].tolist()
+        value = dates if isinstance(value, list) else dates[0]
+    _make_room(sheet, df, column, value)
+    try:
+        df.loc[labels, column] = value
+    except (TypeError, ValueError):
+        # e.g. a text value going into a column read back from Excel as all-NaN float
+        df[column] = df[column].astype(object)
+        df.loc[labels, column] = value
+
+
+def _drop_labels(sheet, labels):
+    df = _merged_for(sheet, labels)
+    for column, index in _indexes[sheet].items():
+        for label, key in zip(labels, df.loc[labels, column].tolist()):
+            index.remove(label, key)
+    for column in _date_columns(sheet):
+        texts = _date_text[(sheet, column)]
+        if texts:
+            for key in df.loc[labels, TABLES[sheet][1]].tolist():
+                texts.pop(_id_key(key), None)
+    # Staged rows not in labels stay in the buffer
+    _frames[sheet] = df.drop(labels)
+
+
+def _apply(entry):
+    """Apply one journal entry to the in-memory DataFrames and row indexes.
+
+    Inserts are applied as upserts so that replaying a journal over a
+    workbook that already contains some of its rows is harmless.
+    """
+    if entry['op'] == 'setting':
+        _settings[entry['key']] = entry['value']
+        return
+    sheet = entry['sheet']
+    key_col = TABLES[sheet][1]
+    indexes = _indexes[sheet]
+    op = entry['op']
+
+    if op == 'insert':
+        row = entry['row']
+        existing = indexes[key_col].labels(row.get(key_col))
+        if existing:
+            _drop_labels(sheet, existing)
+        label = _next_label(sheet)
+        _buffers[sheet].append(label, row)
+        for column in _date_columns(sheet):
+            if column in row:
+                _note_date_text(sheet, column, [row.get(key_col)], [row[column]])
+        for column, index in indexes.items():
+            index.add(label, row.get(column))
+        if len(_buffers[sheet]) >= max(INSERT_BUFFER_ROWS, len(_frames[sheet]) // 4):
+            _flush_inserts(sheet)
+        _advance_sequence(sheet, [row.get(key_col)])
+    elif op == 'insert_many':
+        rows = entry['rows']
+        if not rows:
+            return
+        existing = [label for row in rows for label in indexes[key_col].labels(row.get(key_col))]
+        if existing:
+            _drop_labels(sheet, sorted(set(existing)))
+        df = get_table(sheet)
+        first = int(df.index[-1]) + 1 if len(df) else 0
+        labels = range(first, first + len(rows))
+        _set_table(sheet, pd.concat([df, _conform(sheet, df, pd.DataFrame(rows, index=labels))]))
+        for column in _date_columns(sheet):
+            _note_date_text(sheet, column, [row.get(key_col) for row in rows], [row.get(column) for row in rows])
+        for column, index in indexes.items():
+            for label, row in zip(labels, rows):
+                index.add(label, row.get(column))
+        _advance_sequence(sheet, [row.get(key_col) for row in rows])
+    elif op == 'update':
+        labels = indexes[key_col].labels(entry['key'])
+        df = _merged_for(sheet, labels)
+        for label in labels:
+            for col, val in entry['values'].items():
+                if col in indexes:
+                    indexes[col].remove(label, df.at[label, col])
+                    indexes[col].add(label, val)
+                _set_cells(sheet, df, label, col, val)
+    elif op == 'update_many':
+        labels, positions = [], []
+        for pos, key in enumerate(entry['keys']):
+            for label in indexes[key_col].labels(key):
+                labels.append(label)
+                positions.append(pos)
+        if not labels:
+            return
+        df = _merged_for(sheet, labels)
+        for col, vals in entry['values'].items():
+            vals = [vals[pos] for pos in positions]
+            if col in indexes:
+                for label, val in zip(labels, vals):
+                    indexes[col].remove(label, df.at[label, col])
+                    indexes[col].add(label, val)
+            _set_cells(sheet, df, labels, col, vals)
+    elif op == 'delete':
+        column = entry['column']
+        if column in indexes:
+            labels = [label for key in entry['keys'] for label in indexes[column].labels(key)]
+            labels.sort()
+        else:
+            df = get_table(sheet)
+            labels = df.index[df[column].isin(entry['keys'])].tolist()
+        if labels:
+            _drop_labels(sheet, labels)
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
+
+
+def _record(entry):
+    with lock:
+        _apply(entry)
+        storage.record(entry)
+    for callback in _change_listeners:
+        callback(entry)
+
+
+def insert_row(sheet, row):
+    """Append one row (a column -> value dict) to a sheet."""
+    _record({'op': 'insert', 'sheet': sheet, 'row': row})
+
+
+def insert_rows(sheet, rows):
+    """Append many rows (column -> value dicts) with a single concat and one journal entry."""
+    _record({'op': 'insert_many', 'sheet': sheet, 'rows': list(rows)})
+
+
+def update_row(sheet, key, values):
+    """Set the given column values on the row whose primary key is key."""
+    _record({'op': 'update', 'sheet': sheet, 'key': key, 'values': values})
+
+
+def update_rows(sheet, keys, values):
+    """Set columns on many rows at once; values maps column -> list aligned with keys."""
+    _record({'op': 'update_many', 'sheet': sheet, 'keys': list(keys), 'values': values})
+
+
+def delete_rows(sheet, column, keys):
+    """Remove every row of a sheet whose column value is in keys."""
+    _record({'op': 'delete', 'sheet': sheet, 'column': column, 'keys': list(keys)})
+
+
+# ------------------------------------------------------------
+# STORAGE BACKENDS
+# ------------------------------------------------------------
+def _sql_value(value):
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return format_date(value)
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if isinstance(value, (int, float, str, bytes)):
+        return value
+    return str(value)
+
+
+def _nulls_as_nan(df):
+    """SQLite NULLs come back as None; make them NaN (float64 for an all-blank column) as read_excel does."""
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        if len(values) and values.isna().all():
+            df[column] = values.astype('float64')
+        else:
+            df[column] = values.where(values.notna(), float('nan'))
+    return df
+
+
+class ExcelStorage:
+    """database.xlsx, with changes since the last compaction kept in a journal."""
+
+    name = "excel"
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.cache_path = path + ".cache"
+        self.journal = ChangeJournal(path + ".journal")
+
+    @property
+    def unsaved_changes(self):
+        return self.journal.entries + self.journal.rotated_entries
+
+    def read_sheets(self):
+        # One pass over the workbook for all sheets instead of one open per sheet
+        try:
+            workbook = pd.read_excel(self.path, sheet_name=None)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Error loading {self.path}: {e}")
+            return {}
+        return {sheet: workbook[sheet] for sheet in list(TABLES) + list(SIDE_SHEETS) if sheet in workbook}
+
+    def _workbook_signature(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def load_cache(self):
+        """Return the cached, normalized sheets if they match the workbook on disk."""
+        try:
+            with open(self.cache_path, "rb") as fh:
+                cached = pickle.load(fh)
+            if cached['version'] == CACHE_VERSION and cached['signature'] == self._workbook_signature():
+                return cached['sheets']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable cache {self.cache_path}: {e}")
+        return None
+
+    def save_cache(self, sheets):
+        if not os.path.exists(self.path):
+            return
+        try:
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "wb") as fh:
+                pickle.dump({
+                    'version': CACHE_VERSION,
+                    'signature': self._workbook_signature(),
+                    'sheets': sheets,
+                }, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            # Only costs the next start a full parse of the workbook
+            print(f"Could not write cache {self.cache_path}: {e}")
+
+    def pending_changes(self):
+        return self.journal.replay()
+
+    def record(self, entry):
+        self.journal.append(entry)
+
+    def _write_workbook(self, frames):
+        # Write next to the workbook and swap it in, so a crash mid-write
+        # never leaves a truncated database.xlsx behind.
+        tmp_path = os.path.splitext(self.path)[0] + ".tmp.xlsx"
+        with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
+            for sheet, df in _disk_frames(frames).items():
+                df.to_excel(writer, sheet_name=sheet, index=False)
+        os.replace(tmp_path, self.path)
+
+    def write_all(self, frames):
+        self._write_workbook(frames)
+        self.save_cache(frames)
+        self.journal.truncate()
+
+    def compact(self, snapshot):
+        """Rewrite the workbook from snapshot(), which is called with the data lock held."""
+        with lock:
+            frames = snapshot()
+            self.journal.rotate()
+        self._write_workbook(frames)
+        self.save_cache(frames)
+        self.journal.discard_rotated()
+
+    def close(self):
+        self.journal.close()
+
+
+class SQLiteStorage:
+    """A local SQLite file with one table per sheet, updated row by row.
+
+    The primary keys are INTEGER PRIMARY KEY columns and the foreign keys in
+    INDEXED_COLUMNS get secondary indexes, so single-row updates and
+    per-project queries are O(log n). On first use the tables are migrated
+    from the Excel workbook (including any unreplayed journal entries).
+    """
+
+    name = "sqlite"
+    unsaved_changes = 0
+
+    def __init__(self, path=SQLITE_FILE, source=DATABASE_FILE):
+        self.path = path
+        self.source = source
+        self._conn = None
+        self._columns = {}
+
+    def needs_migration(self):
+        return not os.path.exists(self.path) and os.path.exists(self.source)
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+        return self._conn
+
+    def _create_table(self, sheet, columns):
+        if sheet == SEQUENCE_SHEET:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{sheet}" ("Sheet" TEXT PRIMARY KEY, "NextID" INTEGER)')
+            self._columns[sheet] = list(SEQUENCE_COLUMNS)
+            return
+        if sheet == SETTINGS_SHEET:
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{sheet}" ("Key" TEXT PRIMARY KEY, "Value" TEXT)')
+            self._columns[sheet] = list(SETTINGS_COLUMNS)
+            return
+        key_col = TABLES[sheet][1]
+        col_defs = ", ".join(
+            f'"{c}" INTEGER PRIMARY KEY' if c == key_col else f'"{c}"' for c in columns
+        )
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{sheet}" ({col_defs})')
+        for col in INDEXED_COLUMNS.get(sheet, []):
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{sheet}_{col}" ON "{sheet}" ("{col}")'
+            )
+        self._columns[sheet] = list(columns)
+
+    def _ensure_columns(self, sheet, columns):
+        if sheet not in self._columns:
+            self._create_table(sheet, TABLES[sheet][2] if sheet in TABLES else SIDE_SHEETS[sheet])
+        for col in columns:
+            if col not in self._columns[sheet]:
+                self.conn.execute(f'ALTER TABLE "{sheet}" ADD COLUMN "{col}"')
+                self._columns[sheet].append(col)
+
+    def read_sheets(self):
+        sheets = {}
+        for sheet in list(TABLES) + list(SIDE_SHEETS):
+            try:
+                sheets[sheet] = _nulls_as_nan(pd.read_sql_query(f'SELECT * FROM "{sheet}"', self.conn))
+            except Exception:
+                # Table not created yet (new database)
+                continue
+            self._columns[sheet] = list(sheets[sheet].columns)
+        return sheets
+
+    def load_cache(self):
+        return None
+
+    def save_cache(self, sheets):
+        pass
+
+    def pending_changes(self):
+        return ()
+
+    def compact(self, snapshot):
+        pass
+
+    def _save_sequence(self, sheet):
+        self._ensure_columns(SEQUENCE_SHEET, [])
+        self.conn.execute(
+            f'INSERT OR REPLACE INTO "{SEQUENCE_SHEET}" ("Sheet", "NextID") VALUES (?, ?)',
+            [sheet, _sequences[sheet]]
+        )
+
+    def record(self, entry):
+        sheet = entry['sheet']
+        op = entry['op']
+        if op == 'setting':
+            with self.conn:
+                self._ensure_columns(SETTINGS_SHEET, [])
+                self.conn.execute(f'INSERT OR REPLACE INTO "{SETTINGS_SHEET}" ("Key", "Value") VALUES (?, ?)',
+                                  [entry['key'], entry['value']])
+            return
+        key_col = TABLES[sheet][1]
+        with self.conn:
+            if op in ('insert', 'insert_many'):
+                # Called after _apply(), so the counter already covers the new keys
+                self._save_sequence(sheet)
+            if op == 'insert':
+                row = entry['row']
+                self._ensure_columns(sheet, row)
+                cols = ", ".join(f'"{c}"' for c in row)
+                marks = ", ".join("?" for _ in row)
+                self.conn.execute(
+                    f'INSERT OR REPLACE INTO "{sheet}" ({cols}) VALUES ({marks})',
+                    [_sql_value(v) for v in row.values()]
+                )
+            elif op == 'insert_many':
+                rows = entry['rows']
+                columns = list(dict.fromkeys(col for row in rows for col in row))
+                self._ensure_columns(sheet, columns)
+                cols = ", ".join(f'"{c}"' for c in columns)
+                marks = ", ".join("?" for _ in columns)
+                self.conn.executemany(
+                    f'INSERT OR REPLACE INTO "{sheet}" ({cols}) VALUES ({marks})',
+                    ([_sql_value(row.get(c)) for c in columns] for row in rows)
+                )
+            elif op == 'update':
+                values = entry['values']
+                self._ensure_columns(sheet, values)
+                assignments = ", ".join(f'"{c}" = ?' for c in values)
+                self.conn.execute(
+                    f'UPDATE "{sheet}" SET {assignments} WHERE "{key_col}" = ?',
+                    [_sql_value(v) for v in values.values()] + [_sql_value(entry['key'])]
+                )
+            elif op == 'update_many':
+                values = entry['values']
+                self._ensure_columns(sheet, values)
+                assignments = ", ".join(f'"{c}" = ?' for c in values)
+                self.conn.executemany(
+                    f'UPDATE "{sheet}" SET {assignments} WHERE "{key_col}" = ?',
+                    ([_sql_value(v[i]) for v in values.values()] + [_sql_value(key)]
+                     for i, key in enumerate(entry['keys']))
+                )
+            elif op == 'delete':
+                self._ensure_columns(sheet, [])
+                marks = ", ".join("?" for _ in entry['keys'])
+                self.conn.execute(
+                    f'DELETE FROM "{sheet}" WHERE "{entry["column"]}" IN ({marks})',
+                    [_sql_value(k) for k in entry['keys']]
+                )
+
+    def write_all(self, frames):
+        with self.conn:
+            for sheet, df in _disk_frames(frames).items():
+                self.conn.execute(f'DROP TABLE IF EXISTS "{sheet}"')
+                self._create_table(sheet, list(df.columns))
+                cols = ", ".join(f'"{c}"' for c in df.columns)
+                marks = ", ".join("?" for _ in df.columns)
+                self.conn.executemany(
+                    f'INSERT OR REPLACE INTO "{sheet}" ({cols}) VALUES ({marks})',
+                    ([_sql_value(v) for v in row] for row in df.itertuples(index=False))
+                )
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def open_storage(kind):
+    """Create the storage backend named by kind ("excel" or "sqlite")."""
+    if kind == "excel":
+        return ExcelStorage(DATABASE_FILE)
+    if kind == "sqlite":
+        return SQLiteStorage(SQLITE_FILE, DATABASE_FILE)
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+def set_storage(kind):
+    """Switch the active backend; call before load_data()."""
+    global storage
+    storage.close()
+    storage = open_storage(kind)
+
+
+storage = open_storage(STORAGE_BACKEND)
+
+
+# ------------------------------------------------------------
+# LOADING / SAVING DATA
+# ------------------------------------------------------------
+def _normalize_sheets(sheets):
+    projects = sheets.get('Projects', pd.DataFrame(columns=PROJECT_COLUMNS))
+    tasks = sheets.get('Tasks', pd.DataFrame(columns=TASK_COLUMNS))
+    orders = sheets.get('Orders', pd.DataFrame(columns=ORDER_COLUMNS))
+    pending_work = sheets.get('PendingWork', pd.DataFrame(columns=PENDING_WORK_COLUMNS))
+    dependencies = sheets.get('Dependencies', pd.DataFrame(columns=DEPENDENCY_COLUMNS))
+
+    # Ensure all columns exist for each dataframe
+    for col in PROJECT_COLUMNS:
+        if col not in projects.columns:
+            if 'Progress' in col:
+                projects[col] = 0
+            else:
+                projects[col] = ""
+
+    for col in TASK_COLUMNS:
+        if col not in tasks.columns:
+            if col in ['TaskID', 'ProjectID', 'Duration', 'Weight', 'Progress', 'ParentTaskID']:
+                tasks[col] = 0
+            else:
+                tasks[col] = ""
+
+    for col in ORDER_COLUMNS:
+        if col not in orders.columns:
+            orders[col] = ""
+
+    for col in PENDING_WORK_COLUMNS:
+        if col not in pending_work.columns:
+            pending_work[col] = "" if col in ['Description', 'Status', 'DueDate'] else 0
+
+    for col in DEPENDENCY_COLUMNS:
+        if col not in dependencies.columns:
+            dependencies[col] = 0
+
+    # Nullable Int32 IDs, categorical statuses/categories, parsed dates
+    date_text = []
+    for sheet, df in (('Projects', projects), ('Tasks', tasks), ('Orders', orders), ('PendingWork', pending_work),
+                      ('Dependencies', dependencies)):
+        date_text += _date_text_rows(sheet, df)
+        apply_schema(sheet, df)
+
+    sequences = sheets.get(SEQUENCE_SHEET, pd.DataFrame(columns=SEQUENCE_COLUMNS))
+    settings = sheets.get(SETTINGS_SHEET, pd.DataFrame(columns=SETTINGS_COLUMNS))
+
+    return {'Projects': projects, 'Tasks': tasks, 'Orders': orders, 'PendingWork': pending_work,
+            'Dependencies': dependencies, SEQUENCE_SHEET: sequences, SETTINGS_SHEET: settings,
+            DATE_TEXT_SHEET: pd.DataFrame(date_text, columns=DATE_TEXT_COLUMNS)}
+
+
+# Seconds spent in each phase of the last load_data(), for --timings
+load_timings = {}
+
+
+def _load_from(backend):
+    load_timings.clear()
+    start = time.perf_counter()
+
+    sheets = backend.load_cache()
+    load_timings['source'] = "cache" if sheets is not None else backend.name
+    if sheets is None:
+        sheets = backend.read_sheets()
+        load_timings['read'] = time.perf_counter() - start
+
+        mark = time.perf_counter()
+        sheets = _normalize_sheets(sheets)
+        load_timings['normalize'] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        backend.save_cache(sheets)
+        load_timings['write cache'] = time.perf_counter() - mark
+    else:
+        load_timings['read'] = time.perf_counter() - start
+
+    for sheet in TABLES:
+        _set_table(sheet, sheets[sheet])
+    _reset_indexes()
+    _restore_sequences(sheets.get(SEQUENCE_SHEET))
+    _restore_settings(sheets.get(SETTINGS_SHEET))
+    _restore_date_text(sheets.get(DATE_TEXT_SHEET))
+
+    # Changes made after the last compaction (Excel journal)
+    mark = time.perf_counter()
+    for entry in backend.pending_changes():
+        _apply(entry)
+    load_timings['replay'] = time.perf_counter() - mark
+    load_timings['total'] = time.perf_counter() - start
+
+
+def format_load_timings():
+    """One-line summary of load_timings, e.g. for the startup log."""
+    parts = [f"{name} {secs * 1000:.1f} ms" for name, secs in load_timings.items() if name != 'source']
+    return f"Loaded data from {load_timings.get('source', '?')}: " + ", ".join(parts)
+
+
+def load_data():
+    if isinstance(storage, SQLiteStorage) and storage.needs_migration():
+        print(f"Migrating {storage.source} to {storage.path}")
+        source = ExcelStorage(storage.source)
+        _load_from(source)
+        source.close()
+        save_data()
+    else:
+        _load_from(storage)
+    for callback in _change_listeners:
+        callback({'op': 'load'})
+
+
+def _snapshot():
+    frames = {sheet: get_table(sheet).copy() for sheet in TABLES}
+    frames[SEQUENCE_SHEET] = _sequence_frame()
+    frames[SETTINGS_SHEET] = _settings_frame()
+    frames[DATE_TEXT_SHEET] = _date_text_frame()
+    return frames
+
+
+def save_data():
+    """Write every sheet, the ID sequences and the settings to the active backend in full."""
+    with lock:
+        frames = _snapshot()
+    storage.write_all(frames)
+
+
+def compact():
+    """Fold unsaved journal entries into the workbook (no-op for SQLite).
+
+    Safe to call from the save worker: the sheets are copied under `lock`
+    and written outside it, while new edits keep going to the journal.
+    """
+    if storage.unsaved_changes:
+        storage.compact(_snapshot)
+
+
+# ------------------------------------------------------------
+# BACKGROUND SAVING
+# ------------------------------------------------------------
+class SaveWorker(threading.Thread):
+    """Compacts the database on a background thread once edits go quiet.
+
+    mark_dirty() is cheap and may be called after every change; a burst of
+    changes inside the debounce window collapses into a single write.
+    """
+
+    def __init__(self, debounce=SAVE_DEBOUNCE_SECONDS):
+        super().__init__(name="save-worker", daemon=True)
+        self.debounce = debounce
+        self.saving = False
+        self.last_error = None
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._last_change = 0.0
+        self._stopping = False
+
+    def mark_dirty(self, immediate=False):
+        with self._cond:
+            self._dirty = True
+            self._last_change = time.monotonic() - (self.debounce if immediate else 0)
+            self._cond.notify()
+
+    @property
+    def status(self):
+        """One of "saving", "failed", "pending" or "saved"."""
+        if self.saving:
+            return "saving"
+        if self.last_error is not None:
+            return "failed"
+        if storage.unsaved_changes:
+            return "pending"
+        return "saved"
+
+    def run(self):
+        failed_while_stopping = False
+        while True:
+            with self._cond:
+                while not self._dirty and not self._stopping:
+                    self._cond.wait()
+                while self._dirty and not self._stopping:
+                    remaining = self._last_change + self.debounce - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._dirty:
+                    # Only once stopping; edits made during the last write went round again
+                    return
+                self._dirty = False
+                self.saving = True
+            try:
+                compact()
+                self.last_error = None
+            except Exception as e:
+                print(f"Background save failed: {e}")
+                self.last_error = e
+                if self._stopping and failed_while_stopping:
+                    return  # flush() reports the failure; the journal still has everything
+                failed_while_stopping = self._stopping
+                # Retry after another debounce window (at once when stopping)
+                self.mark_dirty()
+            finally:
+                self.saving = False
+
+    def flush(self, timeout=None):
+        """Write out anything pending now and stop; returns False if that write failed."""
+        with self._cond:
+            self._stopping = True
+            self._dirty = self._dirty or bool(storage.unsaved_changes)
+            self._cond.notify()
+        if self.is_alive():
+            self.join(timeout)
+        else:
+            compact()
+        return self.last_error is None and not storage.unsaved_changes
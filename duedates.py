@@ -0,0 +1,174 @@
+"""
+Date index for pending-work due dates and order delivery/installation dates.
+
+DateIndex parses every date column in DATE_COLUMNS once and keeps each as a
+list of (date, key) pairs sorted by date, so "overdue", "due in the next N
+days" and "deliveries this week" are bisect range lookups rather than a
+parse of every row. Resolved pending work is kept out of the sorted DueDate
+list, so those lookups only ever see open items. Like the search index and
+the rollup aggregates it is built on first use and kept current from the
+datastore's change feed; values that are not YYYY-MM-DD dates are kept
+aside as invalid.
+"""
+import bisect
+from collections import namedtuple
+
+import pandas as pd
+
+import datastore as ds
+
+# Sheet -> date columns that are indexed
+DATE_COLUMNS = {
+    'PendingWork': ['DueDate'],
+    'Orders': ['DeliveryDate', 'InstallationDate'],
+}
+
+# Default window of the Lookahead tab and `main.py due`
+LOOKAHEAD_DAYS = 14
+
+DateItem = namedtuple('DateItem', 'sheet column key date')
+
+
+def today():
+    return pd.Timestamp.today().normalize()
+
+
+class DateIndex:
+    """(sheet, column) -> sorted [(date, key)] of open items, plus the invalid values and pending statuses."""
+
+    def __init__(self):
+        self.built = False
+
+    def rebuild(self):
+        self._dates = {}
+        self._sorted = {}
+        self._invalid = {}
+        pending = ds.get_table('PendingWork')
+        self._resolved = set(pending.loc[(pending['Status'] == "Resolved").values, 'PendingID'].tolist())
+        for sheet, columns in DATE_COLUMNS.items():
+            df = ds.get_table(sheet)
+            keys = df[ds.TABLES[sheet][1]].tolist()
+            for column in columns:
+                dates = df[column]
+                self._dates[(sheet, column)] = {
+                    key: date for key, date in zip(keys, dates.tolist()) if date is not pd.NaT
+                }
+                self._sorted[(sheet, column)] = sorted(
+                    (date, key) for key, date in self._dates[(sheet, column)].items() if self._listed(sheet, key)
+                )
+                self._invalid[(sheet, column)] = ds.invalid_dates(sheet, column)
+        self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            self.rebuild()
+
+    # -- changes -------------------------------------------------
+    def _listed(self, sheet, key):
+        """Whether a row's dates belong in the sorted lists (resolved pending work does not)."""
+        return sheet != 'PendingWork' or key not in self._resolved
+
+    def _remove(self, sheet, column, key):
+        self._invalid[(sheet, column)].pop(key, None)
+        date = self._dates[(sheet, column)].pop(key, None)
+        if date is not None and self._listed(sheet, key):
+            items = self._sorted[(sheet, column)]
+            del items[bisect.bisect_left(items, (date, key))]
+
+    def _set(self, sheet, column, keys, values):
+        dates, invalid = ds.parse_date_values(pd.Series(values, dtype=object))
+        for key, value, date, bad in zip(keys, values, dates.tolist(), invalid.tolist()):
+            self._remove(sheet, column, key)
+            if bad:
+                self._invalid[(sheet, column)][key] = value
+            elif date is not pd.NaT:
+                self._dates[(sheet, column)][key] = date
+                if self._listed(sheet, key):
+                    bisect.insort(self._sorted[(sheet, column)], (date, key))
+
+    def _set_status(self, keys, statuses):
+        """Take pending work out of the DueDate list when it is resolved and put it back when reopened."""
+        dates, items = self._dates[('PendingWork', 'DueDate')], self._sorted[('PendingWork', 'DueDate')]
+        for key, status in zip(keys, statuses):
+            resolved = status == "Resolved"
+            if resolved == (key in self._resolved):
+                continue
+            date = dates.get(key)
+            if resolved:
+                self._resolved.add(key)
+                if date is not None:
+                    del items[bisect.bisect_left(items, (date, key))]
+            else:
+                self._resolved.discard(key)
+                if date is not None:
+                    bisect.insort(items, (date, key))
+
+    def _apply_rows(self, sheet, rows):
+        keys = [row.get(ds.TABLES[sheet][1]) for row in rows]
+        if sheet == 'PendingWork':
+            self._set_status(keys, [row.get('Status') for row in rows])
+        for column in DATE_COLUMNS[sheet]:
+            self._set(sheet, column, keys, [row.get(column) for row in rows])
+
+    def on_change(self, entry):
+        op = entry['op']
+        if op == 'load':
+            self.built = False
+        if not self.built or op == 'load' or entry['sheet'] not in DATE_COLUMNS:
+            return
+        sheet = entry['sheet']
+
+        if op == 'insert':
+            self._apply_rows(sheet, [entry['row']])
+        elif op == 'insert_many':
+            self._apply_rows(sheet, entry['rows'])
+        elif op in ('update', 'update_many'):
+            keys = [entry['key']] if op == 'update' else entry['keys']
+            values = {column: [value] if op == 'update' else value for column, value in entry['values'].items()}
+            if sheet == 'PendingWork' and 'Status' in values:
+                self._set_status(keys, values['Status'])
+            for column in DATE_COLUMNS[sheet]:
+                if column in values:
+                    self._set(sheet, column, keys, values[column])
+        elif op == 'delete':
+            if entry['column'] != ds.TABLES[sheet][1]:
+                # Cascading delete of a project's or task's rows: rebuild on next use
+                self.built = False
+                return
+            for key in entry['keys']:
+                for column in DATE_COLUMNS[sheet]:
+                    self._remove(sheet, column, key)
+                self._resolved.discard(key)
+
+    # -- queries -------------------------------------------------
+    def between(self, sheet, column, start=None, end=None):
+        """DateItems with start <= date < end (either end may be None), in date order; open pending work only."""
+        self.ensure_built()
+        items = self._sorted[(sheet, column)]
+        lo = 0 if start is None else bisect.bisect_left(items, (start,))
+        hi = len(items) if end is None else bisect.bisect_left(items, (end,))
+        return [DateItem(sheet, column, key, date) for date, key in items[lo:hi]]
+
+    def overdue(self, on=None):
+        """Unresolved pending work due before today (or `on`)."""
+        return self.between('PendingWork', 'DueDate', end=on or today())
+
+    def due_within(self, days=LOOKAHEAD_DAYS, on=None):
+        """Unresolved pending work due from today through the next `days` days."""
+        start = on or today()
+        return self.between('PendingWork', 'DueDate', start, start + pd.Timedelta(days=days + 1))
+
+    def deliveries_this_week(self, on=None):
+        """Orders with a DeliveryDate in the Monday-Sunday week containing today (or `on`)."""
+        monday = (on or today()) - pd.Timedelta(days=(on or today()).weekday())
+        return self.between('Orders', 'DeliveryDate', monday, monday + pd.Timedelta(days=7))
+
+    def invalid(self):
+        """(sheet, column, key, text) for every value that is not a date."""
+        self.ensure_built()
+        return [(sheet, column, key, text)
+                for (sheet, column), values in self._invalid.items() for key, text in values.items()]
+
+
+index = DateIndex()
+ds.add_change_listener(index.on_change)
@@ -0,0 +1,111 @@
+"""
+Excel export of the whole database.
+
+export_workbook() writes a Projects sheet plus Tasks, Orders and Charts
+sheets for every project. Tasks and orders are grouped by ProjectID once,
+and rows are streamed through openpyxl write-only worksheets, so memory
+stays bounded however large the database is.
+"""
+import datastore as ds
+from datastore import TASK_SUBCATEGORIES, PROJECT_COLUMNS, TASK_COLUMNS, ORDER_COLUMNS
+
+# Rows converted to Python values at a time while streaming a sheet
+EXPORT_CHUNK_ROWS = 5000
+
+
+def _sheet_rows(df, columns):
+    """Rows of df[columns] as lists, NaN as None, converted a chunk at a time."""
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS].reindex(columns=columns).astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def _safe_sheet_name(project_name):
+    # Excel-sheet friendly (no special characters), limited to 30 chars
+    safe = "".join(c if c.isalnum() or c.isspace() else "_" for c in str(project_name))
+    return safe[:30]
+
+
+def _write_charts_sheet(wb, title, project_data, proj_tasks):
+    from openpyxl.chart import PieChart, BarChart, Reference
+
+    chart_sheet = wb.create_sheet(title)
+    categories = list(TASK_SUBCATEGORIES.values())
+
+    # Pie Chart for Sub-Progress: title row, header row, one row per category
+    chart_sheet.append(["Sub-Progress Overview"])
+    chart_sheet.append(["Category", "Progress"])
+    for cat in categories:
+        val = project_data.get(cat, 0)
+        chart_sheet.append([cat, None if val != val else val])
+    last_cat_row = 2 + len(categories)
+
+    pie_chart = PieChart()
+    labels = Reference(chart_sheet, min_col=1, min_row=3, max_row=last_cat_row)
+    data = Reference(chart_sheet, min_col=2, min_row=2, max_row=last_cat_row)
+    pie_chart.add_data(data, titles_from_data=True)
+    pie_chart.set_categories(labels)
+    pie_chart.title = "Sub-Progress Breakdown"
+    chart_sheet.add_chart(pie_chart, "D5")
+
+    # Bar Chart for Tasks Progress, below the category rows
+    chart_sheet.append(["Task Progress Overview"])
+    if proj_tasks.empty:
+        return
+    header_row = last_cat_row + 2
+    chart_sheet.append(["Task", "Progress"])
+    for name, prog in _sheet_rows(proj_tasks, ["TaskName", "Progress"]):
+        chart_sheet.append([name, prog])
+    last_task_row = header_row + len(proj_tasks)
+
+    bar_chart = BarChart()
+    labels = Reference(chart_sheet, min_col=1, min_row=header_row + 1, max_row=last_task_row)
+    data = Reference(chart_sheet, min_col=2, min_row=header_row, max_row=last_task_row)
+    bar_chart.add_data(data, titles_from_data=True)
+    bar_chart.set_categories(labels)
+    bar_chart.title = "Tasks Progress"
+    bar_chart.x_axis.title = "Tasks"
+    bar_chart.y_axis.title = "Progress (%)"
+    chart_sheet.add_chart(bar_chart, "D25")
+
+
+def export_workbook(file_path):
+    """Write every project with its tasks, orders and charts to file_path (.xlsx)."""
+    from openpyxl import Workbook
+
+    projects = ds.projects_df
+    tasks = ds.tasks_df
+    # Dates that are not dates are exported as their original text
+    orders = ds.with_date_text('Orders', ds.orders_df)
+    # One pass over each table: ProjectID -> row positions
+    task_positions = tasks.groupby('ProjectID', sort=False).indices if not tasks.empty else {}
+    order_positions = orders.groupby('ProjectID', sort=False).indices if not orders.empty else {}
+    no_rows = []
+
+    wb = Workbook(write_only=True)
+
+    ws_projects = wb.create_sheet("Projects")
+    ws_projects.append(PROJECT_COLUMNS)
+    for row in _sheet_rows(projects, PROJECT_COLUMNS):
+        ws_projects.append(list(row))
+
+    for _, project_data in projects.iterrows():
+        project_id = project_data["ProjectID"]
+        safe_project_name = _safe_sheet_name(project_data["ProjectName"])
+        proj_tasks = tasks.iloc[task_positions.get(project_id, no_rows)]
+        proj_orders = orders.iloc[order_positions.get(project_id, no_rows)]
+
+        task_sheet = wb.create_sheet(f"{safe_project_name}_Tasks")
+        task_sheet.append(TASK_COLUMNS)
+        for row in _sheet_rows(proj_tasks, TASK_COLUMNS):
+            task_sheet.append(list(row))
+
+        order_sheet = wb.create_sheet(f"{safe_project_name}_Orders")
+        order_sheet.append(ORDER_COLUMNS)
+        for row in _sheet_rows(proj_orders, ORDER_COLUMNS):
+            order_sheet.append(list(row))
+
+        _write_charts_sheet(wb, f"{safe_project_name}_Charts", project_data, proj_tasks)
+
+    wb.save(file_path)
+    return file_path
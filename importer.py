@@ -0,0 +1,269 @@
+"""
+Bulk import of tasks, orders and pending work from CSV or Excel files.
+
+Each file is validated column by column (categories, statuses, numbers and
+the ProjectID/TaskID references) rather than row by row. The valid rows get
+a block of consecutive IDs and go into the sheet with a single insert_rows()
+call, and the affected projects' progress is recomputed once. Saving is
+left to the caller (the GUI's save worker, or ds.compact() on the command
+line), so a 10,000-line schedule costs one journal entry and one save.
+"""
+import os
+
+import pandas as pd
+
+import datastore as ds
+import rollup
+from datastore import (
+    TASK_SUBCATEGORIES, ITEM_CATEGORIES, ORDER_STATUSES, LPO_STATUSES, INVOICE_STATUSES, PENDING_STATUSES,
+)
+
+IMPORT_SHEETS = ('Tasks', 'Orders', 'PendingWork')
+
+# Optional task columns that are not stored: RowKey labels a row of the file and
+# ParentRowKey hangs a row under another row of the same file, so a whole
+# work-breakdown tree can be imported before any of its TaskIDs exist.
+LOCAL_KEY_COLUMNS = {'Tasks': ['RowKey', 'ParentRowKey']}
+
+# Header row is line 1 of the file, so data row i (0-based) is on line i + 2
+_FIRST_DATA_LINE = 2
+
+
+def read_table(path):
+    """Read a .csv, .xlsx or .xls file into a DataFrame of raw cell values."""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        frame = pd.read_csv(path, dtype=object, skipinitialspace=True)
+    else:
+        frame = pd.read_excel(path, dtype=object)
+    return frame.reset_index(drop=True)
+
+
+def _match_columns(frame, columns):
+    """Rename headers to the sheet's column names, ignoring case and surrounding spaces."""
+    wanted = {col.strip().lower(): col for col in columns}
+    return frame.rename(columns=lambda c: wanted.get(str(c).strip().lower(), c))
+
+
+def _text(frame, column):
+    """Column as stripped strings with blanks as NA (all NA if the column is missing)."""
+    if column not in frame:
+        return pd.Series(pd.NA, index=frame.index, dtype='string')
+    text = frame[column].astype('string').str.strip()
+    return text.mask(text == '')
+
+
+def _number(frame, column, default):
+    """(values, bad) for a numeric column: blanks become default, bad marks unparsable cells."""
+    text = _text(frame, column)
+    values = pd.to_numeric(text, errors='coerce')
+    bad = text.notna() & values.isna()
+    return (values if default is None else values.fillna(default)), bad
+
+
+class _Checks:
+    """Collects (line, message) errors from boolean masks over the imported frame."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.invalid = pd.Series(False, index=frame.index)
+        self.errors = []
+
+    def fail(self, mask, message):
+        mask = mask.fillna(True).astype(bool)
+        if mask.any():
+            self.invalid |= mask
+            self.errors.extend((int(i) + _FIRST_DATA_LINE, message) for i in self.frame.index[mask])
+
+    def require(self, values, column):
+        self.fail(values.isna(), f"{column} is required")
+
+    def one_of(self, values, column, allowed):
+        self.require(values, column)
+        self.fail(values.notna() & ~values.isin(allowed), f"{column} must be one of: {', '.join(allowed)}")
+
+
+def _project_ids(frame, checks, project_id):
+    """ProjectID per row, falling back to project_id, checked against the Projects sheet."""
+    ids, bad = _number(frame, 'ProjectID', project_id)
+    checks.fail(bad, "ProjectID must be a number")
+    checks.require(ids, 'ProjectID')
+    known = ds.projects_df['ProjectID'].dropna()
+    checks.fail(ids.notna() & ~ids.isin(known), "ProjectID does not match an existing project")
+    return ids
+
+
+def _local_cycles(parent_rows):
+    """Mask of the rows whose ParentRowKey chain comes back to themselves."""
+    parent = {i: int(p) for i, p in parent_rows.dropna().items()}
+    walked, in_cycle = {}, set()
+    for start in parent:
+        chain = []
+        i = start
+        while i in parent and i not in walked:
+            walked[i] = start
+            chain.append(i)
+            i = parent[i]
+        if walked.get(i) == start and i in chain:
+            in_cycle.update(chain[chain.index(i):])
+    return pd.Series(parent_rows.index.isin(list(in_cycle)), index=parent_rows.index)
+
+
+def _validate_tasks(frame, checks, project_id):
+    names = _text(frame, 'TaskName')
+    category = _text(frame, 'Category')
+    duration, bad_duration = _number(frame, 'Duration', 0.0)
+    progress, bad_progress = _number(frame, 'Progress', 0.0)
+    weight, bad_weight = _number(frame, 'Weight', 0)
+    parents, bad_parent = _number(frame, 'ParentTaskID', None)
+    checks.require(names, 'TaskName')
+    checks.one_of(category, 'Category', list(TASK_SUBCATEGORIES))
+    checks.fail(bad_duration | (duration < 0), "Duration must be a number of days, 0 or more")
+    checks.fail(bad_progress | (progress < 0) | (progress > 100), "Progress must be 0-100")
+    checks.fail(bad_weight | (weight < 0), "Weight must be a number, 0 or more")
+    checks.fail(bad_parent, "ParentTaskID must be a number")
+
+    # A subtask hangs under an existing task of its own project
+    project_ids = _project_ids(frame, checks, project_id)
+    tasks = ds.tasks_df.dropna(subset=['TaskID']).drop_duplicates('TaskID')
+    parent_projects = parents.map(pd.Series(tasks['ProjectID'].values, index=tasks['TaskID'].values))
+    checks.fail(parents.notna() & ~(parent_projects == project_ids),
+                "ParentTaskID does not match a task of the same project")
+
+    # ... or under another row of this file, of the same project
+    row_keys, parent_keys = _text(frame, 'RowKey'), _text(frame, 'ParentRowKey')
+    checks.fail(row_keys.notna() & row_keys.duplicated(keep=False), "RowKey must be unique within the file")
+    checks.fail(parents.notna() & parent_keys.notna(), "Give either ParentTaskID or ParentRowKey, not both")
+    positions = pd.Series(frame.index, index=row_keys.values)
+    positions = positions[positions.index.notna() & ~positions.index.duplicated(keep=False)]
+    parent_rows = parent_keys.map(positions).astype(float)
+    checks.fail(parent_keys.notna() & parent_rows.isna(), "ParentRowKey does not match a RowKey in this file")
+    parent_positions = parent_rows.fillna(-1).astype(int).values
+    parent_row_projects = pd.Series(project_ids.reindex(parent_positions).values, index=frame.index)
+    checks.fail(parent_rows.notna() & ~(parent_row_projects == project_ids),
+                "ParentRowKey names a row of another project")
+    checks.fail(_local_cycles(parent_rows), "ParentRowKey makes a cycle of subtasks")
+    # A row cannot be imported without the row it hangs under
+    while True:
+        invalid = checks.invalid.reindex(parent_positions).fillna(False).values
+        orphaned = pd.Series(invalid, index=frame.index) & ~checks.invalid
+        if not orphaned.any():
+            break
+        checks.fail(orphaned, "the row named by ParentRowKey is not valid")
+
+    return pd.DataFrame({
+        'ProjectID': project_ids,
+        'TaskName': names,
+        'Duration': duration.astype(float),
+        'Weight': weight,
+        'Progress': progress.astype(float),
+        'ParentTaskID': parents,
+        'Category': category,
+        'PendingItems': _text(frame, 'PendingItems').fillna(''),
+        'ParentRow': parent_rows,
+    })
+
+
+def _validate_orders(frame, checks, project_id):
+    columns = {
+        'ItemCategory': ITEM_CATEGORIES,
+        'OrderStatus': ORDER_STATUSES,
+        'LPOStatus': LPO_STATUSES,
+        'InvoiceStatus': INVOICE_STATUSES,
+    }
+    rows = {'ProjectID': _project_ids(frame, checks, project_id), 'Company': _text(frame, 'Company').fillna('')}
+    for column, allowed in columns.items():
+        rows[column] = _text(frame, column)
+        checks.one_of(rows[column], column, allowed)
+    for column in ('InvoiceCopyPath', 'MissingItems', 'DeliveryDate', 'InstallationDate'):
+        rows[column] = _text(frame, column).fillna('')
+    return pd.DataFrame(rows)
+
+
+def _validate_pending(frame, checks, project_id):
+    description = _text(frame, 'Description')
+    status = _text(frame, 'Status')
+    due_date = _text(frame, 'DueDate')
+    task_ids, bad_task = _number(frame, 'TaskID', None)
+    checks.require(description, 'Description')
+    checks.one_of(status, 'Status', PENDING_STATUSES)
+    checks.require(due_date, 'DueDate')
+    checks.fail(bad_task, "TaskID must be a number")
+    checks.require(task_ids, 'TaskID')
+
+    # Each pending item belongs to its task's project
+    tasks = ds.tasks_df.dropna(subset=['TaskID']).drop_duplicates('TaskID')
+    task_projects = task_ids.map(pd.Series(tasks['ProjectID'].values, index=tasks['TaskID'].values))
+    checks.fail(task_ids.notna() & task_projects.isna(), "TaskID does not match an existing task")
+    if project_id is not None:
+        checks.fail(task_projects.notna() & (task_projects != project_id),
+                    "TaskID belongs to a different project")
+    return pd.DataFrame({
+        'TaskID': task_ids,
+        'ProjectID': task_projects,
+        'Description': description,
+        'Status': status,
+        'DueDate': due_date,
+    })
+
+
+_VALIDATORS = {
+    'Tasks': _validate_tasks,
+    'Orders': _validate_orders,
+    'PendingWork': _validate_pending,
+}
+
+
+def validate(sheet, frame, project_id=None):
+    """Check an imported frame for a sheet.
+
+    Returns (rows, errors): rows holds the valid rows in the sheet's columns
+    (without IDs; imported tasks also get ParentRow, the index of the row
+    named by ParentRowKey), errors is a list of (file line, message).
+    """
+    columns = ds.TABLES[sheet][2] + LOCAL_KEY_COLUMNS.get(sheet, [])
+    frame = _match_columns(frame.reset_index(drop=True), columns)
+    checks = _Checks(frame)
+    rows = _VALIDATORS[sheet](frame, checks, project_id)
+    checks.errors.sort()
+    return rows[~checks.invalid], checks.errors
+
+
+def import_rows(sheet, frame, project_id=None, skip_invalid=False):
+    """Validate and append a frame of rows to a sheet.
+
+    With any invalid rows nothing is imported unless skip_invalid is set, in
+    which case only the valid rows are. Returns (imported, errors).
+    """
+    rows, errors = validate(sheet, frame, project_id)
+    if (errors and not skip_invalid) or rows.empty:
+        return 0, errors
+
+    key_col = ds.TABLES[sheet][1]
+    rows = rows.copy()
+    rows.insert(0, key_col, list(ds.next_ids(sheet, len(rows))))
+    if 'ParentRow' in rows:
+        new_ids = pd.Series(rows[key_col].values, index=rows.index)
+        rows['ParentTaskID'] = rows['ParentTaskID'].fillna(rows['ParentRow'].map(new_ids))
+        rows = rows.drop(columns='ParentRow')
+    for column in (key_col, 'ProjectID', 'TaskID'):
+        if column in rows:
+            rows[column] = rows[column].astype('int64')
+    records = rows.astype(object).where(rows.notna(), None).to_dict('records')
+    ds.insert_rows(sheet, records)
+
+    if sheet == 'Tasks':
+        rollup.recompute_projects(rows['ProjectID'].unique().tolist())
+    return len(records), errors
+
+
+def import_file(sheet, path, project_id=None, skip_invalid=False):
+    """import_rows() for a .csv/.xlsx file."""
+    return import_rows(sheet, read_table(path), project_id, skip_invalid)
+
+
+def format_errors(errors, limit=20):
+    """Human-readable error lines, at most `limit` of them plus a count of the rest."""
+    lines = [f"Line {line}: {message}" for line, message in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"... and {len(errors) - limit} more")
+    return "\n".join(lines)
@@ -0,0 +1,610 @@
+"""
+PDF project reports for the Project Tracking App.
+
+project_snapshot() copies everything one report needs out of the datastore
+into plain, picklable data, and build_project_pdf() turns such a snapshot
+into a PDF with reportlab. ReportJob runs build_project_pdf() in a worker
+process so the GUI stays responsive; it reports progress and can be
+cancelled. PortfolioJob fans every project out over a process pool and
+writes an index PDF linking the results. Finished PDFs are kept in
+REPORT_CACHE_DIR under a hash of their snapshot, so an unchanged project's
+report is never built twice.
+"""
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+import datastore as ds
+from datastore import TASK_SUBCATEGORIES
+
+# How long a cancelled worker gets to stop on its own before it is terminated
+CANCEL_GRACE_SECONDS = 2.0
+
+
+class ReportCancelled(Exception):
+    """Raised inside the worker when the report job was cancelled."""
+
+
+# ------------------------------------------------------------
+# SNAPSHOT
+# ------------------------------------------------------------
+def project_snapshot(project_id):
+    """Everything a report needs for one project, as plain dicts and lists (None if no such project)."""
+    row = ds.find_row('Projects', project_id)
+    if row is None:
+        return None
+
+    sub_data = {}
+    for cat in TASK_SUBCATEGORIES.values():
+        val = row[cat]
+        sub_data[cat] = 0.0 if pd.isna(val) else float(val)
+
+    proj_tasks = ds.lookup('Tasks', 'ProjectID', project_id)
+    pending = {}
+    for task_id in proj_tasks['TaskID']:
+        task_pending = ds.lookup('PendingWork', 'TaskID', task_id)
+        if not task_pending.empty:
+            pending[task_id] = ds.with_date_text('PendingWork', task_pending).to_dict('records')
+
+    overall = row['OverallProgress']
+    return {
+        'project_id': project_id,
+        'project_name': row['ProjectName'],
+        'overall_progress': 0.0 if pd.isna(overall) else float(overall),
+        'notes': row['Notes'],
+        'sub_data': sub_data,
+        'tasks': proj_tasks.to_dict('records'),
+        'pending': pending,
+        'orders': ds.with_date_text('Orders', ds.lookup('Orders', 'ProjectID', project_id)).to_dict('records'),
+    }
+
+
+# ------------------------------------------------------------
+# REPORT CACHE
+# ------------------------------------------------------------
+# Finished PDFs, named by a hash of the project data they were built from
+REPORT_CACHE_DIR = "report_cache"
+
+# Least recently used PDFs are deleted once the cache grows past this
+REPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Bump when the PDF layout changes so cached reports are rebuilt
+REPORT_FORMAT_VERSION = 1
+
+
+def snapshot_key(snapshot):
+    """Content hash of a project snapshot: same data, same key."""
+    canonical = dict(snapshot, pending=sorted((str(k), v) for k, v in snapshot['pending'].items()))
+    payload = json.dumps([REPORT_FORMAT_VERSION, canonical], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """A directory of <key>.pdf files with size-bounded LRU eviction (by file mtime)."""
+
+    def __init__(self, directory=REPORT_CACHE_DIR, max_bytes=REPORT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + ".pdf")
+
+    def partial_path(self, key):
+        """Where a report for key is built before add() moves it into the cache."""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{key}.{os.getpid()}.part")
+
+    def get(self, key):
+        """Path of the cached PDF for key (marked as just used), or None."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def add(self, key, built_path, copy=False):
+        """Move (or copy) a finished PDF into the cache and return its cached path."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        if copy:
+            shutil.copyfile(built_path, path + ".tmp")
+            os.replace(path + ".tmp", path)
+        else:
+            os.replace(built_path, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Delete least recently used PDFs until the cache fits in max_bytes."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        files = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".pdf"):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                print(f"Could not evict cached report {path}: {e}")
+
+
+report_cache = ReportCache()
+
+
+# ------------------------------------------------------------
+# PDF
+# ------------------------------------------------------------
+def build_project_pdf(snapshot, pdf_path=None, progress=None, cancelled=None):
+    """Write the report for a project snapshot and return the PDF path.
+
+    progress(done, total) is called as flowables are laid out; if cancelled()
+    turns true the build stops with ReportCancelled.
+    """
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.graphics.shapes import Drawing, Rect
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
+    def check_cancelled():
+        if cancelled is not None and cancelled():
+            raise ReportCancelled()
+
+    if pdf_path is None:
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        pdf_path = tmp.name
+        tmp.close()
+
+    project_name = snapshot['project_name']
+    overall_progress = snapshot['overall_progress']
+    proj_tasks = snapshot['tasks']
+    proj_orders = snapshot['orders']
+
+    doc = SimpleDocTemplate(pdf_path, pagesize=landscape(letter))
+    elements = []
+    styles = getSampleStyleSheet()
+    title_style = styles['Title']
+    normal_style = styles['Normal']
+    heading_style = styles['Heading2']
+
+    # Title
+    elements.append(Paragraph(f"Project Report: {project_name}", title_style))
+    elements.append(Spacer(1, 12))
+
+    # Overall progress & notes
+    elements.append(Paragraph(f"Overall Progress: {overall_progress:.2f}%", normal_style))
+    elements.append(Paragraph(f"Notes: {snapshot['notes']}", normal_style))
+    elements.append(Spacer(1, 12))
+
+    # Progress bar
+    bar_width = 300
+    bar_height = 20
+    fill_width = max(0, min(bar_width, bar_width * (overall_progress / 100.0)))
+    d = Drawing(bar_width, bar_height)
+    d.add(Rect(0, 0, bar_width, bar_height, strokeColor=colors.black, fillColor=colors.lightgrey))
+    d.add(Rect(0, 0, fill_width, bar_height, fillColor=colors.green))
+    elements.append(Paragraph("Overall Progress Bar:", heading_style))
+    elements.append(Spacer(1, 6))
+    elements.append(d)
+    elements.append(Spacer(1, 12))
+
+    # Sub-progress table
+    sub_data_list = [["Sub-Task", "Progress (%)"]]
+    for k, v in snapshot['sub_data'].items():
+        sub_data_list.append([k, f"{v:.2f}"])
+    sub_table = Table(sub_data_list, colWidths=[150, 100])
+    sub_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ]))
+    elements.append(Paragraph("Sub-Progress Details:", heading_style))
+    elements.append(Spacer(1, 6))
+    elements.append(sub_table)
+    elements.append(Spacer(1, 12))
+
+    # Tasks table
+    if proj_tasks:
+        tasks_data_list = [["TaskID", "TaskName", "Category", "Duration", "Progress"]]
+        for row in proj_tasks:
+            tasks_data_list.append([
+                row['TaskID'], row['TaskName'], row['Category'], row['Duration'], f"{row['Progress']}%"
+            ])
+        tasks_table = Table(tasks_data_list, repeatRows=1)
+        tasks_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ]))
+        elements.append(Paragraph("Tasks:", heading_style))
+        elements.append(Spacer(1, 6))
+        elements.append(tasks_table)
+        elements.append(Spacer(1, 12))
+
+        # Add Pending Work for each task
+        for task_row in proj_tasks:
+            check_cancelled()
+            task_pending = snapshot['pending'].get(task_row['TaskID'])
+            if not task_pending:
+                continue
+            elements.append(Paragraph(f"Pending Work for Task: {task_row['TaskName']}", heading_style))
+            pending_data_list = [["PendingID", "Description", "Status", "Due Date"]]
+            for p_row in task_pending:
+                pending_data_list.append([
+                    p_row['PendingID'], p_row['Description'], p_row['Status'], ds.format_date(p_row['DueDate'])
+                ])
+            pending_table = Table(pending_data_list, repeatRows=1)
+            pending_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ]))
+            elements.append(Spacer(1, 6))
+            elements.append(pending_table)
+            elements.append(Spacer(1, 12))
+
+    # Orders table
+    if proj_orders:
+        orders_data_list = [[
+            "OrderID", "Company", "ItemCategory", "OrderStatus",
+            "LPOStatus", "Invoice?", "InvoiceStatus", "MissingItems",
+            "DeliveryDate", "InstallationDate"
+        ]]
+        for rowo in proj_orders:
+            inv_up = "Yes" if rowo['InvoiceCopyPath'] else "No"
+            orders_data_list.append([
+                rowo['OrderID'], rowo['Company'], rowo['ItemCategory'], rowo['OrderStatus'],
+                rowo['LPOStatus'], inv_up, rowo['InvoiceStatus'], rowo['MissingItems'],
+                ds.format_date(rowo['DeliveryDate']), ds.format_date(rowo['InstallationDate'])
+            ])
+        orders_table = Table(orders_data_list, repeatRows=1)
+        orders_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ]))
+        elements.append(Paragraph("Orders:", heading_style))
+        elements.append(Spacer(1, 6))
+        elements.append(orders_table)
+    else:
+        elements.append(Paragraph("No orders found.", normal_style))
+
+    check_cancelled()
+    total = [len(elements)]
+
+    def on_progress(kind, value):
+        # reportlab reports an estimate of the flowable count, then progress through it
+        check_cancelled()
+        if kind == 'SIZE_EST':
+            total[0] = max(1, value)
+        elif kind == 'PROGRESS' and progress is not None:
+            progress(min(value, total[0]), total[0])
+
+    doc.setProgressCallBack(on_progress)
+    doc.build(elements)
+    return pdf_path
+
+
+def write_project_report(project_id, pdf_path, cache=None):
+    """Build one project's PDF at pdf_path in this process (reusing the cache if given).
+
+    Returns pdf_path, or None if the project does not exist.
+    """
+    snapshot = project_snapshot(project_id)
+    if snapshot is None:
+        return None
+    key = snapshot_key(snapshot) if cache is not None else None
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        shutil.copyfile(cached, pdf_path)
+        return pdf_path
+    build_project_pdf(snapshot, pdf_path)
+    if cache is not None:
+        cache.add(key, pdf_path, copy=True)
+    return pdf_path
+
+
+# ------------------------------------------------------------
+# WORKER PROCESS
+# ------------------------------------------------------------
+def _report_worker(snapshot, pdf_path, messages, cancel_event):
+    try:
+        path = build_project_pdf(
+            snapshot, pdf_path,
+            progress=lambda done, total: messages.put(('progress', done, total)),
+            cancelled=cancel_event.is_set,
+        )
+        messages.put(('done', path))
+    except ReportCancelled:
+        messages.put(('cancelled',))
+    except Exception as e:
+        messages.put(('error', str(e)))
+
+
+class ReportJob:
+    """Builds one project PDF in a separate process.
+
+    Call poll() periodically (e.g. from Tk's after()): it returns the latest
+    ('progress', done, total) message, or a final ('done', path),
+    ('error', message) or ('cancelled',) after which the job is finished.
+    With a cache, a report already built from identical data is returned
+    without starting a worker, and a new one is added to the cache.
+    """
+
+    def __init__(self, snapshot, pdf_path=None, cache=None):
+        self.result = None
+        self.cache = cache
+        self.cache_key = None
+        self.process = None
+        self._cancel_deadline = None
+        if cache is not None and pdf_path is None:
+            self.cache_key = snapshot_key(snapshot)
+            cached = cache.get(self.cache_key)
+            if cached is not None:
+                self.result = ('done', cached)
+                return
+            pdf_path = cache.partial_path(self.cache_key)
+        self.pdf_path = pdf_path
+        # Spawn, not fork: the GUI process has Tk and the save thread running
+        context = multiprocessing.get_context("spawn")
+        self.messages = context.Queue()
+        self.cancel_event = context.Event()
+        self.process = context.Process(
+            target=_report_worker, args=(snapshot, pdf_path, self.messages, self.cancel_event), daemon=True
+        )
+        self.process.start()
+
+    @property
+    def finished(self):
+        return self.result is not None
+
+    def poll(self):
+        if self.process is None:
+            return self.result
+        latest = None
+        while self.result is None:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'progress':
+                latest = message
+            else:
+                self.result = message
+        if self.result is None and not self.process.is_alive():
+            try:
+                # The final message can still be in flight when the process exits
+                self.result = self.messages.get(timeout=0.5)
+            except queue.Empty:
+                pass
+        if self.result is None and not self.process.is_alive():
+            if self._cancel_deadline is not None:
+                self.result = ('cancelled',)
+            else:
+                self.result = ('error', f"report worker exited with code {self.process.exitcode}")
+        if self.result is None and self._cancel_deadline is not None and time.monotonic() > self._cancel_deadline:
+            self.process.terminate()
+            self.result = ('cancelled',)
+        if self.result is not None:
+            self.process.join(timeout=0.1)
+            self.process = None
+            if self.cache_key is None:
+                pass
+            elif self.result[0] == 'done':
+                self.result = ('done', self.cache.add(self.cache_key, self.result[1]))
+            elif os.path.exists(self.pdf_path):
+                os.remove(self.pdf_path)  # half-written PDF from a cancelled or failed build
+            return self.result
+        return latest
+
+    def cancel(self):
+        """Ask the worker to stop; poll() reports ('cancelled',) once it has."""
+        if self.result is None and self._cancel_deadline is None:
+            self.cancel_event.set()
+            self._cancel_deadline = time.monotonic() + CANCEL_GRACE_SECONDS
+
+    def stop(self):
+        """Terminate the worker now and wait for it to exit (e.g. when the app closes)."""
+        if self.process is None:
+            return
+        self.cancel_event.set()
+        self.process.terminate()
+        self.process.join()
+        self.process = None
+        if self.result is None:
+            self.result = ('cancelled',)
+        if self.cache_key is not None and os.path.exists(self.pdf_path):
+            os.remove(self.pdf_path)
+
+
+# ------------------------------------------------------------
+# PORTFOLIO (ALL PROJECTS)
+# ------------------------------------------------------------
+PORTFOLIO_INDEX_FILE = "00_Portfolio_Index.pdf"
+
+
+def report_filename(project_id, project_name):
+    """File name for a project's PDF inside a portfolio directory."""
+    safe_name = "".join(c if c.isalnum() or c in " -_" else "_" for c in str(project_name)).strip()
+    return f"{int(project_id):04d}_{safe_name[:60] or 'Project'}.pdf"
+
+
+def _portfolio_worker(snapshot, pdf_path):
+    # Runs in a pool process; failures come back as text so one bad project cannot sink the batch
+    try:
+        return build_project_pdf(snapshot, pdf_path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def build_index_pdf(entries, pdf_path):
+    """Cover PDF listing each project's progress and report file (or the error it hit).
+
+    entries are dicts with project_id, project_name, overall_progress, path and error.
+    """
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+
+    styles = getSampleStyleSheet()
+    link_style = styles['Normal']
+    failed = sum(1 for entry in entries if entry['error'])
+
+    elements = [
+        Paragraph("Portfolio Report", styles['Title']),
+        Spacer(1, 12),
+        Paragraph(f"Generated {time.strftime('%Y-%m-%d %H:%M')} - {len(entries)} projects, {failed} failed",
+                  styles['Normal']),
+        Spacer(1, 12),
+    ]
+    rows = [["ProjectID", "Project", "Overall Progress", "Report"]]
+    for entry in entries:
+        if entry['error']:
+            report_cell = f"FAILED: {entry['error']}"
+        else:
+            name = os.path.basename(entry['path'])
+            report_cell = Paragraph(f'<link href="{name}" color="blue">{name}</link>', link_style)
+        rows.append([
+            entry['project_id'], entry['project_name'], f"{entry['overall_progress']:.2f}%", report_cell
+        ])
+    table = Table(rows, repeatRows=1, colWidths=[70, 220, 100, 300])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ]))
+    elements.append(table)
+    SimpleDocTemplate(pdf_path, pagesize=landscape(letter)).build(elements)
+    return pdf_path
+
+
+class PortfolioJob:
+    """Builds a PDF for every project into a directory, one project per pool worker.
+
+    Snapshots are taken up front, so later edits do not affect the batch.
+    poll() returns ('progress', done, total) while running and finally
+    ('done', index_path, failures) or ('cancelled',); failures is a list of
+    (project_name, error) for projects whose report could not be built.
+    """
+
+    def __init__(self, directory, project_ids=None, workers=None, cache=None):
+        if project_ids is None:
+            project_ids = ds.projects_df['ProjectID'].dropna().tolist()
+        self.directory = directory
+        self.entries = []
+        self.result = None
+        self._cancelled = False
+        self.cache = cache
+        os.makedirs(directory, exist_ok=True)
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                                           mp_context=multiprocessing.get_context("spawn"))
+        self.futures = {}
+        for project_id in project_ids:
+            snapshot = project_snapshot(project_id)
+            if snapshot is None:
+                continue
+            entry = {
+                'project_id': int(project_id),
+                'project_name': snapshot['project_name'],
+                'overall_progress': snapshot['overall_progress'],
+                'path': os.path.join(directory, report_filename(project_id, snapshot['project_name'])),
+                'error': None,
+                'key': snapshot_key(snapshot) if cache is not None else None,
+            }
+            self.entries.append(entry)
+            cached = cache.get(entry['key']) if cache is not None else None
+            if cached is not None:
+                shutil.copyfile(cached, entry['path'])
+                continue
+            self.futures[self.pool.submit(_portfolio_worker, snapshot, entry['path'])] = entry
+        self.total = len(self.entries)
+        self.done = self.total - len(self.futures)
+
+    @property
+    def finished(self):
+        return self.result is not None
+
+    def poll(self):
+        if self.result is not None:
+            return self.result
+        for future in [f for f in self.futures if f.done()]:
+            entry = self.futures.pop(future)
+            try:
+                path, error = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. out of memory)
+                path, error = None, f"{type(e).__name__}: {e}"
+            entry['path'], entry['error'] = path, error
+            if path is not None and entry['key'] is not None:
+                self.cache.add(entry['key'], path, copy=True)
+            self.done += 1
+        if self.futures:
+            return ('progress', self.done, self.total)
+
+        self.pool.shutdown(wait=False)
+        if self._cancelled:
+            self.result = ('cancelled',)
+            return self.result
+        index_path = build_index_pdf(self.entries, os.path.join(self.directory, PORTFOLIO_INDEX_FILE))
+        failures = [(entry['project_name'], entry['error']) for entry in self.entries if entry['error']]
+        self.result = ('done', index_path, failures)
+        return self.result
+
+    def cancel(self):
+        """Drop projects not yet started; reports already being built are allowed to finish."""
+        if self.result is None and not self._cancelled:
+            self._cancelled = True
+            for future in list(self.futures):
+                if future.cancel():
+                    del self.futures[future]
+
+    def stop(self):
+        """Drop the projects not yet started and wait for the running ones (e.g. when the app closes)."""
+        if self.result is None:
+            self._cancelled = True
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.futures = {}
+            self.result = ('cancelled',)
+
+    def wait(self, interval=0.1):
+        """Block until the batch is finished and return the final poll() result."""
+        while not self.finished:
+            self.poll()
+            if not self.finished:
+                time.sleep(interval)
+        return self.result
@@ -0,0 +1,636 @@
+"""
+Project progress rollups.
+
+Tasks form a tree per project through ParentTaskID. A task with subtasks
+takes the Weight-weighted mean of its subtasks' rolled-up Progress (a plain
+mean when none of them has a positive Weight); a leaf keeps its own
+Progress. A project's sub-progress columns are the same weighted mean over
+its top-level tasks in each TASK_SUBCATEGORIES category, so a project
+without subtasks or weights gets the plain per-category means.
+OverallProgress combines them according to overall_mode(), which is saved
+with the data (see overall_progress()).
+
+compute_rollups() derives them for any number of projects with one pass over
+the task trees and a single groupby; ProgressAggregates keeps running
+per-parent and per-(project, category) totals so that changing one task
+only walks its ancestor chain. recompute_projects() writes either result
+back in one bulk update.
+"""
+import os
+from collections import defaultdict
+
+import pandas as pd
+
+import datastore as ds
+from datastore import TASK_SUBCATEGORIES
+
+SUBPROGRESS_COLUMNS = list(TASK_SUBCATEGORIES.values())
+ROLLUP_COLUMNS = SUBPROGRESS_COLUMNS + ['OverallProgress']
+
+# How OverallProgress is made from a project's top-level tasks:
+#   equal     the mean of all the sub-progress columns, empty categories counting as 0
+#   present   the mean of the sub-progress columns of categories the project has tasks in
+#   duration  the mean of the tasks' progress weighted by Duration
+#   weight    the mean of the tasks' progress weighted by Weight
+# duration and weight fall back to present for a project whose tasks have none.
+# set_overall_mode() saves the mode with the data (the OverallMode setting);
+# PROJECT_TRACKER_OVERALL_MODE is only the default for data that has none yet.
+OVERALL_MODES = ('equal', 'present', 'duration', 'weight')
+OVERALL_MODE_SETTING = 'OverallMode'
+DEFAULT_OVERALL_MODE = os.environ.get("PROJECT_TRACKER_OVERALL_MODE", "equal")
+if DEFAULT_OVERALL_MODE not in OVERALL_MODES:
+    print(f"Unknown PROJECT_TRACKER_OVERALL_MODE {DEFAULT_OVERALL_MODE!r}; using 'equal'")
+    DEFAULT_OVERALL_MODE = 'equal'
+
+# Per-project sums overall_progress() needs besides the sub-progress columns
+PROJECT_SUMS = ['categories', 'weight', 'weighted', 'duration', 'timed']
+
+
+def overall_mode():
+    """The OverallProgress weighting saved with the data, else the default."""
+    mode = ds.get_setting(OVERALL_MODE_SETTING)
+    return mode if mode in OVERALL_MODES else DEFAULT_OVERALL_MODE
+
+
+# ------------------------------------------------------------
+# TASK TREES
+# ------------------------------------------------------------
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+
+def _weight(value):
+    """A task's Weight as used in rollups: blank, non-numeric or negative counts as 0."""
+    value = _number(value)
+    return value if value is not None and value > 0 else 0.0
+
+
+def _task_id(value):
+    if value is None or pd.isna(value):
+        return None
+    return int(value)
+
+
+def _numbers(column):
+    """A column as floats (NaN for blanks and text)."""
+    return pd.to_numeric(column, errors='coerce').astype(float)
+
+
+def _weights(column):
+    """Vectorised _weight() (also used for Duration, which is read the same way)."""
+    return _numbers(column).fillna(0.0).clip(lower=0.0)
+
+
+def _ids(column):
+    """An ID column as a list of ints, None for blanks."""
+    return [None if v != v else int(v) for v in _numbers(column).tolist()]
+
+
+class _Totals:
+    """Running sums over the progress values of one group of sibling tasks."""
+
+    __slots__ = ('weight', 'weighted', 'total', 'count', 'duration', 'timed')
+
+    def __init__(self):
+        self.weight = self.weighted = self.total = self.duration = self.timed = 0.0
+        self.count = 0
+
+    def add(self, weight, value, sign=1, duration=0.0):
+        self.count += sign
+        if not self.count:
+            self.weight = self.weighted = self.total = self.duration = self.timed = 0.0
+            return
+        self.weight += sign * weight
+        self.weighted += sign * weight * value
+        self.total += sign * value
+        self.duration += sign * duration
+        self.timed += sign * duration * value
+
+    def value(self):
+        """Weighted mean, the plain mean if no member has a Weight, or None when empty."""
+        if not self.count:
+            return None
+        if self.weight > 1e-9:
+            return self.weighted / self.weight
+        return self.total / self.count
+
+
+def rollup_tasks(tasks):
+    """Roll Progress up the task trees in one children-before-parents pass.
+
+    Returns a frame aligned with tasks: Rolled is the task's rolled-up
+    progress, Parent the ParentTaskID in effect (NA for a top-level task) and
+    Subtasks its number of subtasks. A ParentTaskID naming a missing task,
+    the task itself or another project's task is ignored, and so is the link
+    that closes a cycle.
+    """
+    ids = _ids(tasks['TaskID'])
+    pids = _ids(tasks['ProjectID'])
+    own = [None if v != v else v for v in _numbers(tasks['Progress']).tolist()]
+    weights = _weights(tasks['Weight']).tolist()
+    position = {tid: i for i, tid in enumerate(ids)}
+
+    parent = []
+    for i, raw in enumerate(_ids(tasks['ParentTaskID'])):
+        j = position.get(raw, -1)
+        parent.append(j if j >= 0 and j != i and pids[j] == pids[i] else -1)
+    if max(parent, default=-1) < 0:  # no subtasks anywhere
+        return pd.DataFrame({
+            'Rolled': pd.Series(own, index=tasks.index, dtype=float),
+            'Parent': pd.array([None] * len(ids), dtype='Int64'),
+            'Subtasks': 0,
+        }, index=tasks.index)
+
+    # Follow each chain of parents; a chain that comes back to itself is a cycle
+    state = [0] * len(ids)  # 0 unseen, 1 on the current chain, 2 done
+    for start in range(len(ids)):
+        chain = []
+        i = start
+        while i >= 0 and not state[i]:
+            state[i] = 1
+            chain.append(i)
+            i = parent[i]
+        if i >= 0 and state[i] == 1:
+            parent[i] = -1
+        for j in chain:
+            state[j] = 2
+
+    children = [[] for _ in ids]
+    for i, j in enumerate(parent):
+        if j >= 0:
+            children[j].append(i)
+    order = [i for i, j in enumerate(parent) if j < 0]
+    for i in order:  # grows while iterating: every task comes after its parent
+        order.extend(children[i])
+
+    totals = [None] * len(ids)
+    rolled = [None] * len(ids)
+    for i in reversed(order):
+        value = totals[i].value() if totals[i] is not None else None
+        rolled[i] = own[i] if value is None else value
+        j = parent[i]
+        if j >= 0 and rolled[i] is not None:
+            if totals[j] is None:
+                totals[j] = _Totals()
+            totals[j].add(weights[i], rolled[i])
+
+    return pd.DataFrame({
+        'Rolled': pd.Series(rolled, index=tasks.index, dtype=float),
+        'Parent': pd.array([ids[j] if j >= 0 else None for j in parent], dtype='Int64'),
+        'Subtasks': [len(c) for c in children],
+    }, index=tasks.index)
+
+
+def overall_progress(subprogress, sums, mode=None):
+    """OverallProgress for each row of subprogress (the sub-progress columns) under mode.
+
+    sums has the PROJECT_SUMS of the same projects' top-level tasks: the
+    number of categories with tasks and the totals of Weight, Weight x
+    progress, Duration and Duration x progress. mode defaults to overall_mode().
+    """
+    mode = mode or overall_mode()
+    total = subprogress.sum(axis=1)
+    if mode == 'equal':
+        return total / len(TASK_SUBCATEGORIES)
+    present = (total / sums['categories']).where(sums['categories'] > 0, 0.0)
+    if mode == 'present':
+        return present
+    weight, weighted = ('duration', 'timed') if mode == 'duration' else ('weight', 'weighted')
+    return (sums[weighted] / sums[weight]).where(sums[weight] > 1e-9, present)
+
+
+def compute_rollups(tasks, project_ids, mode=None):
+    """Return a frame indexed by project_ids with the sub-progress columns and OverallProgress."""
+    tree = rollup_tasks(tasks)
+    top = (tree['Parent'].isna() & tree['Rolled'].notna()).values
+    rolled = tree['Rolled'][top]
+    weight = _weights(tasks['Weight'][top])
+    duration = _weights(tasks['Duration'][top])
+    sums = pd.DataFrame({
+        'weight': weight, 'weighted': weight * rolled, 'total': rolled, 'count': 1,
+        'duration': duration, 'timed': duration * rolled,
+    }).groupby([tasks['ProjectID'][top], tasks['Category'][top]], observed=True).sum()
+    index = pd.Index(project_ids, name='ProjectID')
+    means = (
+        (sums['weighted'] / sums['weight']).where(sums['weight'] > 1e-9, sums['total'] / sums['count'])
+        .unstack('Category')
+        .reindex(index=index, columns=list(TASK_SUBCATEGORIES))
+        .fillna(0.0)
+    )
+    means.columns = SUBPROGRESS_COLUMNS
+    # The categories' sums added up per project (a groupby over at most 18 rows per project)
+    project_sums = sums.assign(categories=1).groupby(level='ProjectID', observed=True)[PROJECT_SUMS].sum()
+    means['OverallProgress'] = overall_progress(means[SUBPROGRESS_COLUMNS],
+                                                project_sums.reindex(index).fillna(0.0), mode)
+    return means
+
+
+def _changed(rollups, current):
+    current = current[ROLLUP_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    return ((current - rollups).abs() > 1e-9).any(axis=1) | current.isna().any(axis=1)
+
+
+def _store_parent_progress(progress):
+    """Write rolled-up Progress ({TaskID: value}) into parent tasks in one bulk update."""
+    if progress:
+        ds.update_rows('Tasks', list(progress), {'Progress': list(progress.values())})
+
+
+def set_overall_mode(mode):
+    """Save a new OverallProgress weighting with the data and recompute every project with it.
+
+    Returns the number of projects updated.
+    """
+    if mode not in OVERALL_MODES:
+        raise ValueError(f"Unknown overall progress mode {mode!r}; use one of {', '.join(OVERALL_MODES)}")
+    if mode != ds.get_setting(OVERALL_MODE_SETTING):
+        ds.set_setting(OVERALL_MODE_SETTING, mode)
+    return recompute_projects()
+
+
+def recompute_projects(project_ids=None):
+    """Recompute and store sub-progress for the given projects (all when None).
+
+    Named projects are read from the running aggregates, which also give the
+    parent tasks whose rolled-up Progress changed; None rolls up every task
+    tree from tasks_df. Only tasks and projects whose values actually changed
+    are written. Returns the number of projects updated.
+    """
+    if project_ids is None:
+        project_ids = ds.projects_df['ProjectID'].dropna().tolist()
+        tasks = ds.tasks_df
+        tree = rollup_tasks(tasks)
+        own = pd.to_numeric(tasks['Progress'], errors='coerce')
+        stale = (tree['Subtasks'] > 0) & tree['Rolled'].notna() & ~((own - tree['Rolled']).abs() <= 1e-9)
+        _store_parent_progress(dict(zip(tasks['TaskID'][stale].tolist(), tree['Rolled'][stale].tolist())))
+        rollups = compute_rollups(tasks, project_ids)
+        current = ds.projects_df.set_index('ProjectID').reindex(rollups.index)
+    else:
+        project_ids = [pid for pid in project_ids if ds.find_row('Projects', pid) is not None]
+        if not project_ids:
+            return 0
+        _store_parent_progress(aggregates.take_parent_progress())
+        rollups = aggregates.rollups(project_ids)
+        if CHECK_AGGREGATES:
+            tasks = ds.tasks_df[ds.tasks_df['ProjectID'].isin(project_ids)]
+            if not ((rollups - compute_rollups(tasks, project_ids)).abs() <= 1e-6).all().all():
+                print(f"Aggregate mismatch for projects {project_ids}: {aggregates.check_consistency()}")
+        current = pd.DataFrame([ds.find_row('Projects', pid) for pid in project_ids], index=rollups.index)
+
+    rollups = rollups[_changed(rollups, current)]
+    if rollups.empty:
+        return 0
+    ds.update_rows(
+        'Projects', rollups.index.tolist(),
+        {col: rollups[col].tolist() for col in ROLLUP_COLUMNS}
+    )
+    return len(rollups)
+
+
+# ------------------------------------------------------------
+# INCREMENTAL AGGREGATES
+# ------------------------------------------------------------
+# Set PROJECT_TRACKER_CHECK_AGGREGATES=1 to verify every incremental rollup
+# against a full recompute (slow; for debugging).
+CHECK_AGGREGATES = os.environ.get("PROJECT_TRACKER_CHECK_AGGREGATES") == "1"
+
+
+class ProgressAggregates:
+    """Running totals that make per-project rollups O(categories).
+
+    Keeps each task's rolled-up progress, the totals of every parent task's
+    subtasks and of each (ProjectID, Category)'s top-level tasks, and the
+    resolved/total pending-work counts per TaskID. Each row-level change is
+    applied from the change entry, walking only the changed task's ancestor
+    chain; a reload, or a change that reshapes the trees in a way that cannot
+    be followed locally (a cycle, a parent moved to another project, a
+    parent deleted before its subtasks), marks the totals stale and they are
+    rebuilt from the sheets on next use.
+    """
+
+    def __init__(self):
+        self.built = False
+
+    def rebuild(self):
+        self._tasks = {}  # TaskID -> (ProjectID, Category, Progress, Weight, parent TaskID or None, Duration)
+        self._rolled = {}
+        self._children = defaultdict(set)
+        self._subtask_totals = defaultdict(_Totals)
+        self._category_totals = defaultdict(_Totals)
+        self._project_tasks = defaultdict(set)
+        self._waiting = defaultdict(set)  # missing ParentTaskID -> tasks naming it
+        self._parents_to_store = set()
+        tasks = ds.tasks_df
+        tree = rollup_tasks(tasks)
+        for tid, pid, cat, prog, weight, raw, parent, rolled, duration in zip(
+                tasks['TaskID'].tolist(), tasks['ProjectID'].tolist(), tasks['Category'].tolist(),
+                _numbers(tasks['Progress']).tolist(), _weights(tasks['Weight']).tolist(),
+                _ids(tasks['ParentTaskID']), _ids(tree['Parent']), tree['Rolled'].tolist(),
+                _weights(tasks['Duration']).tolist()):
+            self._tasks[tid] = (pid, cat, None if prog != prog else prog, weight, parent, duration)
+            self._rolled[tid] = None if rolled != rolled else rolled
+            self._project_tasks[pid].add(tid)
+            if parent is not None:
+                self._children[parent].add(tid)
+            elif raw is not None and raw not in self._tasks:
+                self._waiting[raw].add(tid)
+            self._contribute(tid, 1)
+        self._waiting = defaultdict(set, {p: tids for p, tids in self._waiting.items() if p not in self._tasks})
+        self._parents_to_store = set(self._children)
+
+        self.pending = defaultdict(lambda: [0, 0])
+        self._pending_items = {}
+        self._task_pending = defaultdict(set)
+        self._project_pending = defaultdict(set)
+        pending = ds.pending_work_df
+        for pend_id, tid, pid, status in zip(pending['PendingID'].tolist(), pending['TaskID'].tolist(),
+                                             pending['ProjectID'].tolist(), pending['Status'].tolist()):
+            self._add_pending(pend_id, tid, pid, status)
+        self.built = True
+
+    def _ensure_built(self):
+        if not self.built:
+            self.rebuild()
+
+    # -- tasks ---------------------------------------------------
+    def _contribute(self, tid, sign):
+        """Add (1) or take away (-1) a task's rolled progress from its parent's or category's totals."""
+        value = self._rolled[tid]
+        if value is not None:
+            pid, cat, prog, weight, parent, duration = self._tasks[tid]
+            totals = self._subtask_totals[parent] if parent is not None else self._category_totals[(pid, cat)]
+            totals.add(weight, value, sign, duration)
+
+    def _roll_up(self, tid):
+        """Re-derive a task's rolled progress and carry any change up its ancestor chain."""
+        while tid is not None and tid in self._tasks:
+            totals = self._subtask_totals.get(tid)
+            value = totals.value() if totals is not None else None
+            if value is None:
+                value = self._tasks[tid][2]
+            if value == self._rolled[tid]:
+                return
+            self._contribute(tid, -1)
+            self._rolled[tid] = value
+            self._contribute(tid, 1)
+            if self._children.get(tid):
+                self._parents_to_store.add(tid)
+            tid = self._tasks[tid][4]
+
+    def _resolve_parent(self, tid, pid, raw):
+        """The ParentTaskID in effect for a task (see rollup_tasks), or False if it would close a cycle."""
+        parent = _task_id(raw)
+        if parent is None or parent == tid or parent not in self._tasks:
+            if parent is not None and parent != tid:
+                self._waiting[parent].add(tid)
+            return None
+        if self._tasks[parent][0] != pid:
+            return None
+        ancestor = parent
+        while ancestor is not None:
+            if ancestor == tid:
+                return False
+            ancestor = self._tasks[ancestor][4]
+        return parent
+
+    def _add_task(self, tid, pid, cat, prog, weight, raw_parent, duration):
+        if tid in self._waiting:
+            # Tasks already name this one as their parent: re-hang them on a rebuild
+            self.built = False
+            return
+        parent = self._resolve_parent(tid, pid, raw_parent) or None  # a new task closes no cycle
+        self._tasks[tid] = (pid, cat, _number(prog), _weight(weight), parent, _weight(duration))
+        self._rolled[tid] = None
+        self._project_tasks[pid].add(tid)
+        if parent is not None:
+            self._children[parent].add(tid)
+        self._roll_up(tid)
+
+    def _remove_task(self, tid):
+        old = self._tasks.get(tid)
+        if old is None:
+            return None
+        pid, cat, prog, weight, parent, duration = old
+        self._contribute(tid, -1)
+        del self._tasks[tid]
+        del self._rolled[tid]
+        self._project_tasks[pid].discard(tid)
+        self._parents_to_store.discard(tid)
+        if not self._children.get(tid):
+            self._children.pop(tid, None)
+            self._subtask_totals.pop(tid, None)
+        if parent is not None:
+            self._children[parent].discard(tid)
+            self._roll_up(parent)
+        return old
+
+    def _update_task(self, tid, values):
+        old = self._tasks.get(tid)
+        if old is None:
+            return
+        pid, cat, prog, weight, parent, duration = old
+        new_pid = values.get('ProjectID', pid)
+        if new_pid != pid and (parent is not None or self._children.get(tid)):
+            self.built = False
+            return
+        if 'ParentTaskID' in values:
+            new_parent = self._resolve_parent(tid, new_pid, values['ParentTaskID'])
+            if new_parent is False:
+                self.built = False
+                return
+        else:
+            new_parent = parent
+
+        self._contribute(tid, -1)
+        if new_pid != pid:
+            self._project_tasks[pid].discard(tid)
+            self._project_tasks[new_pid].add(tid)
+        if new_parent != parent:
+            if parent is not None:
+                self._children[parent].discard(tid)
+            if new_parent is not None:
+                self._children[new_parent].add(tid)
+        self._tasks[tid] = (new_pid, values.get('Category', cat),
+                            _number(values['Progress']) if 'Progress' in values else prog,
+                            _weight(values['Weight']) if 'Weight' in values else weight,
+                            new_parent,
+                            _weight(values['Duration']) if 'Duration' in values else duration)
+        self._contribute(tid, 1)
+        self._roll_up(tid)
+        self._roll_up(new_parent)  # its Weight or parent may have changed even if its progress did not
+        if new_parent != parent:
+            self._roll_up(parent)
+
+    # -- pending work --------------------------------------------
+    def _add_pending(self, pend_id, tid, pid, status):
+        resolved = status == "Resolved"
+        self._pending_items[pend_id] = (tid, pid, resolved)
+        self._task_pending[tid].add(pend_id)
+        self._project_pending[pid].add(pend_id)
+        counts = self.pending[tid]
+        counts[0] += resolved
+        counts[1] += 1
+
+    def _remove_pending(self, pend_id):
+        old = self._pending_items.pop(pend_id, None)
+        if old is None:
+            return None
+        tid, pid, resolved = old
+        self._task_pending[tid].discard(pend_id)
+        self._project_pending[pid].discard(pend_id)
+        counts = self.pending[tid]
+        counts[0] -= resolved
+        counts[1] -= 1
+        if not counts[1]:
+            del self.pending[tid]
+        return old
+
+    def _update_pending(self, pend_id, values):
+        old = self._remove_pending(pend_id)
+        if old is not None:
+            tid, pid, resolved = old
+            status = values.get('Status', "Resolved" if resolved else None)
+            self._add_pending(pend_id, values.get('TaskID', tid), values.get('ProjectID', pid), status)
+
+    # -- change feed ---------------------------------------------
+    def on_change(self, entry):
+        op = entry['op']
+        if op == 'load':
+            self.built = False
+        if not self.built or op == 'load':
+            return
+        sheet = entry['sheet']
+        if sheet == 'Tasks':
+            add, remove, update = self._add_task, self._remove_task, self._update_task
+            by_parent = {'ProjectID': self._project_tasks}
+            fields = ('TaskID', 'ProjectID', 'Category', 'Progress', 'Weight', 'ParentTaskID', 'Duration')
+        elif sheet == 'PendingWork':
+            add, remove, update = self._add_pending, self._remove_pending, self._update_pending
+            by_parent = {'TaskID': self._task_pending, 'ProjectID': self._project_pending}
+            fields = ('PendingID', 'TaskID', 'ProjectID', 'Status')
+        else:
+            return
+
+        if op == 'insert':
+            row = entry['row']
+            remove(row.get(fields[0]))
+            add(*(row.get(f) for f in fields))
+        elif op == 'insert_many':
+            for row in entry['rows']:
+                remove(row.get(fields[0]))
+                add(*(row.get(f) for f in fields))
+        elif op == 'update':
+            update(entry['key'], entry['values'])
+        elif op == 'update_many':
+            for i, key in enumerate(entry['keys']):
+                update(key, {col: vals[i] for col, vals in entry['values'].items()})
+        elif op == 'delete':
+            column = entry['column']
+            if column == fields[0]:
+                removed = entry['keys']
+            elif column in by_parent:
+                removed = [key for parent in entry['keys'] for key in list(by_parent[column].pop(parent, ()))]
+            else:
+                self.built = False
+                return
+            for key in removed:
+                remove(key)
+            if sheet == 'Tasks':
+                if any(self._children.get(key) for key in removed):
+                    self.built = False  # subtasks outlived their parent
+                    return
+                for key in removed:
+                    self._children.pop(key, None)
+                    self._subtask_totals.pop(key, None)
+
+    # -- queries -------------------------------------------------
+    def pending_counts(self, task_id):
+        """(resolved, total) pending-work items for a task."""
+        self._ensure_built()
+        counts = self.pending.get(task_id)
+        return tuple(counts) if counts else (0, 0)
+
+    def subtree(self, task_id):
+        """task_id and all of its subtasks, every subtask before its parent."""
+        self._ensure_built()
+        order = [task_id]
+        for tid in order:
+            order.extend(self._children.get(tid, ()))
+        return order[::-1]
+
+    def parent_of(self, task_id):
+        """The ParentTaskID in effect for a task, or None for a top-level task."""
+        self._ensure_built()
+        task = self._tasks.get(task_id)
+        return task[4] if task is not None else None
+
+    def take_parent_progress(self):
+        """{TaskID: rolled progress} for parent tasks whose stored Progress is out of date."""
+        self._ensure_built()
+        progress = {}
+        for tid in self._parents_to_store:
+            rolled = self._rolled.get(tid)
+            if self._children.get(tid) and rolled is not None:
+                stored = self._tasks[tid][2]
+                if stored is None or abs(stored - rolled) > 1e-9:
+                    progress[tid] = rolled
+        self._parents_to_store = set()
+        return progress
+
+    def rollups(self, project_ids, mode=None):
+        """Same frame as compute_rollups(), read from the running totals."""
+        self._ensure_built()
+        data = {col: [] for col in SUBPROGRESS_COLUMNS}
+        sums = {field: [] for field in PROJECT_SUMS}
+        for pid in project_ids:
+            present = []
+            for cat, col in TASK_SUBCATEGORIES.items():
+                totals = self._category_totals.get((pid, cat))
+                value = totals.value() if totals is not None else None
+                data[col].append(0.0 if value is None else value)
+                if value is not None:
+                    present.append(totals)
+            sums['categories'].append(len(present))
+            for field in PROJECT_SUMS[1:]:
+                sums[field].append(sum(getattr(totals, field) for totals in present))
+        index = pd.Index(project_ids, name='ProjectID')
+        rollups = pd.DataFrame(data, index=index)
+        rollups['OverallProgress'] = overall_progress(rollups[SUBPROGRESS_COLUMNS], pd.DataFrame(sums, index=index),
+                                                      mode)
+        return rollups
+
+    def check_consistency(self):
+        """Compare the running totals with a full recompute; returns a list of mismatches."""
+        self._ensure_built()
+        problems = []
+        project_ids = ds.projects_df['ProjectID'].dropna().tolist()
+        expected = compute_rollups(ds.tasks_df, project_ids)
+        diff = (self.rollups(project_ids) - expected).abs() > 1e-6
+        for pid, col in zip(*diff.values.nonzero()):
+            problems.append(f"project {project_ids[pid]}: {ROLLUP_COLUMNS[col]} differs from full recompute")
+
+        tree = rollup_tasks(ds.tasks_df)
+        for tid, rolled, parent in zip(ds.tasks_df['TaskID'].tolist(), tree['Rolled'].tolist(),
+                                       tree['Parent'].tolist()):
+            mine = self._rolled.get(tid)
+            if _task_id(parent) != self.parent_of(tid):
+                problems.append(f"task {tid}: parent {self.parent_of(tid)}, expected {_task_id(parent)}")
+            elif (mine is None) != (rolled != rolled) or (mine is not None and abs(mine - rolled) > 1e-6):
+                problems.append(f"task {tid}: rolled progress {mine}, expected {rolled}")
+
+        pending = ds.pending_work_df
+        totals = pending.groupby('TaskID').size()
+        resolved = (pending['Status'] == "Resolved").groupby(pending['TaskID']).sum()
+        for tid in set(totals.index) | set(self.pending):
+            want = (int(resolved.get(tid, 0)), int(totals.get(tid, 0)))
+            if self.pending_counts(tid) != want:
+                problems.append(f"task {tid}: pending counts {self.pending_counts(tid)}, expected {want}")
+        return problems
+
+
+aggregates = ProgressAggregates()
+ds.add_change_listener(aggregates.on_change)
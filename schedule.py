@@ -0,0 +1,471 @@
+"""
+Critical-path scheduling over task Durations and task-to-task dependencies.
+
+A row of the Dependencies sheet says its SuccessorID may start LagDays after
+its PredecessorID finishes. Scheduler computes, in days from the start of
+each project, every task's earliest and latest start and finish, its total
+float and whether it is critical (no float), with a topological sort of the
+project's dependency graph. Like the search and due-date indexes it is built
+on first use and kept current from the datastore's change feed: a changed
+Duration or link re-runs the forward pass only over the tasks it actually
+delays and the backward pass only over the tasks whose remaining path it
+changes, both in a topological order that is kept up to date link by link.
+A project whose dependencies form a cycle is reported instead of scheduled.
+"""
+import heapq
+from collections import defaultdict, namedtuple
+
+import pandas as pd
+
+import datastore as ds
+
+# Floats below this many days count as zero (critical)
+FLOAT_TOLERANCE = 1e-9
+
+TaskSchedule = namedtuple('TaskSchedule',
+                          'task_id early_start early_finish late_start late_finish total_float critical')
+
+# finish: project duration in days; critical_path: TaskIDs of one chain of critical tasks
+# linked start to finish; cycle: TaskIDs around a dependency cycle (empty if none)
+ProjectSchedule = namedtuple('ProjectSchedule', 'finish critical_path cycle')
+
+
+def _days(value):
+    """A Duration/LagDays cell as float days (blank or text counts as 0)."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+
+def _id(value):
+    if value is None or pd.isna(value):
+        return None
+    return int(value)
+
+
+class Scheduler:
+    """Early dates and remaining-path lengths per task, kept in topological order.
+
+    Every scheduled task has a rank that increases along each link of its
+    project. A change pushes the tasks it touches onto a heap; the forward
+    pass pops them by rank and the backward pass by descending rank, and a
+    task's successors (or predecessors) are only pushed if its own values
+    moved. A new link that goes against the ranks reorders just the tasks
+    between its ends (Pearce-Kelly), which is also where a new cycle shows
+    up. Late dates are kept as each task's tail, the longest chain of lags
+    and durations after it, so a new project finish needs no pass at all.
+
+    Dependencies are kept whatever they point at; a link is active only
+    while both of its tasks exist in the same project, so deleting a task
+    simply drops it from the passes.
+    """
+
+    def __init__(self):
+        self.built = False
+
+    def rebuild(self):
+        self._tasks = {}  # TaskID -> (ProjectID, duration)
+        self._project_tasks = defaultdict(set)
+        self._links = {}  # DependencyID -> (predecessor, successor, lag, ProjectID)
+        self._out = defaultdict(set)  # TaskID -> DependencyIDs it precedes
+        self._in = defaultdict(set)  # TaskID -> DependencyIDs it succeeds
+        self._rank = {}
+        self._next_rank = 0
+        self._early_start, self._early_finish, self._tail = {}, {}, {}
+        self._finish = {}
+        self._cycles = {}
+        self._unordered = set()  # projects to schedule from scratch on their next change
+        tasks = ds.tasks_df
+        for tid, pid, duration in zip(tasks['TaskID'].tolist(), tasks['ProjectID'].tolist(),
+                                      tasks['Duration'].tolist()):
+            self._set_task(_id(tid), _id(pid), duration)
+        deps = ds.dependencies_df
+        columns = ['DependencyID', 'PredecessorID', 'SuccessorID', 'LagDays', 'ProjectID']
+        for row in deps[columns].itertuples(index=False):
+            self._add_link(*row)
+        for pid in list(self._project_tasks):
+            self._schedule(pid)
+        self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            self.rebuild()
+
+    # -- graph ---------------------------------------------------
+    def _set_task(self, tid, pid, duration):
+        if tid is not None:
+            self._tasks[tid] = (pid, max(_days(duration), 0.0))
+            self._project_tasks[pid].add(tid)
+
+    def _add_link(self, dep_id, pred, succ, lag, pid):
+        dep_id, pred, succ = _id(dep_id), _id(pred), _id(succ)
+        self._links[dep_id] = (pred, succ, _days(lag), _id(pid))
+        self._out[pred].add(dep_id)
+        self._in[succ].add(dep_id)
+
+    def _remove_link(self, dep_id):
+        link = self._links.pop(dep_id, None)
+        if link is not None:
+            self._out[link[0]].discard(dep_id)
+            self._in[link[1]].discard(dep_id)
+        return link
+
+    def _active(self, pred, succ):
+        a, b = self._tasks.get(pred), self._tasks.get(succ)
+        return a is not None and b is not None and a[0] == b[0] and pred != succ
+
+    def predecessors(self, tid):
+        """(TaskID, lag) for each active link into tid."""
+        for dep_id in self._in.get(tid, ()):
+            pred, succ, lag, _ = self._links[dep_id]
+            if self._active(pred, succ):
+                yield pred, lag
+
+    def successors(self, tid):
+        """(TaskID, lag) for each active link out of tid."""
+        for dep_id in self._out.get(tid, ()):
+            pred, succ, lag, _ = self._links[dep_id]
+            if self._active(pred, succ):
+                yield succ, lag
+
+    def _reachable(self, start, step, within=None):
+        """start plus every task reachable from it through step, optionally only through tasks in within()."""
+        seen = {start}
+        stack = [start]
+        while stack:
+            for tid, _ in step(stack.pop()):
+                if tid not in seen and (within is None or within(tid)):
+                    seen.add(tid)
+                    stack.append(tid)
+        return seen
+
+    def _order(self, nodes):
+        """(order, left): nodes in topological order (Kahn's algorithm), and those
+        that could not be ordered because they are on or behind a cycle."""
+        indegree = {tid: sum(1 for _ in self.predecessors(tid)) for tid in nodes}
+        ready = [tid for tid, count in indegree.items() if not count]
+        order = []
+        while ready:
+            tid = ready.pop()
+            order.append(tid)
+            for succ, _ in self.successors(tid):
+                indegree[succ] -= 1
+                if not indegree[succ]:
+                    ready.append(succ)
+        return order, set(nodes) - set(order)
+
+    def _find_cycle(self, nodes):
+        """TaskIDs around one cycle among nodes (which must contain one), in link order."""
+        tid = next(iter(nodes))
+        path, seen = [], {}
+        while tid not in seen:
+            seen[tid] = len(path)
+            path.append(tid)
+            tid = next(pred for pred, _ in self.predecessors(tid) if pred in nodes)
+        return path[seen[tid]:][::-1]
+
+    def _reorder(self, pred, succ):
+        """Restore the rank order after a link pred -> succ was added; False if it closes a cycle."""
+        low, high = self._rank[succ], self._rank[pred]
+        if low > high:
+            return True
+        after = self._reachable(succ, self.successors, lambda tid: self._rank[tid] <= high)
+        if pred in after:
+            return False
+        before = self._reachable(pred, self.predecessors, lambda tid: self._rank[tid] >= low)
+        ranks = sorted(self._rank[tid] for tid in before | after)
+        moved = sorted(before, key=self._rank.get) + sorted(after, key=self._rank.get)
+        self._rank.update(zip(moved, ranks))
+        return True
+
+    # -- passes --------------------------------------------------
+    def _set_early(self, tid):
+        """Re-derive a task's early dates from its predecessors; True if they moved."""
+        start = max([0.0] + [self._early_finish[pred] + lag for pred, lag in self.predecessors(tid)])
+        finish = start + self._tasks[tid][1]
+        if self._early_start.get(tid) == start and self._early_finish.get(tid) == finish:
+            return False
+        self._early_start[tid] = start
+        self._early_finish[tid] = finish
+        return True
+
+    def _set_tail(self, tid):
+        """Re-derive a task's tail from its successors; True if it moved."""
+        tail = max([0.0] + [lag + self._tasks[succ][1] + self._tail[succ]
+                            for succ, lag in self.successors(tid) if succ in self._tail])
+        if self._tail.get(tid) == tail:
+            return False
+        self._tail[tid] = tail
+        return True
+
+    def _clear(self, tids):
+        for values in (self._rank, self._early_start, self._early_finish, self._tail):
+            for tid in tids:
+                values.pop(tid, None)
+
+    def _set_finish(self, pid):
+        self._finish[pid] = max([0.0] + [self._early_finish[tid] for tid in self._project_tasks.get(pid, ())
+                                         if tid in self._early_finish])
+
+    def _schedule(self, pid):
+        """Rank and schedule a whole project."""
+        self._unordered.discard(pid)
+        order, left = self._order(self._project_tasks.get(pid, set()))
+        self._clear(left)
+        if left:
+            self._cycles[pid] = self._find_cycle(left)
+        else:
+            self._cycles.pop(pid, None)
+        for tid in order:
+            self._rank[tid] = self._next_rank
+            self._next_rank += 1
+            self._early_start.pop(tid, None)
+            self._set_early(tid)
+        for tid in reversed(order):
+            self._tail.pop(tid, None)
+            self._set_tail(tid)
+        self._set_finish(pid)
+
+    def _reschedule(self, pid, forward, backward):
+        """Propagate a change: early dates from the forward seeds down through their
+        successors, tails from the backward seeds up through their predecessors."""
+        if pid in self._cycles or pid in self._unordered:
+            self._schedule(pid)
+            return
+        for seeds, sign, update, step in ((forward, 1, self._set_early, self.successors),
+                                          (backward, -1, self._set_tail, self.predecessors)):
+            heap = [(sign * self._rank[tid], tid) for tid in seeds if tid in self._tasks]
+            heapq.heapify(heap)
+            done = set()
+            while heap:
+                _, tid = heapq.heappop(heap)
+                if tid in done:
+                    continue
+                done.add(tid)
+                if update(tid):
+                    for other, _ in step(tid):
+                        heapq.heappush(heap, (sign * self._rank[other], other))
+        self._set_finish(pid)
+
+    # -- change feed ---------------------------------------------
+    def _changed_tasks(self, op, entry):
+        """{ProjectID: (forward seeds, backward seeds)} for a change to the Tasks sheet."""
+        seeds = defaultdict(lambda: (set(), set()))
+        if op in ('insert', 'insert_many'):
+            rows = [entry['row']] if op == 'insert' else entry['rows']
+            for row in rows:
+                tid = _id(row.get('TaskID'))
+                self._drop_task(tid, seeds)
+                self._set_task(tid, _id(row.get('ProjectID')), row.get('Duration'))
+                self._place(tid, seeds)
+        elif op in ('update', 'update_many'):
+            keys = [entry['key']] if op == 'update' else entry['keys']
+            for i, key in enumerate(keys):
+                values = entry['values'] if op == 'update' else {c: v[i] for c, v in entry['values'].items()}
+                tid = _id(key)
+                if tid not in self._tasks or not {'ProjectID', 'Duration'} & set(values):
+                    continue
+                pid, duration = self._tasks[tid]
+                new_pid = _id(values.get('ProjectID', pid))
+                if new_pid == pid:
+                    self._set_task(tid, pid, values.get('Duration', duration))
+                    self._touch(tid, seeds)
+                else:
+                    self._drop_task(tid, seeds)
+                    self._set_task(tid, new_pid, duration if 'Duration' not in values else values['Duration'])
+                    self._place(tid, seeds)
+        elif op == 'delete':
+            column = entry['column']
+            if column == 'TaskID':
+                removed = [_id(key) for key in entry['keys']]
+            elif column == 'ProjectID':
+                removed = [tid for pid in entry['keys'] for tid in list(self._project_tasks.get(_id(pid), ()))]
+            else:
+                self.built = False
+                return {}
+            for tid in removed:
+                self._drop_task(tid, seeds)
+        return seeds
+
+    def _touch(self, tid, seeds):
+        if tid not in self._tasks:
+            return
+        forward, backward = seeds[self._tasks[tid][0]]
+        forward.add(tid)
+        # A duration is part of its predecessors' tails, not its own
+        backward.add(tid)
+        backward.update(pred for pred, _ in self.predecessors(tid))
+
+    def _place(self, tid, seeds):
+        """Rank a task new to its project last, unless links already waiting for it
+        make the project need a full pass."""
+        if tid not in self._tasks:
+            return
+        if any(self.predecessors(tid)) or any(self.successors(tid)):
+            self._unordered.add(self._tasks[tid][0])
+        else:
+            self._rank[tid] = self._next_rank
+            self._next_rank += 1
+        self._touch(tid, seeds)
+
+    def _drop_task(self, tid, seeds):
+        """Take a task out of its project; its links' other ends are re-seeded."""
+        task = self._tasks.get(tid)
+        if task is None:
+            return
+        forward, backward = seeds[task[0]]
+        forward.update(succ for succ, _ in self.successors(tid))
+        backward.update(pred for pred, _ in self.predecessors(tid))
+        del self._tasks[tid]
+        self._project_tasks[task[0]].discard(tid)
+        self._clear([tid])
+
+    def _changed_links(self, op, entry):
+        """{ProjectID: (forward seeds, backward seeds)} for a change to the Dependencies sheet."""
+        seeds = defaultdict(lambda: (set(), set()))
+        changed, added = [], []  # (predecessor, successor) of every link removed or added
+        if op in ('insert', 'insert_many'):
+            for row in [entry['row']] if op == 'insert' else entry['rows']:
+                dep_id = _id(row.get('DependencyID'))
+                old = self._remove_link(dep_id)
+                if old is not None:
+                    changed.append(old[:2])
+                self._add_link(dep_id, row.get('PredecessorID'), row.get('SuccessorID'),
+                               row.get('LagDays'), row.get('ProjectID'))
+                added.append(self._links[dep_id][:2])
+        elif op in ('update', 'update_many'):
+            keys = [entry['key']] if op == 'update' else entry['keys']
+            for i, key in enumerate(keys):
+                values = entry['values'] if op == 'update' else {c: v[i] for c, v in entry['values'].items()}
+                old = self._remove_link(_id(key))
+                if old is None:
+                    continue
+                self._add_link(key, values.get('PredecessorID', old[0]), values.get('SuccessorID', old[1]),
+                               values.get('LagDays', old[2]), values.get('ProjectID', old[3]))
+                changed.append(old[:2])
+                added.append(self._links[_id(key)][:2])
+        elif op == 'delete':
+            column, keys = entry['column'], {_id(key) for key in entry['keys']}
+            if column == 'DependencyID':
+                dep_ids = keys
+            elif column == 'PredecessorID':
+                dep_ids = {dep_id for tid in keys for dep_id in self._out.get(tid, ())}
+            elif column == 'SuccessorID':
+                dep_ids = {dep_id for tid in keys for dep_id in self._in.get(tid, ())}
+            elif column == 'ProjectID':
+                dep_ids = {dep_id for dep_id, link in self._links.items() if link[3] in keys}
+            else:
+                self.built = False
+                return {}
+            for dep_id in dep_ids:
+                link = self._remove_link(dep_id)
+                if link is not None:
+                    changed.append(link[:2])
+        for pred, succ in added:
+            pid = self._tasks[pred][0] if self._active(pred, succ) else None
+            if pid is not None and pid not in self._unordered and pid not in self._cycles \
+                    and not self._reorder(pred, succ):
+                self._unordered.add(pid)
+        for pred, succ in changed + added:
+            task = self._tasks.get(succ)
+            if task is not None:
+                seeds[task[0]][0].add(succ)
+            task = self._tasks.get(pred)
+            if task is not None:
+                seeds[task[0]][1].add(pred)
+        return seeds
+
+    def on_change(self, entry):
+        op = entry['op']
+        if op == 'load':
+            self.built = False
+        if not self.built or op == 'load':
+            return
+        if entry['sheet'] == 'Tasks':
+            seeds = self._changed_tasks(op, entry)
+        elif entry['sheet'] == 'Dependencies':
+            seeds = self._changed_links(op, entry)
+        else:
+            return
+        if self.built:
+            for pid, (forward, backward) in seeds.items():
+                self._reschedule(pid, forward, backward)
+
+    # -- queries -------------------------------------------------
+    def task(self, task_id):
+        """TaskSchedule for a task, or None if it is unknown or caught in a cycle."""
+        self.ensure_built()
+        if task_id not in self._early_start or task_id not in self._tail:
+            return None
+        early_start, early_finish = self._early_start[task_id], self._early_finish[task_id]
+        late_finish = self._finish[self._tasks[task_id][0]] - self._tail[task_id]
+        late_start = late_finish - self._tasks[task_id][1]
+        total_float = late_start - early_start
+        return TaskSchedule(task_id, early_start, early_finish, late_start, late_finish,
+                            total_float, total_float <= FLOAT_TOLERANCE)
+
+    def project(self, project_id):
+        """ProjectSchedule: the finish day, a critical path and any cycle."""
+        self.ensure_built()
+        return ProjectSchedule(self._finish.get(project_id, 0.0), self._critical_chain(project_id),
+                               list(self._cycles.get(project_id, [])))
+
+    def _critical_chain(self, project_id):
+        """One chain of critical tasks from day 0 to the finish, each driving the next.
+
+        It starts at the earliest critical task and follows links into critical
+        successors that start exactly lag days after it finishes (the lowest
+        TaskID when there are several); a critical task always has one until
+        the project finish, so the chain covers the whole duration.
+        """
+        critical = {}
+        for tid in self._project_tasks.get(project_id, ()):
+            entry = self.task(tid)
+            if entry is not None and entry.critical:
+                critical[tid] = entry
+        if not critical:
+            return []
+        tid = min(critical.values(), key=lambda entry: (entry.early_start, entry.task_id)).task_id
+        chain = [tid]
+        while True:
+            finish = critical[tid].early_finish
+            driven = [succ for succ, lag in self.successors(tid)
+                      if succ in critical and abs(critical[succ].early_start - finish - lag) <= FLOAT_TOLERANCE]
+            if not driven:
+                return chain
+            tid = min(driven)
+            chain.append(tid)
+
+    def frame(self, project_id):
+        """The project's task schedules as a DataFrame in early-start order (cycle members last, blank)."""
+        self.ensure_built()
+        rows = []
+        for tid in self._project_tasks.get(project_id, ()):
+            entry = self.task(tid)
+            rows.append(entry if entry is not None else TaskSchedule(tid, *[None] * 5, False))
+        frame = pd.DataFrame(rows, columns=TaskSchedule._fields)
+        return frame.sort_values(['early_start', 'early_finish', 'task_id'], na_position='last') \
+            .reset_index(drop=True)
+
+    def check_link(self, predecessor_id, successor_id):
+        """Why predecessor -> successor cannot be added (None if it can)."""
+        self.ensure_built()
+        if predecessor_id == successor_id:
+            return "A task cannot depend on itself."
+        pred, succ = self._tasks.get(predecessor_id), self._tasks.get(successor_id)
+        if pred is None or succ is None:
+            return "Both tasks must exist."
+        if pred[0] != succ[0]:
+            return "Both tasks must belong to the same project."
+        if any(tid == successor_id for tid, _ in self.successors(predecessor_id)):
+            return f"Task {successor_id} already depends on task {predecessor_id}."
+        if predecessor_id in self._reachable(successor_id, self.successors):
+            return (f"Task {predecessor_id} already depends (indirectly) on task {successor_id}; "
+                    "this would make a cycle.")
+        return None
+
+
+scheduler = Scheduler()
+ds.add_change_listener(scheduler.on_change)
@@ -0,0 +1,179 @@
+"""
+Full-text search over tasks, pending work and orders.
+
+SearchIndex is an in-memory inverted index (word -> rows) over the text
+columns in SEARCH_FIELDS. Like rollup.ProgressAggregates it is built from the
+sheets on first use and then kept current from the datastore's change feed,
+so a query never scans the DataFrames: each word is looked up directly, the
+last one as a prefix so results narrow as you type.
+"""
+import bisect
+import heapq
+import re
+from collections import defaultdict, namedtuple
+
+import datastore as ds
+
+# Sheet -> text columns that are searched
+SEARCH_FIELDS = {
+    'Tasks': ['TaskName', 'PendingItems'],
+    'PendingWork': ['Description'],
+    'Orders': ['MissingItems', 'Company'],
+}
+
+# Results shown for one query (the total number of matches is still counted)
+SEARCH_LIMIT = 200
+
+_SHEET_ORDER = {sheet: i for i, sheet in enumerate(SEARCH_FIELDS)}
+_WORD = re.compile(r"\w+")
+
+SearchHit = namedtuple('SearchHit', 'sheet key project_id task_id field text')
+
+
+def tokenize(text):
+    """Lower-cased words of a cell value (nothing for blanks)."""
+    if text is None or text != text:  # None / NaN
+        return []
+    return _WORD.findall(str(text).lower())
+
+
+class SearchIndex:
+    """Word -> {(sheet, key)} postings plus the sorted vocabulary for prefix lookups."""
+
+    def __init__(self):
+        self.built = False
+
+    def rebuild(self):
+        self._docs = {}
+        self._postings = defaultdict(set)
+        self._vocab = []
+        # (sheet, parent column) -> parent key -> keys, for deletes by ProjectID/TaskID
+        self._children = defaultdict(lambda: defaultdict(set))
+        for sheet, fields in SEARCH_FIELDS.items():
+            df = ds.get_table(sheet)
+            key_col = ds.TABLES[sheet][1]
+            columns = [key_col, 'ProjectID', 'TaskID'] + fields
+            values = [df[col].tolist() if col in df else [None] * len(df) for col in columns]
+            for key, pid, tid, *texts in zip(*values):
+                self._add(sheet, key, pid, tid, dict(zip(fields, texts)))
+        self._vocab = sorted(self._postings)
+        self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            self.rebuild()
+
+    # -- documents -----------------------------------------------
+    def _add(self, sheet, key, project_id, task_id, texts):
+        doc = (sheet, key)
+        self._docs[doc] = (project_id, task_id, texts)
+        for column, parent in (('ProjectID', project_id), ('TaskID', task_id)):
+            if parent is not None:
+                self._children[(sheet, column)][parent].add(key)
+        for word in {word for text in texts.values() for word in tokenize(text)}:
+            postings = self._postings[word]
+            if not postings and self.built:
+                bisect.insort(self._vocab, word)
+            postings.add(doc)
+
+    def _remove(self, sheet, key):
+        doc = (sheet, key)
+        old = self._docs.pop(doc, None)
+        if old is None:
+            return None
+        project_id, task_id, texts = old
+        for column, parent in (('ProjectID', project_id), ('TaskID', task_id)):
+            if parent is not None:
+                self._children[(sheet, column)][parent].discard(key)
+        for word in {word for text in texts.values() for word in tokenize(text)}:
+            postings = self._postings[word]
+            postings.discard(doc)
+            if not postings:
+                del self._postings[word]
+                del self._vocab[bisect.bisect_left(self._vocab, word)]
+        return old
+
+    def _update(self, sheet, key, values):
+        if not any(col in values for col in SEARCH_FIELDS[sheet] + ['ProjectID', 'TaskID']):
+            return
+        old = self._remove(sheet, key)
+        if old is not None:
+            project_id, task_id, texts = old
+            texts = {field: values.get(field, text) for field, text in texts.items()}
+            self._add(sheet, key, values.get('ProjectID', project_id), values.get('TaskID', task_id), texts)
+
+    def _add_row(self, sheet, row):
+        key = row.get(ds.TABLES[sheet][1])
+        self._remove(sheet, key)
+        self._add(sheet, key, row.get('ProjectID'), row.get('TaskID'),
+                  {field: row.get(field) for field in SEARCH_FIELDS[sheet]})
+
+    # -- change feed ---------------------------------------------
+    def on_change(self, entry):
+        op = entry['op']
+        if op == 'load':
+            self.built = False
+        if not self.built or op == 'load' or entry['sheet'] not in SEARCH_FIELDS:
+            return
+        sheet = entry['sheet']
+
+        if op == 'insert':
+            self._add_row(sheet, entry['row'])
+        elif op == 'insert_many':
+            for row in entry['rows']:
+                self._add_row(sheet, row)
+        elif op == 'update':
+            self._update(sheet, entry['key'], entry['values'])
+        elif op == 'update_many':
+            for i, key in enumerate(entry['keys']):
+                self._update(sheet, key, {col: vals[i] for col, vals in entry['values'].items()})
+        elif op == 'delete':
+            column = entry['column']
+            if column == ds.TABLES[sheet][1]:
+                keys = entry['keys']
+            elif column in ('ProjectID', 'TaskID'):
+                by_parent = self._children[(sheet, column)]
+                keys = [key for parent in entry['keys'] for key in list(by_parent.pop(parent, ()))]
+            else:
+                self.built = False
+                return
+            for key in keys:
+                self._remove(sheet, key)
+
+    # -- queries -------------------------------------------------
+    def _prefixed(self, prefix):
+        start = bisect.bisect_left(self._vocab, prefix)
+        end = bisect.bisect_left(self._vocab, prefix + '\uffff')
+        return self._vocab[start:end]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """(hits, total): up to limit SearchHits whose text has every word of query.
+
+        The last word also matches as a prefix ("elec" finds "electrical").
+        Hits are ordered tasks, pending work, orders, then by ID.
+        """
+        self.ensure_built()
+        words = tokenize(query)
+        if not words:
+            return [], 0
+        sets = [self._postings.get(word, set()) for word in words[:-1]]
+        last = [self._postings[word] for word in self._prefixed(words[-1])]
+        sets.append(last[0] if len(last) == 1 else set().union(*last))
+        sets.sort(key=len)
+        matches = sets[0].intersection(*sets[1:])
+
+        docs = heapq.nsmallest(limit, matches, key=lambda doc: (_SHEET_ORDER[doc[0]], doc[1]))
+        return [self._hit(doc, words) for doc in docs], len(matches)
+
+    def _hit(self, doc, words):
+        sheet, key = doc
+        project_id, task_id, texts = self._docs[doc]
+        # The first field holding one of the query's words, for display
+        field = next((f for f, text in texts.items()
+                      if any(w.startswith(words[-1]) or w in words for w in tokenize(text))),
+                     SEARCH_FIELDS[sheet][0])
+        return SearchHit(sheet, key, project_id, task_id, field, texts[field])
+
+
+index = SearchIndex()
+ds.add_change_listener(index.on_change)
@@ -0,0 +1,121 @@
+"""Scheduler tests: known CPM values, cycle reporting and incremental updates vs a rebuild."""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datastore as ds  # noqa: E402
+import main  # noqa: E402
+import schedule  # noqa: E402
+
+
+def _task(tid, pid, duration):
+    return {'TaskID': tid, 'ProjectID': pid, 'TaskName': f"Task {tid}", 'Duration': duration, 'Weight': 0,
+            'Progress': 0, 'ParentTaskID': None, 'Category': 'IT', 'PendingItems': ''}
+
+
+def _link(dep_id, pid, pred, succ, lag=0):
+    return {'DependencyID': dep_id, 'ProjectID': pid, 'PredecessorID': pred, 'SuccessorID': succ, 'LagDays': lag}
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    """An empty Excel store in a temp directory, loaded and announced to the scheduler."""
+    monkeypatch.chdir(tmp_path)
+    ds.set_storage("excel")
+    ds.load_data()
+    ds.insert_rows('Projects', [{'ProjectID': pid, 'ProjectName': f"Project {pid}", 'Notes': ''} for pid in (1, 2, 3)])
+    yield
+    ds.storage.close()
+
+
+@pytest.fixture
+def diamond(data):
+    # 1 -> 2 -> 4 and 1 -> 3 -> 4; the longer branch runs through 3
+    ds.insert_rows('Tasks', [_task(1, 1, 3), _task(2, 1, 2), _task(3, 1, 5), _task(4, 1, 1)])
+    ds.insert_rows('Dependencies', [_link(1, 1, 1, 2), _link(2, 1, 1, 3), _link(3, 1, 2, 4), _link(4, 1, 3, 4)])
+
+
+def test_diamond_dates(diamond):
+    expected = {
+        # task: (ES, EF, LS, LF, float)
+        1: (0, 3, 0, 3, 0),
+        2: (3, 5, 6, 8, 3),
+        3: (3, 8, 3, 8, 0),
+        4: (8, 9, 8, 9, 0),
+    }
+    for tid, values in expected.items():
+        entry = schedule.scheduler.task(tid)
+        assert (entry.early_start, entry.early_finish, entry.late_start, entry.late_finish,
+                entry.total_float) == pytest.approx(values)
+        assert entry.critical == (values[-1] == 0)
+    summary = schedule.scheduler.project(1)
+    assert summary.finish == 9
+    assert summary.critical_path == [1, 3, 4]
+    assert summary.cycle == []
+
+
+def test_diamond_lag_moves_the_critical_path(diamond):
+    ds.update_row('Dependencies', 1, {'LagDays': 4})
+    entry = schedule.scheduler.task(2)
+    assert (entry.early_start, entry.early_finish, entry.total_float) == (7, 9, 0)
+    summary = schedule.scheduler.project(1)
+    assert summary.finish == 10
+    assert summary.critical_path == [1, 2, 4]
+    assert schedule.scheduler.task(3).total_float == 1
+
+
+def test_cycle_is_detected_and_reported(diamond, capsys):
+    assert "cycle" in schedule.scheduler.check_link(4, 1)
+    ds.insert_row('Dependencies', _link(5, 1, 4, 1))
+    summary = schedule.scheduler.project(1)
+    assert set(summary.cycle) in ({1, 2, 4}, {1, 3, 4})
+    assert summary.critical_path == []
+    assert schedule.scheduler.task(1) is None
+    frame = schedule.scheduler.frame(1)
+    assert frame['early_start'].isna().any()
+
+    ds.save_data()
+    assert main.main(["schedule", "--project", "1"]) == 1
+    assert "Dependency cycle, not scheduled" in capsys.readouterr().out
+
+    ds.load_data()
+    ds.delete_rows('Dependencies', 'DependencyID', [5])
+    assert schedule.scheduler.project(1).cycle == []
+    assert schedule.scheduler.project(1).finish == 9
+
+
+def _snapshot(scheduler):
+    return {pid: (scheduler.project(pid), scheduler.frame(pid).astype(object).fillna(-1).to_dict('records'))
+            for pid in (1, 2, 3)}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_matches_rebuild(data, seed):
+    rng = random.Random(seed)
+    ds.insert_rows('Tasks', [_task(tid, rng.randint(1, 3), rng.randint(0, 10)) for tid in range(1, 41)])
+    next_dep = 1
+    for step in range(150):
+        tids = ds.tasks_df['TaskID'].tolist()
+        deps = ds.dependencies_df['DependencyID'].tolist()
+        op = rng.random()
+        if op < 0.45:
+            pred, succ = rng.sample(tids, 2)
+            # Mostly legal links, with the odd cycle or cross-project link thrown in
+            if rng.random() < 0.9 and schedule.scheduler.check_link(pred, succ) is not None:
+                continue
+            pid = int(ds.find_row('Tasks', pred)['ProjectID'])
+            ds.insert_row('Dependencies', _link(next_dep, pid, pred, succ, rng.choice([0, 0, 1, 2, -1])))
+            next_dep += 1
+        elif op < 0.7:
+            ds.update_row('Tasks', rng.choice(tids), {'Duration': rng.randint(0, 12)})
+        elif op < 0.8 and deps:
+            ds.update_row('Dependencies', rng.choice(deps), {'LagDays': rng.randint(0, 5)})
+        elif op < 0.9 and deps:
+            ds.delete_rows('Dependencies', 'DependencyID', [rng.choice(deps)])
+        else:
+            ds.update_row('Tasks', rng.choice(tids), {'ProjectID': rng.randint(1, 3)})
+        assert _snapshot(schedule.scheduler) == _snapshot(schedule.Scheduler()), f"step {step}"
@@ -0,0 +1,322 @@
+"""
+Virtualized list widgets for the Project Tracking App.
+
+A plain tk.Listbox or ttk.Treeview holds one Tk item per row, so filling one
+with a 100k-row project costs seconds and a lot of memory. The views here
+keep a DataFrame as their source and only materialize the rows that fit in
+the viewport (plus a small overscan); scrolling re-fetches that window from
+the frame. Selection is remembered by primary key, so it survives scrolling.
+
+Refreshing or scrolling does not rebuild the widget: the new window is
+diffed by key against what is on screen and only the inserted, deleted,
+moved or changed rows are touched.
+"""
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+# Rows materialized beyond the visible ones, so a resize never shows a gap
+OVERSCAN_ROWS = 5
+
+# Tk event.state bits for Shift and Control (extend the selection on click)
+_EXTEND_SELECTION_MASK = 0x0001 | 0x0004
+
+
+class _VirtualView(tk.Frame):
+    """Scrolling, windowing and selection shared by the list and tree views.
+
+    Subclasses create self.view (the Tk widget holding the window of rows),
+    and implement _row_height(), _window_selection(), _show_selection() and
+    the per-row primitives _insert_at(), _delete_at(), _update_at().
+    """
+
+    def __init__(self, master, key_column, formatter, overscan=OVERSCAN_ROWS, **kwargs):
+        super().__init__(master, **kwargs)
+        self.key_column = key_column
+        self.formatter = formatter
+        self.overscan = overscan
+        self._rows = None
+        self._keys = []
+        self._positions = None
+        self._first = 0
+        self._visible = 1
+        self._window_keys = []
+        self._shown = []
+        self._selected = set()
+        self._extend = False
+        self._clicked = False
+
+    def _attach(self, view, multiple):
+        self.view = view
+        self.multiple = multiple
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.view.bind("<Configure>", self._on_configure)
+        self.view.bind("<Button-1>", self._on_click)
+        self.view.bind("<MouseWheel>", self._on_wheel)
+        self.view.bind("<Button-4>", lambda event: self._scroll(-3))
+        self.view.bind("<Button-5>", lambda event: self._scroll(3))
+
+    # ---------------- data ----------------
+    def set_rows(self, rows):
+        """Show a DataFrame (or None for nothing); keeps the scroll position where possible."""
+        self._rows = rows
+        self._keys = [] if rows is None else rows[self.key_column].tolist()
+        self._positions = None
+        live = set(self._keys)
+        self._selected = {key for key in self._selected if key in live}
+        self._first = min(self._first, max(0, len(self._keys) - self._visible))
+        self._refresh()
+
+    def row_values(self, position):
+        """Formatted values of the row at an absolute position."""
+        return self.formatter(self._rows.iloc[position])
+
+    def position_of(self, key):
+        """Absolute position of the row with the given key, or None."""
+        if self._positions is None:
+            self._positions = {str(k): position for position, k in enumerate(self._keys)}
+        return self._positions.get(str(key))
+
+    # ---------------- scrolling ----------------
+    def yview(self, *args):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'."""
+        if not args:
+            total = max(1, len(self._keys))
+            return self._first / total, min(1.0, (self._first + self._visible) / total)
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self._keys)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self._visible - 1)
+            self._scroll(step)
+
+    def see(self, position):
+        """Scroll so that the row at an absolute position is visible."""
+        if position < self._first:
+            self._scroll_to(position)
+        elif position >= self._first + self._visible:
+            self._scroll_to(position - self._visible + 1)
+
+    def _scroll(self, step):
+        self._scroll_to(self._first + step)
+        return "break"
+
+    def _scroll_to(self, first):
+        first = max(0, min(first, len(self._keys) - self._visible))
+        if first != self._first:
+            self._first = first
+            self._refresh()
+
+    def _on_wheel(self, event):
+        return self._scroll(-1 if event.delta > 0 else 1)
+
+    def _header_height(self):
+        return 0
+
+    def _on_configure(self, event):
+        visible = max(1, (event.height - self._header_height()) // self._row_height())
+        if visible != self._visible:
+            self._visible = visible
+            self._first = min(self._first, max(0, len(self._keys) - visible))
+            self._refresh()
+
+    def _refresh(self):
+        stop = min(len(self._keys), self._first + self._visible + self.overscan)
+        self._window_keys = self._keys[self._first:stop]
+        rows = self._rows.iloc[self._first:stop] if self._window_keys else None
+        wanted = [] if rows is None else [
+            (key, self.formatter(row)) for key, (_, row) in zip(self._window_keys, rows.iterrows())
+        ]
+        self._apply_diff(wanted)
+        self._show_selection()
+        self.view.yview_moveto(0)
+        self.scrollbar.set(*self.yview())
+
+    def _apply_diff(self, wanted):
+        """Bring the widget from self._shown to wanted, a list of (key, values), row by row."""
+        wanted_keys = {key for key, _ in wanted}
+        shown = self._shown
+        for offset in range(len(shown) - 1, -1, -1):
+            if shown[offset][0] not in wanted_keys:
+                self._delete_at(offset, shown[offset][0])
+                del shown[offset]
+        for offset, (key, values) in enumerate(wanted):
+            if offset < len(shown) and shown[offset][0] == key:
+                if repr(shown[offset][1]) != repr(values):  # repr: NaN == NaN
+                    self._update_at(offset, key, values)
+                    shown[offset] = (key, values)
+                continue
+            old = next((i for i in range(offset + 1, len(shown)) if shown[i][0] == key), None)
+            if old is not None:
+                # Moved up: drop it where it was and re-insert here
+                self._delete_at(old, key)
+                del shown[old]
+            self._insert_at(offset, key, values)
+            shown.insert(offset, (key, values))
+        self._shown = shown
+
+    # ---------------- selection ----------------
+    def _on_click(self, event):
+        self._clicked = True
+        self._extend = self.multiple and bool(event.state & _EXTEND_SELECTION_MASK)
+
+    def _on_select(self, event=None):
+        """Fold the widget's selection of the current window into the key set."""
+        window = set(self._window_keys)
+        picked = set(self._window_selection())
+        if not self._clicked and picked == self._selected & window:
+            # Nothing new, e.g. the echo of _render() restoring the selection
+            return
+        if self.multiple and self._extend:
+            self._selected = (self._selected - window) | picked
+        else:
+            self._selected = picked
+        self._extend = self._clicked = False
+        self._follow_focus()
+
+    def _follow_focus(self):
+        """Keyboard moves past the last visible row scroll the window along."""
+        offset = self._focus_offset()
+        if offset is not None and offset >= self._visible:
+            self._scroll_to(self._first + offset - self._visible + 1)
+
+    def selected_keys(self):
+        """Selected keys in sheet order."""
+        return [key for key in self._keys if key in self._selected]
+
+    def select_key(self, key):
+        self._selected = {key}
+        position = self.position_of(key)
+        if position is not None:
+            self.see(position)
+        self._refresh()
+
+    def clear_selection(self):
+        self._selected = set()
+        self._refresh()
+
+    def bind(self, sequence=None, func=None, add=None):
+        """Events are bound on the inner widget, after the view's own handlers."""
+        return self.view.bind(sequence, func, "+")
+
+
+class VirtualListbox(_VirtualView):
+    """A Listbox over a DataFrame; formatter(row) returns the line of text.
+
+    curselection() and get() take absolute row positions, so code written
+    against tk.Listbox keeps working.
+    """
+
+    def __init__(self, master, key_column, formatter, selectmode=tk.BROWSE, overscan=OVERSCAN_ROWS, **listbox_options):
+        super().__init__(master, key_column, formatter, overscan)
+        listbox = tk.Listbox(self, selectmode=selectmode, exportselection=False, **listbox_options)
+        self._attach(listbox, selectmode in (tk.MULTIPLE, tk.EXTENDED))
+        listbox.bind("<<ListboxSelect>>", self._on_select)
+
+    def _row_height(self):
+        return tkfont.Font(root=self, font=self.view.cget("font")).metrics("linespace")
+
+    def _insert_at(self, offset, key, line):
+        self.view.insert(offset, line)
+
+    def _delete_at(self, offset, key):
+        self.view.delete(offset)
+
+    def _update_at(self, offset, key, line):
+        # A Listbox line cannot be edited in place
+        self.view.delete(offset)
+        self.view.insert(offset, line)
+
+    def _show_selection(self):
+        self.view.selection_clear(0, tk.END)
+        for offset, key in enumerate(self._window_keys):
+            if key in self._selected:
+                self.view.selection_set(offset)
+
+    def _window_selection(self):
+        return [self._window_keys[offset] for offset in self.view.curselection()]
+
+    def _focus_offset(self):
+        return self.view.index(tk.ACTIVE) if self._window_keys else None
+
+    def curselection(self):
+        positions = (self.position_of(key) for key in self.selected_keys())
+        return tuple(position for position in positions if position is not None)
+
+    def get(self, position):
+        return self.row_values(position)
+
+
+class VirtualTreeview(_VirtualView):
+    """A headings-only Treeview over a DataFrame; formatter(row) returns the column values.
+
+    Item ids are str(key), and selection(), item(), identify_row() and
+    selection_set() accept them the way ttk.Treeview does.
+    """
+
+    def __init__(self, master, key_column, formatter, columns, selectmode="extended", overscan=OVERSCAN_ROWS):
+        super().__init__(master, key_column, formatter, overscan)
+        tree = ttk.Treeview(self, columns=columns, show='headings', selectmode=selectmode)
+        self._attach(tree, selectmode == "extended")
+        tree.bind("<<TreeviewSelect>>", self._on_select)
+
+    def _row_height(self):
+        return int(ttk.Style(self).lookup("Treeview", "rowheight") or 20)
+
+    def _header_height(self):
+        return self._row_height()
+
+    def _insert_at(self, offset, key, values):
+        self.view.insert("", offset, iid=str(key), values=values)
+
+    def _delete_at(self, offset, key):
+        self.view.delete(str(key))
+
+    def _update_at(self, offset, key, values):
+        self.view.item(str(key), values=values)
+
+    def _show_selection(self):
+        wanted = tuple(str(key) for key in self._window_keys if key in self._selected)
+        if set(wanted) != set(self.view.selection()):
+            self.view.selection_set(wanted)
+
+    def _window_selection(self):
+        iids = set(self.view.selection())
+        return [key for key in self._window_keys if str(key) in iids]
+
+    def _focus_offset(self):
+        focus = self.view.focus()
+        window = [str(key) for key in self._window_keys]
+        return window.index(focus) if focus in window else None
+
+    def _key(self, iid):
+        position = self.position_of(iid)
+        return self._keys[position] if position is not None else None
+
+    def heading(self, column, **options):
+        return self.view.heading(column, **options)
+
+    def column(self, column, **options):
+        return self.view.column(column, **options)
+
+    def identify_row(self, y):
+        return self.view.identify_row(y)
+
+    def selection(self):
+        return tuple(str(key) for key in self.selected_keys())
+
+    def selection_set(self, iid):
+        key = self._key(iid)
+        if key is not None:
+            self.select_key(key)
+
+    def item(self, iid, option=None):
+        """Item options like ttk.Treeview.item; only 'values' is supported for off-screen rows."""
+        if self.view.exists(iid):
+            return self.view.item(iid, option)
+        position = self.position_of(iid)
+        values = self.row_values(position) if position is not None else ()
+        return values if option == "values" else {'values': values}